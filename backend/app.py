@@ -1,5 +1,6 @@
 # backend/app.py
 import os
+import click
 from flask import Flask, redirect, url_for
 from flask_login import LoginManager
 from flask_session import Session
@@ -118,6 +119,16 @@ def create_app(init_session=True):
     app.register_blueprint(project_routes_mod.project_routes)
     app.register_blueprint(project_routes_mod.project_api_bp)
 
+    @app.cli.command('pipeline-snapshot')
+    @click.option('--note', default=None, help='Label stored with the snapshot.')
+    def pipeline_snapshot_command(note):
+        """Take a pipeline snapshot (schedule via cron for periodic history)."""
+        from backend.services.pipeline_snapshot_service import create_snapshot
+        success, message, _ = create_snapshot(note=note)
+        click.echo(message)
+        if not success:
+            raise SystemExit(1)
+
     @app.route('/')
     def index():
         return redirect(url_for('products.list_products'))
@@ -7,21 +7,50 @@ load_dotenv(os.path.join(basedir, '..', '.env'))
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'a-very-secret-key-that-you-should-change'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    # Full database restores stream the upload, so large backups only need a higher limit here
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     if not SQLALCHEMY_DATABASE_URI:
         raise ValueError("DATABASE_URL environment variable is not set. Please configure it in your .env file.")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Background JSON imports (threads per web worker process)
+    IMPORT_JOB_WORKERS = int(os.environ.get('IMPORT_JOB_WORKERS', 2))
+    # Queued/running jobs without a heartbeat for this long are marked failed (worker died)
+    IMPORT_JOB_STALE_SECONDS = int(os.environ.get('IMPORT_JOB_STALE_SECONDS', 600))
+
+    # Import previews are stored server-side, not in the session
+    IMPORT_PREVIEW_TTL_SECONDS = int(os.environ.get('IMPORT_PREVIEW_TTL_SECONDS', 6 * 3600))
+    IMPORT_PREVIEW_PAGE_SIZE = int(os.environ.get('IMPORT_PREVIEW_PAGE_SIZE', 100))
+
+    # Serialized pipeline timeline responses kept per worker (LRU)
+    PIPELINE_TIMELINE_CACHE_SIZE = int(os.environ.get('PIPELINE_TIMELINE_CACHE_SIZE', 64))
+    # Projects per page when a lazily loaded swim lane is fetched
+    PIPELINE_LANE_PAGE_SIZE = int(os.environ.get('PIPELINE_LANE_PAGE_SIZE', 200))
+
     # LLM API Keys
     OLLAMA_BASE_URL = os.environ.get('OLLAMA_BASE_URL')
+    # Chat history: at most MAX_CHAT_HISTORY_LENGTH recent messages within
+    # LLM_HISTORY_TOKEN_BUDGET tokens are sent; CHAT_HISTORY_RETENTION are stored per user
     MAX_CHAT_HISTORY_LENGTH = int(os.environ.get('MAX_CHAT_HISTORY_LENGTH', 10))
+    LLM_HISTORY_TOKEN_BUDGET = int(os.environ.get('LLM_HISTORY_TOKEN_BUDGET', 4000))
+    CHAT_HISTORY_RETENTION = int(os.environ.get('CHAT_HISTORY_RETENTION', 200))
+    # Database records retrieved into chat prompts (see llm_context_service)
+    LLM_CONTEXT_TOKEN_BUDGET = int(os.environ.get('LLM_CONTEXT_TOKEN_BUDGET', 2000))
+    LLM_CONTEXT_TOP_K = int(os.environ.get('LLM_CONTEXT_TOP_K', 20))
 
     # Apollo LLM API settings
     APOLLO_CLIENT_ID = os.environ.get('APOLLO_CLIENT_ID')
     APOLLO_CLIENT_SECRET = os.environ.get('APOLLO_CLIENT_SECRET')
     APOLLO_TOKEN_URL = os.environ.get('APOLLO_TOKEN_URL')
     APOLLO_LLM_API_BASE_URL = os.environ.get('APOLLO_LLM_API_BASE_URL')
+    # Apollo tokens are refreshed this many seconds before they expire
+    APOLLO_TOKEN_REFRESH_MARGIN_SECONDS = int(os.environ.get('APOLLO_TOKEN_REFRESH_MARGIN_SECONDS', 60))
+
+    # Reused LLM clients per worker (provider, model, credentials)
+    LLM_CLIENT_IDLE_SECONDS = int(os.environ.get('LLM_CLIENT_IDLE_SECONDS', 600))
+    LLM_CLIENT_MAX = int(os.environ.get('LLM_CLIENT_MAX', 32))
+    LLM_MODEL_LIST_TTL_SECONDS = int(os.environ.get('LLM_MODEL_LIST_TTL_SECONDS', 300))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -14,4 +14,5 @@ flask db upgrade
 
 echo "Starting Gunicorn server..."
 # The 'exec' command replaces the shell process with the Gunicorn process.
-exec gunicorn --workers 4 --bind 0.0.0.0:5000 "backend.app:create_app()"
\ No newline at end of file
+# Threaded workers: streamed LLM answers occupy a thread, not a whole worker.
+exec gunicorn --workers 4 --worker-class gthread --threads "${GUNICORN_THREADS:-8}" --bind 0.0.0.0:5000 "backend.app:create_app()"
\ No newline at end of file
@@ -1,6 +1,7 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table, Boolean, Date
-from sqlalchemy.orm import relationship, column_property, validates
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, Table, Boolean, Date
+from sqlalchemy.orm import relationship, column_property, validates, synonym
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.inspection import inspect
@@ -1017,11 +1018,26 @@ class Project(db.Model):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Timeline filter indexes (see migration 011_project_timeline_indexes)
+    __table_args__ = (
+        db.Index('ix_projects_type_status', 'project_type', 'status'),
+        db.Index('ix_projects_indication', 'indication'),
+        *[
+            db.Index(
+                f'ix_projects_{milestone}_active', milestone,
+                postgresql_where=db.text("status IS NULL OR status <> 'discontinued'")
+            )
+            for milestone in ('sod', 'dsmm3', 'dsmm4', 'dpmm3', 'dpmm4', 'rofd', 'submission', 'launch')
+        ],
+    )
+
     # Relationships
+    # Ordered so the first drug substance (modality of the project) is stable
     drug_substances = relationship(
         "DrugSubstance",
         secondary=project_drug_substances,
-        back_populates="projects"
+        back_populates="projects",
+        order_by="DrugSubstance.id"
     )
     drug_products = relationship(
         "DrugProduct",
@@ -1048,4 +1064,174 @@ class Project(db.Model):
             'rofd': self.rofd.isoformat() if self.rofd else None,
             'submission': self.submission.isoformat() if self.submission else None,
             'launch': self.launch.isoformat() if self.launch else None,
-        }
\ No newline at end of file
+        }
+
+class DeletedRecord(db.Model):
+    """
+    Tombstone for a deleted row, written by database triggers (see migration
+    006_delta_tracking) so delta exports can report deletions.
+    """
+    __tablename__ = 'deleted_records'
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(100), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
+class ImportJob(db.Model):
+    """
+    A JSON import running in the background (see import_job_service).
+    The preview page polls this row for progress and can request cancellation.
+    """
+    __tablename__ = 'import_jobs'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True, index=True)
+    entity_type = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False, default='queued')  # 'queued', 'running', 'completed', 'failed', 'cancelled'
+
+    total_items = Column(Integer, nullable=False, default=0)
+    processed_items = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False, server_default='false')
+
+    message = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)  # finalize_* result incl. detailed_logs
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # last write by the worker thread
+
+    def get_progress_dict(self, include_result=False):
+        """Returns job progress for the polling endpoint, including an ETA."""
+        eta_seconds = None
+        if self.status == 'running' and self.started_at and self.processed_items:
+            elapsed = (datetime.now(timezone.utc) - self.started_at).total_seconds()
+            remaining = max(self.total_items - self.processed_items, 0)
+            eta_seconds = round(elapsed / self.processed_items * remaining, 1)
+
+        progress = {
+            'id': self.id,
+            'entity_type': self.entity_type,
+            'status': self.status,
+            'total_items': self.total_items,
+            'processed_items': self.processed_items,
+            'error_count': self.error_count,
+            'cancel_requested': self.cancel_requested,
+            'eta_seconds': eta_seconds,
+            'message': self.message,
+        }
+        if include_result:
+            progress['result'] = self.result
+        return progress
+
+
+class ImportPreview(db.Model):
+    """
+    Server-side store for an import preview (see import_preview_service).
+    Keeps multi-MB analysis results out of the Flask session; rows expire
+    after IMPORT_PREVIEW_TTL_SECONDS.
+    """
+    __tablename__ = 'import_previews'
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, kept in the session
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True, index=True)
+    entity_type = Column(String(100), nullable=False)
+    kind = Column(String(20), nullable=False, default='preview')  # 'preview' or 'resolution'
+    item_count = Column(Integer, nullable=False, default=0)
+    payload = Column(JSONB, nullable=True)  # 'resolution' only: original data + analysis result
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class ImportPreviewItem(db.Model):
+    """One preview row (json_item, db_item, diff, action) of an ImportPreview."""
+    __tablename__ = 'import_preview_items'
+
+    preview_id = Column(String(32), ForeignKey('import_previews.id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    item = Column(JSONB, nullable=False)
+
+
+class DataVersion(db.Model):
+    """
+    Change counter per data domain, bumped once per writing transaction at
+    commit by deferred triggers (see migrations 009_data_versions and
+    015_defer_data_version_bumps). Used to invalidate in-process result caches
+    across all workers.
+    """
+    __tablename__ = 'data_versions'
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class PipelineSnapshot(db.Model):
+    """
+    Point-in-time copy of the pipeline timeline inputs (see
+    pipeline_snapshot_service). Append-only; the timeline reads it for as_of.
+    """
+    __tablename__ = 'pipeline_snapshots'
+
+    id = Column(Integer, primary_key=True)
+    taken_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    project_count = Column(Integer, nullable=False, default=0)
+    note = Column(String(255), nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'taken_at': self.taken_at.isoformat() if self.taken_at else None,
+            'project_count': self.project_count,
+            'note': self.note,
+        }
+
+
+class PipelineSnapshotProject(db.Model):
+    """
+    One project as it was in a PipelineSnapshot. Column names mirror Project
+    so the timeline service can query either table.
+    """
+    __tablename__ = 'pipeline_snapshot_projects'
+
+    snapshot_id = Column(Integer, ForeignKey('pipeline_snapshots.id', ondelete='CASCADE'), primary_key=True)
+    project_id = Column(Integer, primary_key=True)
+    id = synonym('project_id')
+
+    name = Column(String(200), nullable=False)
+    indication = Column(String(255), nullable=True)
+    project_type = Column(String(50), nullable=True)
+    status = Column(String(50), nullable=True)
+    modality_name = Column(String(255), nullable=True)  # molecule_type of the first DS, or its modality
+
+    sod = Column(Date, nullable=True)
+    dsmm3 = Column(Date, nullable=True)
+    dsmm4 = Column(Date, nullable=True)
+    dpmm3 = Column(Date, nullable=True)
+    dpmm4 = Column(Date, nullable=True)
+    rofd = Column(Date, nullable=True)
+    submission = Column(Date, nullable=True)
+    launch = Column(Date, nullable=True)
+
+
+class ChatMessage(db.Model):
+    """
+    One LLM chat message of a user (see llm_service). token_count is measured
+    with export_service.count_tokens when the message is stored, so prompts
+    can be assembled under a token budget without re-counting.
+    """
+    __tablename__ = 'chat_messages'
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    role = Column(String(20), nullable=False)  # 'user' or 'assistant'
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        db.Index('ix_chat_messages_user_id_id', 'user_id', 'id'),
+    )
@@ -1,8 +1,10 @@
 # Update backend/routes/analytics_routes.py
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, current_app
 from flask_login import login_required
 from ..services.pipeline_timeline_service import get_timeline_service
+from ..services.pipeline_snapshot_service import create_snapshot, list_snapshots
+from ..services.timeline_cache import get_timeline_cache, timeline_cache_key, get_data_version
 from ..services.strategic_analytics_service import get_weighted_challenges_data, get_challenge_modality_matrix
 
 analytics_routes = Blueprint('analytics', __name__, url_prefix='/analytics')
@@ -30,7 +32,8 @@ def get_pipeline_timeline_data():
         ...
     }
 
-    Returns structured timeline data.
+    Returns structured timeline data. Responses are cached per config until
+    the pipeline data changes (see timeline_cache).
     """
     try:
         config = request.get_json()
@@ -38,15 +41,118 @@ def get_pipeline_timeline_data():
         if not config:
             return jsonify({'error': 'No configuration provided'}), 400
         
-        # Get timeline service and fetch data
-        service = get_timeline_service()
-        data = service.get_timeline_data(config)
+        cache = get_timeline_cache(current_app.config.get('PIPELINE_TIMELINE_CACHE_SIZE', 64))
+        cache_key = timeline_cache_key(config)
+        version = get_data_version('pipeline')
+
+        body = cache.get(cache_key, version) if version is not None else None
+        if body is None:
+            # Get timeline service and fetch data
+            service = get_timeline_service()
+            data = service.get_timeline_data(config)
+            body = current_app.json.dumps(data)
+            if version is not None:
+                cache.put(cache_key, version, body)
         
-        return jsonify(data)
+        return current_app.response_class(body, mimetype='application/json')
     
+    except ValueError as e:
+        # Malformed as_of or no snapshot for it
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_routes.route('/api/pipeline-timeline-lane', methods=['POST'])
+@login_required
+def get_pipeline_timeline_lane():
+    """
+    Returns one page of a lazily loaded swim lane.
+
+    Expects JSON body:
+    {
+        "config": {...},          (the config the lane headers were loaded with)
+        "group_name": "Oncology",
+        "cursor": null,           (next_cursor of the previous page)
+        "limit": 200              (optional, capped at PIPELINE_LANE_PAGE_SIZE)
+    }
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        config = payload.get('config')
+        group_name = payload.get('group_name')
+
+        if not config or group_name is None:
+            return jsonify({'error': 'config and group_name are required'}), 400
+
+        page_size = current_app.config.get('PIPELINE_LANE_PAGE_SIZE', 200)
+        limit = payload.get('limit')
+        if not isinstance(limit, int) or limit <= 0 or limit > page_size:
+            limit = page_size
+
+        data = get_timeline_service().get_lane_elements(
+            config, group_name, cursor=payload.get('cursor'), limit=limit
+        )
+        return jsonify(data)
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_routes.route('/api/pipeline-timeline-diff', methods=['POST'])
+@login_required
+def get_pipeline_timeline_diff():
+    """
+    Compares two timeline configurations and returns only moved, added and
+    removed projects.
+
+    Expects JSON body: {"base": {...config...}, "compare": {...config...}}
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        base_config = payload.get('base')
+        compare_config = payload.get('compare')
+
+        if not base_config or not compare_config:
+            return jsonify({'error': 'Both base and compare configurations are required'}), 400
+
+        cache = get_timeline_cache(current_app.config.get('PIPELINE_TIMELINE_CACHE_SIZE', 64))
+        cache_key = timeline_cache_key({'diff': [base_config, compare_config]})
+        version = get_data_version('pipeline')
+
+        body = cache.get(cache_key, version) if version is not None else None
+        if body is None:
+            data = get_timeline_service().get_timeline_diff(base_config, compare_config)
+            body = current_app.json.dumps(data)
+            if version is not None:
+                cache.put(cache_key, version, body)
+
+        return current_app.response_class(body, mimetype='application/json')
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@analytics_routes.route('/api/pipeline-snapshots', methods=['GET'])
+@login_required
+def get_pipeline_snapshots():
+    """Lists pipeline snapshots available for as_of timeline requests."""
+    try:
+        return jsonify({'snapshots': list_snapshots()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_routes.route('/api/pipeline-snapshots', methods=['POST'])
+@login_required
+def create_pipeline_snapshot():
+    """Takes a pipeline snapshot now. Optional JSON body: {"note": "..."}."""
+    payload = request.get_json(silent=True) or {}
+    success, message, snapshot = create_snapshot(note=payload.get('note'))
+    if not success:
+        return jsonify({'error': message}), 500
+    return jsonify({'message': message, 'snapshot': snapshot}), 201
+
 @analytics_routes.route('/capability-gaps')
 @login_required
 def capability_gaps():
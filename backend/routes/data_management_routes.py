@@ -1,7 +1,8 @@
 # backend/routes/data_management_routes.py
+import gzip
 import json
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session, jsonify
-from flask_login import login_required
+from flask import Blueprint, render_template, request, flash, redirect, url_for, session, jsonify, current_app
+from flask_login import login_required, current_user
 
 from ..services.data_management_service import (
     analyze_json_import,
@@ -12,6 +13,7 @@ from ..services.data_management_service import (
     analyze_challenge_modality_details_import,
     finalize_challenge_modality_details_import,
     import_full_database,
+    apply_delta,
     _resolve_foreign_keys_for_process_stage,
     _resolve_foreign_keys_for_product,
     _resolve_foreign_keys_for_challenge,
@@ -21,6 +23,16 @@ from ..services.data_management_service import (
     _resolve_foreign_keys_for_project
 )
 
+from ..services.backup_service import import_columnar_backup
+from ..services.import_job_service import submit_import_job, get_job, request_cancel
+from ..services.import_preview_service import (
+    create_preview,
+    get_preview,
+    get_preview_page,
+    delete_preview,
+    build_resolved_data
+)
+
 from ..models import (
     Product, Indication, Challenge, ChallengeModalityDetail,
     ProductSupplyChain, Modality, ManufacturingCapability, InternalFacility,
@@ -105,8 +117,32 @@ def full_database_import():
     if file and file.filename.endswith('.json'):
         success, message = import_full_database(file.stream)
         flash(message, 'success' if success else 'danger')
+    elif file and file.filename.endswith('.json.gz'):
+        success, message = import_full_database(gzip.GzipFile(fileobj=file.stream))
+        flash(message, 'success' if success else 'danger')
+    elif file and file.filename.endswith('.zip'):
+        success, message = import_columnar_backup(file.stream)
+        flash(message, 'success' if success else 'danger')
     else:
-        flash('Invalid file type. Please upload a .json backup file.', 'danger')
+        flash('Invalid file type. Please upload a .json, .json.gz or columnar .zip backup file.', 'danger')
+
+    return redirect(url_for('data_management.data_management_page'))
+
+
+@data_management_bp.route('/apply-delta', methods=['POST'])
+@login_required
+def apply_delta_import():
+    file = request.files.get('delta_file')
+
+    if not file or file.filename == '':
+        flash('No delta file selected.', 'warning')
+        return redirect(url_for('data_management.data_management_page'))
+
+    if file.filename.endswith('.json'):
+        success, message = apply_delta(file.stream)
+        flash(message, 'success' if success else 'danger')
+    else:
+        flash('Invalid file type. Please upload a .json delta file.', 'danger')
 
     return redirect(url_for('data_management.data_management_page'))
 
@@ -145,16 +181,25 @@ def analyze_json_upload():
             )
 
         if analysis_result.get('success'):
+            # Only the preview id goes into the session; the data lives in the preview store
+            delete_preview(session.pop('import_preview_id', None))
+            delete_preview(session.pop('import_resolution_id', None))
+            session['import_entity_type'] = entity_type
+
             if analysis_result.get('needs_resolution'):
                 # Store data for resolution step
-                session['import_original_data'] = json_data
-                session['import_entity_type'] = entity_type
-                session['import_analysis_result'] = analysis_result
+                session['import_resolution_id'] = create_preview(
+                    entity_type,
+                    kind='resolution',
+                    payload={'original_data': json_data, 'analysis_result': analysis_result},
+                    user_id=current_user.id
+                )
                 return redirect(url_for('data_management.foreign_key_resolution'))
             else:
                 # No resolution needed, proceed as normal
-                session['import_preview_data'] = analysis_result['preview_data']
-                session['import_entity_type'] = entity_type
+                session['import_preview_id'] = create_preview(
+                    entity_type, analysis_result['preview_data'], user_id=current_user.id
+                )
                 return redirect(url_for('data_management.import_preview'))
         else:
             flash(f"Analysis failed: {analysis_result.get('message')}", 'danger')
@@ -168,14 +213,16 @@ def analyze_json_upload():
 @data_management_bp.route('/foreign-key-resolution')
 @login_required
 def foreign_key_resolution():
-    analysis_result = session.get('import_analysis_result')
-    entity_type = session.get('import_entity_type')
-    original_data = session.get('import_original_data')
+    resolution = get_preview(session.get('import_resolution_id'), current_user.id)
 
-    if not analysis_result or not entity_type:
+    if resolution is None:
         flash("No resolution data found. Please start a new import.", "warning")
         return redirect(url_for('data_management.data_management_page'))
 
+    entity_type = resolution.entity_type
+    analysis_result = resolution.payload['analysis_result']
+    original_data = resolution.payload['original_data']
+
     # Prepare data for resolution template
     items_needing_resolution = [
         item for item in analysis_result['preview_data']
@@ -201,7 +248,7 @@ def foreign_key_resolution():
 def resolve_foreign_keys():
     """
     Apply foreign key resolutions, re-analyze the data,
-    and store the result in the session for the preview page.
+    and store the result in the preview store for the preview page.
     """
     try:
         data = request.json
@@ -230,11 +277,13 @@ def resolve_foreign_keys():
                 ENTITY_MAP[entity_type]['key']
             )
 
-        # Store the new preview data in the Flask session
+        # Store the new preview data and keep only its id in the session
         if analysis_result.get('success'):
-            session['import_preview_data'] = analysis_result['preview_data']
+            delete_preview(session.pop('import_preview_id', None))
+            session['import_preview_id'] = create_preview(
+                entity_type, analysis_result['preview_data'], user_id=current_user.id
+            )
             session['import_entity_type'] = entity_type
-            session.modified = True
             return jsonify({'success': True, 'message': 'Resolutions applied and data re-analyzed.'})
         else:
             return jsonify({'success': False, 'message': 'Failed to re-analyze data after resolution.'}), 400
@@ -274,50 +323,74 @@ def create_missing_entity(field_name, entity_name, metadata):
 @data_management_bp.route('/preview')
 @login_required
 def import_preview():
-    preview_data = session.get('import_preview_data')
-    entity_type = session.get('import_entity_type')
+    preview = get_preview(session.get('import_preview_id'), current_user.id)
 
-    if not preview_data or not entity_type:
+    if preview is None or not preview.item_count:
         flash("No import preview data found. Please start a new import.", "warning")
         return redirect(url_for('data_management.data_management_page'))
 
+    per_page = current_app.config.get('IMPORT_PREVIEW_PAGE_SIZE', 100)
+    preview_data, pagination = get_preview_page(preview, request.args.get('page', 1, type=int), per_page)
+    entity_type = preview.entity_type
+
     return render_template(
         'json_import_preview.html',
         title=f"Import Preview for {entity_type.replace('_', ' ').title()}",
         preview_data=preview_data,
+        pagination=pagination,
+        preview_id=preview.id,
         entity_type=entity_type
     )
 
 
+def _resolved_data_from_request(payload):
+    """
+    Returns (entity_type, resolved_data) for a finalize request. Clients send
+    either a preview_id plus their action choices, or the full resolved_data.
+    """
+    entity_type = payload.get('entity_type')
+    if payload.get('preview_id'):
+        preview = get_preview(payload['preview_id'], current_user.id)
+        if preview is None:
+            return entity_type, None
+        return preview.entity_type, build_resolved_data(preview, payload.get('actions'))
+    return entity_type, payload.get('resolved_data')
+
+
+def _run_finalize(entity_type, resolved_data, bulk_upsert=True, progress_callback=None):
+    """Dispatches resolved preview data to the matching finalize_* function."""
+    # Special handling for process templates
+    if entity_type == 'process_templates':
+        return finalize_process_template_import(resolved_data, progress_callback=progress_callback)
+    # Special handling for challenge modality details
+    if entity_type == 'challenge_modality_details':
+        return finalize_challenge_modality_details_import(resolved_data, progress_callback=progress_callback)
+
+    # Get the resolver if it exists
+    entity_config = ENTITY_MAP[entity_type]
+    resolver = entity_config.get('resolver')
+
+    # Regular entity finalization (set-based upsert unless the client opts out)
+    return finalize_import(
+        resolved_data,
+        entity_config['model'],
+        entity_config['key'],
+        resolver,
+        bulk_upsert=bulk_upsert,
+        progress_callback=progress_callback
+    )
+
+
 @data_management_bp.route('/finalize', methods=['POST'])
 @login_required
 def finalize_json_import():
-    resolved_data = request.json.get('resolved_data')
-    entity_type = request.json.get('entity_type')
+    entity_type, resolved_data = _resolved_data_from_request(request.json)
 
     if not resolved_data or not entity_type or entity_type not in ENTITY_MAP:
         return jsonify(success=False, message="Invalid request data."), 400
 
     try:
-        # Special handling for process templates
-        if entity_type == 'process_templates':
-            result = finalize_process_template_import(resolved_data)
-        # Special handling for challenge modality details
-        elif entity_type == 'challenge_modality_details':
-            result = finalize_challenge_modality_details_import(resolved_data)
-        else:
-            # Get the resolver if it exists
-            entity_config = ENTITY_MAP[entity_type]
-            resolver = entity_config.get('resolver')
-
-            # Regular entity finalization
-            result = finalize_import(
-                resolved_data,
-                entity_config['model'],
-                entity_config['key'],
-                resolver
-            )
-
+        result = _run_finalize(entity_type, resolved_data, request.json.get('bulk_upsert', True))
         return jsonify(result)
 
     except Exception as e:
@@ -326,6 +399,43 @@ def finalize_json_import():
         return jsonify(success=False, message=f"Import failed: {str(e)}"), 500
 
 
+@data_management_bp.route('/jobs', methods=['POST'])
+@login_required
+def submit_json_import_job():
+    """Queues the finalize step as a background job; poll /jobs/<id> for progress."""
+    entity_type, resolved_data = _resolved_data_from_request(request.json)
+    bulk_upsert = request.json.get('bulk_upsert', True)
+
+    if not resolved_data or not entity_type or entity_type not in ENTITY_MAP:
+        return jsonify(success=False, message="Invalid request data."), 400
+
+    def runner(progress_callback):
+        return _run_finalize(entity_type, resolved_data, bulk_upsert, progress_callback)
+
+    job = submit_import_job(entity_type, len(resolved_data), runner, user_id=current_user.id)
+    return jsonify(success=True, job_id=job.id), 202
+
+
+@data_management_bp.route('/jobs/<int:job_id>')
+@login_required
+def import_job_status(job_id):
+    job = get_job(job_id, current_user.id)
+    if job is None:
+        return jsonify(success=False, message="Import job not found."), 404
+
+    finished = job.status in ('completed', 'failed', 'cancelled')
+    return jsonify(success=True, job=job.get_progress_dict(include_result=finished))
+
+
+@data_management_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_import_job(job_id):
+    job = request_cancel(job_id, current_user.id)
+    if job is None:
+        return jsonify(success=False, message="Import job not found."), 404
+    return jsonify(success=True, job=job.get_progress_dict())
+
+
 @data_management_bp.route('/api/lookup/<string:entity_type>')
 @login_required
 def lookup_entities(entity_type):
@@ -1,8 +1,9 @@
 # backend/routes/export_routes.py
-from flask import Blueprint, render_template, request, Response
+from flask import Blueprint, render_template, request, Response, stream_with_context, send_file, jsonify
 from flask_login import login_required
-from ..services import export_service
+from ..services import export_service, backup_service
 import datetime
+import tempfile
 
 
 export_bp = Blueprint('export', __name__, url_prefix='/export')
@@ -33,10 +34,59 @@ def data_export_page():
 @export_bp.route('/full-database-export')
 @login_required
 def full_database_export():
-    """Exports the entire database as a single JSON file."""
-    json_data = export_service.export_full_database()
+    """
+    Streams the entire database as a JSON file, table by table.
+    Pass ?compress=gzip to receive a gzip-compressed backup, or
+    ?format=columnar for the compressed columnar (.zip) backup format.
+    """
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if request.args.get('format') == 'columnar':
+        backup_file = tempfile.TemporaryFile()
+        backup_service.export_columnar_backup(backup_file)
+        backup_file.seek(0)
+        return send_file(
+            backup_file,
+            mimetype="application/zip",
+            as_attachment=True,
+            download_name=f"pipeline_intelligence_backup_{timestamp}.zip"
+        )
+
     filename = f"pipeline_intelligence_backup_{timestamp}.json"
+    chunks = export_service.iter_full_database_export()
+
+    if request.args.get('compress') == 'gzip':
+        return Response(
+            stream_with_context(export_service.gzip_chunks(chunks)),
+            mimetype="application/gzip",
+            headers={"Content-Disposition": f"attachment;filename={filename}.gz"}
+        )
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype="application/json",
+        headers={"Content-Disposition": f"attachment;filename={filename}"}
+    )
+
+
+@export_bp.route('/delta-export')
+@login_required
+def delta_export():
+    """
+    Exports rows changed after ?since=<ISO timestamp> plus tombstones.
+    Use the returned _meta.until as the next 'since' watermark.
+    """
+    since_param = request.args.get('since', '')
+    try:
+        since = datetime.datetime.fromisoformat(since_param)
+    except ValueError:
+        return jsonify(success=False, message="Query parameter 'since' must be an ISO 8601 timestamp."), 400
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+
+    json_data = export_service.export_delta(since)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"pipeline_intelligence_delta_{timestamp}.json"
 
     return Response(
         json_data,
@@ -1,7 +1,9 @@
 # backend/routes/llm_routes.py
+import json
 import traceback
-from flask import Blueprint, request, render_template, jsonify
+from flask import Blueprint, request, render_template, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
+from ..db import db
 from ..services import llm_service
 
 llm_routes = Blueprint('llm', __name__, url_prefix='/llm')
@@ -25,13 +27,18 @@ def handle_chat():
         return jsonify({"success": False, "message": "Message and model are required."}), 400
 
     try:
-        chat_history = llm_service.get_chat_history()
+        chat_history = llm_service.get_prompt_history()
+        context, sources = ('', [])
+        if data.get('use_context', True):
+            context, sources = llm_service.get_retrieval_context(user_message)
         response = llm_service.generate_chat_response(
             model_name=model_name,
             user_message=user_message,
             system_prompt=system_prompt,
-            chat_history=chat_history
+            chat_history=chat_history,
+            context=context
         )
+        response["sources"] = sources
         if response.get("success"):
             llm_service.add_message_to_history('user', user_message)
             llm_service.add_message_to_history('assistant', response["message"])
@@ -40,6 +47,67 @@ def handle_chat():
         traceback.print_exc()
         return jsonify({"success": False, "message": f"An unexpected error occurred: {e}"}), 500
 
+def _sse(payload, event=None):
+    """Formats one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+@llm_routes.route('/api/chat/stream', methods=['POST'])
+@login_required
+def handle_chat_stream():
+    """
+    Streams the assistant's answer as server-sent events: 'event: context'
+    with the retrieved database records, 'data: {"delta": ...}' per text
+    chunk, then 'event: done' or 'event: error'.
+    """
+    data = request.json
+    user_message = data.get('message')
+    model_name = data.get('model')
+
+    if not user_message or not model_name:
+        return jsonify({"success": False, "message": "Message and model are required."}), 400
+
+    context, sources = ('', [])
+    if data.get('use_context', True):
+        context, sources = llm_service.get_retrieval_context(user_message)
+
+    user_id = current_user.id
+    success, message, deltas = llm_service.stream_chat_response(
+        model_name=model_name,
+        user_message=user_message,
+        system_prompt=current_user.system_prompt,
+        chat_history=llm_service.get_prompt_history(user_id),
+        context=context
+    )
+    if not success:
+        return jsonify({"success": False, "message": message}), 502
+
+    # Do not hold a pooled database connection while the answer streams
+    db.session.close()
+
+    def generate():
+        parts = []
+        yield _sse({"sources": sources}, event="context")
+        try:
+            for text in deltas:
+                parts.append(text)
+                yield _sse({"delta": text})
+        except ValueError as e:
+            yield _sse({"success": False, "message": str(e)}, event="error")
+            return
+        except Exception as e:
+            traceback.print_exc()
+            yield _sse({"success": False, "message": f"An unexpected error occurred: {e}"}, event="error")
+            return
+
+        llm_service.save_streamed_exchange(user_id, user_message, ''.join(parts))
+        yield _sse({"success": True}, event="done")
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @llm_routes.route('/api/get_models', methods=['GET'])
 @login_required
 def get_llm_models():
@@ -50,14 +118,14 @@ def get_llm_models():
 @llm_routes.route('/api/get_history', methods=['GET'])
 @login_required
 def get_chat_history():
-    """API endpoint to fetch the current chat session's history."""
+    """API endpoint to fetch the current user's chat history."""
     history = llm_service.get_chat_history()
     return jsonify({"success": True, "history": history})
 
 @llm_routes.route('/api/clear_history', methods=['POST'])
 @login_required
 def clear_chat_history():
-    """API endpoint to clear the chat history from the session."""
+    """API endpoint to clear the current user's chat history."""
     llm_service.clear_chat_history()
     return jsonify({"success": True, "message": "Chat history cleared."})
 
@@ -241,6 +241,15 @@ def api_timeline_overview():
     return jsonify(timeline_data)
 
 
+@project_api_bp.route('/gantt', methods=['GET'])
+@login_required
+def api_gantt_data():
+    """API: Columnar milestone data for large Gantt charts (dates as epoch days)."""
+    start_year = request.args.get('start_year', type=int)
+    end_year = request.args.get('end_year', type=int)
+    return jsonify(project_service.get_gantt_data(start_year, end_year))
+
+
 @project_api_bp.route('/by-launch-year/<int:year>', methods=['GET'])
 @login_required
 def api_projects_by_launch_year(year):
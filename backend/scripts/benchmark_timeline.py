@@ -0,0 +1,305 @@
+"""
+Benchmark for PipelineTimelineService.get_timeline_data.
+
+Generates a synthetic portfolio (projects, drug substances, drug products and
+their links) at increasing scales in a local PostgreSQL database, times every
+configuration scenario at each scale and prints a report. With --output the
+report is saved as JSON; --compare prints the change against a saved report.
+
+Generated rows use the BENCH- prefix and are deleted afterwards unless --keep
+is given. Never point this at a production database.
+
+    python backend/scripts/benchmark_timeline.py --scales 1000,10000,100000
+    python backend/scripts/benchmark_timeline.py --output before.json
+    python backend/scripts/benchmark_timeline.py --compare before.json
+"""
+import sys
+import os
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, event, insert, select
+
+from backend.app import create_app
+from backend.db import db
+from backend.models import (Project, DrugSubstance, DrugProduct, Modality,
+                            project_drug_substances, project_drug_products,
+                            drug_substance_drug_products)
+from backend.services.pipeline_timeline_service import PipelineTimelineService
+
+PREFIX = 'BENCH-'
+INSERT_CHUNK = 5000
+LOCAL_HOSTS = {None, '', 'localhost', '127.0.0.1', '::1', 'db'}
+
+MOLECULE_TYPES = [
+    'ADC', 'Antibody', 'Gene therapy', 'Live Bacteria', 'Oncolytic virus', 'Peptide',
+    'PROTAC', 'Protein', 'Small molecule', 'Viral vaccine', None,
+]
+INDICATIONS = [f'Indication {i:02d}' for i in range(40)]
+PROJECT_TYPES = ['NME'] * 6 + ['NI', 'PMO', 'PED']
+STATUSES = ['active'] * 8 + ['on_hold', 'discontinued']
+MILESTONES = ['sod', 'dsmm3', 'dsmm4', 'dpmm3', 'dpmm4', 'rofd', 'submission', 'launch']
+
+
+# --- Synthetic portfolio ---
+
+def _insert_chunked(table, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(insert(table), rows[start:start + INSERT_CHUNK])
+
+
+def _milestone_dates(rng):
+    """Increasing milestone dates between 2015 and 2050."""
+    current = date(2015, 1, 1) + timedelta(days=rng.randint(0, 365 * 20))
+    dates = {}
+    for milestone in MILESTONES:
+        current += timedelta(days=rng.randint(60, 700))
+        dates[milestone] = current if rng.random() > 0.05 else None
+    return dates
+
+
+def generate_portfolio(start, end, rng):
+    """
+    Adds synthetic projects start..end-1 with 1-2 drug substances and 1-2
+    drug products each (about 0.6 substances and 1 product per project).
+    """
+    modality_ids = db.session.execute(select(Modality.modality_id)).scalars().all() or [None]
+    count = end - start
+
+    substances = [
+        {
+            'code': f'{PREFIX}DS-{i}',
+            'inn': f'Benchmab {i}',
+            'molecule_type': rng.choice(MOLECULE_TYPES),
+            'modality_id': rng.choice(modality_ids),
+        }
+        for i in range(start * 6 // 10, end * 6 // 10)
+    ]
+    products = [
+        {'code': f'{PREFIX}DP-{i}', 'pharm_form': rng.choice(['FC_Tablet', 'Sf_Injection', 'Capsule'])}
+        for i in range(start, end)
+    ]
+    projects = [
+        {
+            'name': f'{PREFIX}Project {i:06d}',
+            'indication': rng.choice(INDICATIONS),
+            'project_type': rng.choice(PROJECT_TYPES),
+            'status': rng.choice(STATUSES),
+            **_milestone_dates(rng),
+        }
+        for i in range(start, end)
+    ]
+    _insert_chunked(DrugSubstance.__table__, substances)
+    _insert_chunked(DrugProduct.__table__, products)
+    _insert_chunked(Project.__table__, projects)
+
+    ds_ids = _ids(DrugSubstance, DrugSubstance.code, [row['code'] for row in substances])
+    dp_ids = _ids(DrugProduct, DrugProduct.code, [row['code'] for row in products])
+    project_ids = _ids(Project, Project.name, [row['name'] for row in projects])
+
+    project_ds, project_dp, ds_dp = set(), set(), set()
+    for index, project_id in enumerate(project_ids):
+        for ds_id in rng.sample(ds_ids, min(len(ds_ids), rng.choice([1, 1, 2]))):
+            project_ds.add((project_id, ds_id))
+        for dp_id in {dp_ids[index], rng.choice(dp_ids)}:
+            project_dp.add((project_id, dp_id))
+            ds_dp.add((rng.choice(ds_ids), dp_id))
+
+    _insert_chunked(project_drug_substances, [
+        {'project_id': p, 'drug_substance_id': d} for p, d in project_ds
+    ])
+    _insert_chunked(project_drug_products, [
+        {'project_id': p, 'drug_product_id': d} for p, d in project_dp
+    ])
+    _insert_chunked(drug_substance_drug_products, [
+        {'drug_substance_id': s, 'drug_product_id': p} for s, p in ds_dp
+    ])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE projects, drug_substances, drug_products, project_drug_substances'))
+    db.session.commit()
+
+
+def _ids(model, key_column, keys):
+    ids = []
+    for start in range(0, len(keys), INSERT_CHUNK):
+        ids.extend(db.session.execute(
+            select(model.id).where(key_column.in_(keys[start:start + INSERT_CHUNK]))
+        ).scalars())
+    return ids
+
+
+def remove_portfolio():
+    """Deletes all generated rows (link tables cascade)."""
+    db.session.execute(delete(Project).where(Project.name.like(f'{PREFIX}%')))
+    db.session.execute(delete(DrugProduct).where(DrugProduct.code.like(f'{PREFIX}%')))
+    db.session.execute(delete(DrugSubstance).where(DrugSubstance.code.like(f'{PREFIX}%')))
+    db.session.commit()
+
+
+# --- Scenarios ---
+
+def scenarios():
+    """(name, config) pairs covering grouping modes, element types and presets."""
+    for grouping in ['modality', 'therapeutic_area', 'project_type', 'none']:
+        for element_type in ['project', 'modality']:
+            for preset in ['individual', 'grouped']:
+                yield f'{grouping}/{element_type}/{preset}', {
+                    'dateSource': 'launch',
+                    'groupingMode': grouping,
+                    'elementType': element_type,
+                    'yearSegmentPreset': preset,
+                    'filters': {'include_line_extensions': True, 'exclude_discontinued': True},
+                }
+    for granularity in ['quarter', 'month']:
+        yield f'modality/project/{granularity}', {
+            'dateSource': 'submission',
+            'groupingMode': 'modality',
+            'elementType': 'project',
+            'granularity': granularity,
+            'filters': {},
+        }
+    yield 'therapeutic_area/project/lazy', {
+        'dateSource': 'launch',
+        'groupingMode': 'therapeutic_area',
+        'elementType': 'project',
+        'lazyLanes': True,
+        'filters': {},
+    }
+
+
+class QueryCounter:
+    """Counts statements executed on the engine while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def run_scenario(config, repeat):
+    """Times get_timeline_data on a fresh session per run."""
+    service = PipelineTimelineService(db.session)
+    timings, queries, size = [], 0, 0
+    for _ in range(repeat):
+        db.session.remove()
+        with QueryCounter(db.engine) as counter:
+            started = time.perf_counter()
+            data = service.get_timeline_data(config)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = counter.count
+        size = len(json.dumps(data, default=str))
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'queries': queries,
+        'response_bytes': size,
+    }
+
+
+# --- Report ---
+
+def print_report(report, baseline=None):
+    for scale, results in report['results'].items():
+        print(f"\n=== {scale} projects ===")
+        print(f"{'scenario':<36} {'median ms':>10} {'min ms':>10} {'queries':>8} {'KB':>9}  change")
+        for name, result in results.items():
+            if 'error' in result:
+                print(f"{name:<36} ERROR: {result['error'].splitlines()[0]}")
+                continue
+            change = ''
+            previous = (baseline or {}).get('results', {}).get(scale, {}).get(name)
+            if previous and previous.get('median_ms'):
+                delta = (result['median_ms'] - previous['median_ms']) / previous['median_ms'] * 100
+                change = f"{delta:+.1f}%"
+            print(f"{name:<36} {result['median_ms']:>10.2f} {result['min_ms']:>10.2f} "
+                  f"{result['queries']:>8} {result['response_bytes'] / 1024:>9.1f}  {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline timeline service.')
+    parser.add_argument('--scales', default='1000,10000,100000',
+                        help='Comma-separated project counts (default: 1000,10000,100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario (default: 3)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generator')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--compare', help='Previous JSON report to compare medians against')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated rows')
+    parser.add_argument('--allow-remote', action='store_true',
+                        help='Allow a database host other than localhost')
+    args = parser.parse_args()
+
+    scales = sorted(int(value) for value in args.scales.split(','))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    app = create_app(init_session=False)
+    with app.app_context():
+        host = db.engine.url.host
+        if host not in LOCAL_HOSTS and not args.allow_remote:
+            print(f"Refusing to generate benchmark data on '{host}'. Use --allow-remote to override.")
+            sys.exit(1)
+
+        rng = random.Random(args.seed)
+        report = {
+            'generated_at': datetime.now().isoformat(),
+            'database': db.session.execute(db.text('SELECT version()')).scalar(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'results': {},
+        }
+
+        remove_portfolio()
+        generated = 0
+        try:
+            for scale in scales:
+                print(f"Generating portfolio up to {scale} projects...")
+                generate_portfolio(generated, scale, rng)
+                generated = scale
+
+                results = {}
+                for name, config in scenarios():
+                    try:
+                        results[name] = run_scenario(config, args.repeat)
+                        print(f"  {name}: {results[name]['median_ms']} ms")
+                    except Exception as e:
+                        # Record the failure and keep benchmarking the other scenarios
+                        db.session.rollback()
+                        results[name] = {'error': str(e)}
+                        print(f"  {name}: ERROR {e}")
+                report['results'][str(scale)] = results
+        finally:
+            db.session.remove()
+            if not args.keep:
+                print("Removing generated rows...")
+                remove_portfolio()
+
+        print_report(report, baseline)
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
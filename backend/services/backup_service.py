@@ -0,0 +1,196 @@
+# backend/services/backup_service.py
+"""
+Columnar backup format, an alternative to the JSON full-database backup.
+
+A backup is a ZIP archive with one deflate-compressed member per table in
+TABLE_IMPORT_ORDER plus a manifest:
+
+    manifest.json           format version, schema revision, per-table row counts
+    tables/<table>.json     {"columns": [...], "types": [...], "data": [[col values], ...]}
+
+Values are stored column by column with typed encodings: dates as ordinals,
+timestamps as UTC epoch microseconds, JSONB as native JSON. Restoring needs
+no per-row string parsing and the archive is much smaller than indented JSON.
+"""
+import datetime
+import json
+import traceback
+import zipfile
+
+from sqlalchemy import Date, DateTime, text
+
+from ..db import db
+from .data_management_service import (
+    TABLE_IMPORT_ORDER,
+    FULL_IMPORT_CHUNK_SIZE,
+    _copy_rows_into_table,
+    _truncate_tables_for_import,
+)
+
+COLUMNAR_FORMAT = 'pipeline_intelligence_columnar'
+COLUMNAR_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# Rows fetched per server-side cursor batch while exporting
+EXPORT_YIELD_PER = 1000
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _column_kind(column):
+    if isinstance(column.type, DateTime):
+        return 'datetime'
+    if isinstance(column.type, Date):
+        return 'date'
+    return 'raw'
+
+
+def _encode_value(kind, value):
+    if value is None or kind == 'raw':
+        return value
+    if kind == 'date':
+        return value.toordinal()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return (value - _EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _decode_value(kind, value):
+    if value is None or kind == 'raw':
+        return value
+    if kind == 'date':
+        return datetime.date.fromordinal(value)
+    return _EPOCH + datetime.timedelta(microseconds=value)
+
+
+def _current_schema_revision():
+    """Returns the Alembic revision of the database, if available."""
+    try:
+        return db.session.execute(text('SELECT version_num FROM alembic_version')).scalar()
+    except Exception:
+        db.session.rollback()
+        return None
+
+
+def export_columnar_backup(fileobj):
+    """
+    Writes a columnar backup of all tables into a binary file object.
+    Only one table is held in memory at a time.
+    """
+    manifest = {
+        'format': COLUMNAR_FORMAT,
+        'format_version': COLUMNAR_FORMAT_VERSION,
+        'version': '2.0',
+        'schema_revision': _current_schema_revision(),
+        'exported_at': datetime.datetime.now().isoformat(),
+        'tables': {},
+    }
+
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for table_name in TABLE_IMPORT_ORDER:
+            table = db.metadata.tables.get(table_name)
+            if table is None:
+                continue
+
+            columns = [c.name for c in table.columns]
+            kinds = [_column_kind(c) for c in table.columns]
+            data = [[] for _ in columns]
+
+            result = db.session.execute(
+                table.select(),
+                execution_options={'stream_results': True, 'yield_per': EXPORT_YIELD_PER}
+            )
+            row_count = 0
+            for partition in result.partitions():
+                for row in partition:
+                    for position, value in enumerate(row):
+                        data[position].append(_encode_value(kinds[position], value))
+                row_count += len(partition)
+
+            member = f"tables/{table_name}.json"
+            with archive.open(member, 'w') as handle:
+                handle.write(json.dumps(
+                    {'columns': columns, 'types': kinds, 'data': data},
+                    default=str, separators=(',', ':')
+                ).encode('utf-8'))
+
+            manifest['tables'][table_name] = {'file': member, 'rows': row_count}
+
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+
+    return manifest
+
+
+def import_columnar_backup(file_stream):
+    """
+    Wipes the current database and restores it from a columnar backup archive.
+    This is a destructive operation.
+    """
+    try:
+        with zipfile.ZipFile(file_stream) as archive:
+            try:
+                manifest = json.loads(archive.read(MANIFEST_NAME))
+            except KeyError:
+                return False, "Invalid backup file format. The archive has no manifest."
+
+            if manifest.get('format') != COLUMNAR_FORMAT:
+                return False, "Invalid backup file format. Not a columnar Pipeline Intelligence backup."
+            if manifest.get('format_version', 0) > COLUMNAR_FORMAT_VERSION:
+                return False, f"Unsupported columnar backup version {manifest.get('format_version')}."
+
+            tables = manifest.get('tables', {})
+            if not all(key in tables for key in ['users', 'modalities']):
+                return False, "Invalid backup file format. Essential tables (users, modalities) are missing."
+
+            _truncate_tables_for_import(tables)
+
+            for table_name in TABLE_IMPORT_ORDER:
+                if table_name not in tables:
+                    continue
+                payload = json.loads(archive.read(tables[table_name]['file']))
+                row_count = _restore_table(table_name, payload)
+
+                if row_count != tables[table_name]['rows']:
+                    raise ValueError(
+                        f"Row count mismatch for '{table_name}': "
+                        f"manifest says {tables[table_name]['rows']}, archive has {row_count}"
+                    )
+
+        db.session.commit()
+
+        db.session.execute(text('SET session_replication_role = DEFAULT;'))
+        db.session.commit()
+
+        return True, "Database successfully imported."
+
+    except Exception as e:
+        db.session.rollback()
+        try:
+            db.session.execute(text('SET session_replication_role = DEFAULT;'))
+            db.session.commit()
+        except:
+            pass
+
+        traceback.print_exc()
+        return False, f"An error occurred during import: {e}"
+
+
+def _restore_table(table_name, payload):
+    """Decodes one table's columns and loads them in chunks. Returns the row count."""
+    columns = payload['columns']
+    kinds = payload['types']
+    data = [
+        [_decode_value(kind, value) for value in values] if kind != 'raw' else values
+        for kind, values in zip(kinds, payload['data'])
+    ]
+
+    row_count = len(data[0]) if data else 0
+    for start in range(0, row_count, FULL_IMPORT_CHUNK_SIZE):
+        stop = min(start + FULL_IMPORT_CHUNK_SIZE, row_count)
+        rows = [
+            {column: data[position][i] for position, column in enumerate(columns)}
+            for i in range(start, stop)
+        ]
+        _copy_rows_into_table(table_name, rows)
+
+    return row_count
@@ -1,11 +1,16 @@
 # backend/services/data_management_service.py
+import io
 import json
 import traceback
 import difflib
 from collections import defaultdict
 from datetime import datetime, date
+from decimal import Decimal
 import re
-from sqlalchemy import text
+import ijson
+from sqlalchemy import text, func, select, tuple_
+from sqlalchemy.types import JSON
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 
 from ..db import db
@@ -52,6 +57,26 @@ TABLE_IMPORT_ORDER = [
     'product_regulatory_filings', 'product_manufacturing_suppliers'
 ]
 
+# Tables covered by delta exports: changed rows are found via updated_at/created_at
+# and deletions via the deleted_records tombstones (migration 006).
+DELTA_TABLES = [
+    'drug_substances',
+    'drug_products',
+    'projects',
+    'products',
+    'product_timelines',
+    'product_regulatory_filings',
+    'product_manufacturing_suppliers',
+]
+
+# Junction table → (parent table, parent column). A delta carries the full
+# link set of every changed parent, which replaces the parent's links on apply.
+DELTA_LINK_TABLES = {
+    'project_drug_substances': ('projects', 'project_id'),
+    'project_drug_products': ('projects', 'project_id'),
+    'drug_substance_drug_products': ('drug_products', 'drug_product_id'),
+}
+
 # A comprehensive map from table name string to its ORM Model class
 MODEL_MAP = {
     'users': User,
@@ -86,50 +111,104 @@ MODEL_MAP = {
 }
 
 
+# Rows sent per COPY batch during a full database import
+FULL_IMPORT_CHUNK_SIZE = 1000
+
+
 def import_full_database(file_stream):
     """
     Wipes the current database and imports data from a full backup JSON file.
     This is a destructive operation.
+
+    The backup is parsed incrementally with ijson and rows are loaded in
+    bounded chunks via COPY FROM STDIN, so memory stays flat regardless of
+    backup size. A first, cheap pass collects the table names so the file is
+    validated before anything is truncated.
     """
     try:
-        data = json.load(file_stream)
+        present_tables = _scan_backup_tables(file_stream)
 
         # Validate essential tables - 'products' is optional for new-style backups
-        if not all(key in data for key in ['users', 'modalities']):
+        if not all(key in present_tables for key in ['users', 'modalities']):
              return False, "Invalid backup file format. Essential tables (users, modalities) are missing."
 
-        db.session.execute(text('SET session_replication_role = replica;'))
+        file_stream.seek(0)
+
+        _truncate_tables_for_import(present_tables)
 
-        for table_name in reversed(TABLE_IMPORT_ORDER):
-            if table_name in data:
-                db.session.execute(text(f'TRUNCATE TABLE "{table_name}" RESTART IDENTITY CASCADE;'))
+        # FK triggers are disabled (replica role), so tables load in file order
+        chunk = []
+        chunk_table = None
+        for table_name, row in _iter_backup_rows(file_stream):
+            if table_name != chunk_table or len(chunk) >= FULL_IMPORT_CHUNK_SIZE:
+                _copy_rows_into_table(chunk_table, chunk)
+                chunk = []
+                chunk_table = table_name
+            chunk.append(row)
+        _copy_rows_into_table(chunk_table, chunk)
 
         db.session.commit()
 
-        for table_name in TABLE_IMPORT_ORDER:
-            if table_name in data and data[table_name]:
-                table_data = data[table_name]
+        db.session.execute(text('SET session_replication_role = DEFAULT;'))
+        db.session.commit()
+
+        return True, "Database successfully imported."
+
+    except Exception as e:
+        db.session.rollback()
+        try:
+            db.session.execute(text('SET session_replication_role = DEFAULT;'))
+            db.session.commit()
+        except:
+            pass
+
+        traceback.print_exc()
+        return False, f"An error occurred during import: {e}"
 
-                # Convert ISO date strings back to date objects
-                table_data = _convert_date_fields_for_import(table_name, table_data)
 
-                model_class = MODEL_MAP.get(table_name)
+def apply_delta(file_stream):
+    """
+    Applies a delta export (see export_service.export_delta) to this database:
+    upserts changed rows by primary key, replaces the link sets of changed
+    parents and deletes tombstoned rows, all in one transaction.
+    """
+    try:
+        delta = json.load(file_stream)
 
-                if model_class:
-                    db.session.bulk_insert_mappings(model_class, table_data)
-                else:
-                    table_obj = db.metadata.tables.get(table_name)
-                    if table_obj is not None:
-                        db.session.execute(table_obj.insert(), table_data)
-                    else:
-                        print(f"Warning: Could not find table or model for '{table_name}'. Skipping.")
+        if delta.get('_meta', {}).get('type') != 'delta':
+            return False, "Invalid delta file format. Missing delta metadata."
+
+        db.session.execute(text('SET session_replication_role = replica;'))
+
+        upserted = 0
+        for table_name in DELTA_TABLES:
+            rows = delta.get('tables', {}).get(table_name) or []
+            if rows:
+                _upsert_rows_by_primary_key(table_name, _convert_date_fields_for_import(table_name, rows))
+                upserted += len(rows)
+
+        for junction, links in delta.get('links', {}).items():
+            if junction not in DELTA_LINK_TABLES:
+                continue
+            table = db.metadata.tables[junction]
+            parent_column = table.c[DELTA_LINK_TABLES[junction][1]]
+            if links.get('parents'):
+                db.session.execute(table.delete().where(parent_column.in_(links['parents'])))
+            if links.get('rows'):
+                db.session.execute(pg_insert(table).on_conflict_do_nothing(), links['rows'])
+
+        deleted = 0
+        for table_name, record_ids in delta.get('tombstones', {}).items():
+            if table_name not in DELTA_TABLES or not record_ids:
+                continue
+            deleted += _delete_with_cascade(db.metadata.tables[table_name], record_ids)
 
         db.session.commit()
 
         db.session.execute(text('SET session_replication_role = DEFAULT;'))
         db.session.commit()
 
-        return True, "Database successfully imported."
+        return True, f"Delta applied: {upserted} rows upserted, {deleted} rows deleted."
 
     except Exception as e:
         db.session.rollback()
@@ -140,14 +219,398 @@ def import_full_database(file_stream):
             pass
 
         traceback.print_exc()
-        return False, f"An error occurred during import: {e}"
+        return False, f"An error occurred while applying the delta: {e}"
+
+
+def _delete_with_cascade(table, record_ids):
+    """
+    Deletes rows by primary key together with their ON DELETE CASCADE
+    children (e.g. junction rows). Under session_replication_role = replica
+    the FK triggers that would cascade do not fire, so children are deleted
+    explicitly, depth first.
+
+    Returns:
+        Number of rows deleted from table itself
+    """
+    pk_column = next(iter(table.primary_key.columns))
+
+    for child in db.metadata.tables.values():
+        for fk in child.foreign_keys:
+            if fk.column is not pk_column or (fk.ondelete or '').upper() != 'CASCADE':
+                continue
+            child_pk = list(child.primary_key.columns)
+            if len(child_pk) == 1:
+                child_ids = db.session.execute(
+                    select(child_pk[0]).where(fk.parent.in_(record_ids))
+                ).scalars().all()
+                if child_ids:
+                    _delete_with_cascade(child, child_ids)
+            else:
+                db.session.execute(child.delete().where(fk.parent.in_(record_ids)))
+
+    return db.session.execute(table.delete().where(pk_column.in_(record_ids))).rowcount
+
+
+def _upsert_rows_by_primary_key(table_name, rows):
+    """INSERT ... ON CONFLICT (pk) DO UPDATE for full rows of one table."""
+    table = db.metadata.tables[table_name]
+    pk_column = next(iter(table.primary_key.columns))
+
+    rows_by_columns = defaultdict(list)
+    for row in rows:
+        rows_by_columns[tuple(c for c in row if c in table.c)].append(row)
+
+    for columns, column_rows in rows_by_columns.items():
+        stmt = pg_insert(table)
+        update_set = {name: stmt.excluded[name] for name in columns if name != pk_column.name}
+        if update_set:
+            stmt = stmt.on_conflict_do_update(index_elements=[pk_column], set_=update_set)
+        else:
+            stmt = stmt.on_conflict_do_nothing()
+        db.session.execute(stmt, [{c: row.get(c) for c in columns} for row in column_rows])
+
+
+def _truncate_tables_for_import(present_tables):
+    """
+    Disables FK triggers for this session and truncates every table that is
+    about to be restored. Callers reset session_replication_role when done.
+    """
+    db.session.execute(text('SET session_replication_role = replica;'))
+
+    for table_name in reversed(TABLE_IMPORT_ORDER):
+        if table_name in present_tables:
+            db.session.execute(text(f'TRUNCATE TABLE "{table_name}" RESTART IDENTITY CASCADE;'))
+
+    db.session.commit()
+
+
+def _scan_backup_tables(file_stream):
+    """Returns the top-level table names of a backup without building any rows."""
+    return {
+        value for prefix, event, value in ijson.parse(file_stream)
+        if prefix == '' and event == 'map_key' and value != '_meta'
+    }
+
+
+def _iter_backup_rows(file_stream):
+    """
+    Yields (table_name, row_dict) for every row of a backup, one row at a time.
+    Only known tables are yielded; '_meta' and unknown keys are skipped.
+    """
+    table_name = None
+    item_prefix = None
+    builder = None
+
+    for prefix, event, value in ijson.parse(file_stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item_prefix and event == 'end_map':
+                yield table_name, builder.value
+                builder = None
+        elif prefix == '' and event == 'map_key':
+            table_name = value
+            item_prefix = f"{value}.item"
+            if table_name != '_meta' and table_name not in TABLE_IMPORT_ORDER:
+                print(f"Warning: Could not find table or model for '{table_name}'. Skipping.")
+        elif prefix == item_prefix and event == 'start_map' and table_name in TABLE_IMPORT_ORDER:
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+
+
+def _copy_rows_into_table(table_name, rows):
+    """Loads one chunk of backup rows into a table using COPY FROM STDIN."""
+    if not rows:
+        return
+
+    table_obj = db.metadata.tables.get(table_name)
+    if table_obj is None:
+        print(f"Warning: Could not find table or model for '{table_name}'. Skipping.")
+        return
+
+    # COPY needs one column list per statement
+    rows_by_columns = defaultdict(list)
+    for row in rows:
+        columns = tuple(c for c in row if c in table_obj.c)
+        rows_by_columns[columns].append(row)
+
+    with db.session.connection().connection.cursor() as cursor:
+        for columns, column_rows in rows_by_columns.items():
+            if not columns:
+                continue
+
+            if not hasattr(cursor, 'copy_expert'):
+                # Non-psycopg2 driver: plain executemany with parsed dates
+                column_rows = _convert_date_fields_for_import(table_name, column_rows)
+                db.session.execute(table_obj.insert(), column_rows)
+                continue
+
+            column_objs = [table_obj.c[c] for c in columns]
+            buffer = io.StringIO()
+            for row in column_rows:
+                buffer.write('\t'.join(_copy_text_value(row.get(c.name), c) for c in column_objs))
+                buffer.write('\n')
+            buffer.seek(0)
+
+            column_sql = ', '.join(f'"{c}"' for c in columns)
+            cursor.copy_expert(f'COPY "{table_name}" ({column_sql}) FROM STDIN', buffer)
+
+
+def _copy_text_value(value, column):
+    """
+    Encodes a JSON value for COPY text format into the given column. Every
+    non-null value of a JSON/JSONB column is JSON-encoded (string scalars
+    included); ISO date strings are passed through as-is since PostgreSQL
+    parses them directly.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(column.type, JSON):
+        value = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, bool):
+        return 'true' if value else 'false'
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+# --- Import Diff Engine ---
+
+# Import items diffed per database round trip
+DIFF_BATCH_SIZE = 1000
+
+
+def _normalize_text_value(value):
+    return None if value is None or value == '' else str(value)
+
+
+def _normalize_int_value(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _normalize_float_value(value):
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _normalize_bool_value(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def _normalize_date_value(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    return _parse_date(value) or value
+
+
+def _normalize_datetime_value(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _normalize_json_value(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _column_normalizer(column):
+    """
+    Picks the function that maps both the database value and the JSON value
+    of a column onto one comparable form. Chosen once per column.
+    """
+    if isinstance(column.type, JSON):
+        return _normalize_json_value
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return _normalize_text_value
+
+    # Order matters: bool is an int, datetime is a date
+    if python_type is bool:
+        return _normalize_bool_value
+    if python_type is datetime:
+        return _normalize_datetime_value
+    if python_type is date:
+        return _normalize_date_value
+    if python_type is int:
+        return _normalize_int_value
+    if python_type in (float, Decimal):
+        return _normalize_float_value
+    return _normalize_text_value
+
+
+class ImportDiffEngine:
+    """
+    Diffs import items against existing rows without loading ORM objects.
+
+    Only the key columns, the primary key and the columns that occur in the
+    items are fetched, as plain tuples. Database values are normalized once
+    when loaded, so each comparison is a single normalizer call plus ==.
+    """
+
+    def __init__(self, model_class, key_fields, fields):
+        table = model_class.__table__
+        self.key_fields = list(key_fields)
+        self.pk_column = next(iter(table.primary_key.columns))
+        self.fields = [
+            name for name in dict.fromkeys(fields)
+            if name in table.c and not name.startswith('_')
+            and name not in self.key_fields and name != self.pk_column.name
+        ]
+        self.key_columns = [table.c[name] for name in self.key_fields]
+        self.columns = [table.c[name] for name in self.fields]
+        self.normalizers = [_column_normalizer(column) for column in self.columns]
+        self.positions = {name: i for i, name in enumerate(self.fields)}
+        self.rows = {}  # key -> (pk, raw values, normalized values)
+
+    def load(self, keys):
+        """Fetches the existing rows for the given keys (tuples for composite keys)."""
+        keys = list(dict.fromkeys(keys))
+        key_count = len(self.key_columns)
+        key_expr = self.key_columns[0] if key_count == 1 else tuple_(*self.key_columns)
+        normalizers = self.normalizers
+
+        for start in range(0, len(keys), DIFF_BATCH_SIZE):
+            query = (
+                select(*self.key_columns, self.pk_column, *self.columns)
+                .where(key_expr.in_(keys[start:start + DIFF_BATCH_SIZE]))
+            )
+            for row in db.session.execute(query):
+                key = row[0] if key_count == 1 else tuple(row[:key_count])
+                raw = tuple(row[key_count + 1:])
+                self.rows[key] = (
+                    row[key_count],
+                    raw,
+                    tuple(normalize(value) for normalize, value in zip(normalizers, raw))
+                )
+
+    def exists(self, key):
+        return key in self.rows
+
+    def diff(self, key, item):
+        """Returns {field: {'old', 'new'}} for the fields of item that differ from the row."""
+        _, raw, normalized = self.rows[key]
+        changes = {}
+        for field, new_value in item.items():
+            i = self.positions.get(field)
+            if i is not None and self.normalizers[i](new_value) != normalized[i]:
+                changes[field] = {'old': raw[i], 'new': new_value}
+        return changes
+
+    def db_item(self, key, fields=None):
+        """Builds the db_item dict of a loaded row, on demand."""
+        pk, raw, _ = self.rows[key]
+        key_values = key if len(self.key_fields) > 1 else (key,)
+        db_item = {self.pk_column.name: pk}
+        db_item.update(zip(self.key_fields, key_values))
+        for name in fields or self.fields:
+            if name in self.positions:
+                db_item[name] = raw[self.positions[name]]
+        return db_item
 
 
 def analyze_json_import(json_data: list, model_class, unique_key_field: str):
     """
     Analyzes a list of JSON objects against existing data in the database.
     This function performs the comparison and generates a detailed preview.
+
+    Items are diffed per batch with ImportDiffEngine; db_item is only built
+    for items that have changes.
+    """
+    if model_class == Product:
+        return _analyze_product_json_import(json_data, unique_key_field)
+
+    preview_data = []
+    try:
+        for start in range(0, len(json_data), DIFF_BATCH_SIZE):
+            batch = json_data[start:start + DIFF_BATCH_SIZE]
+
+            fields = {key for json_item in batch for key in json_item}
+            diff_engine = ImportDiffEngine(model_class, [unique_key_field], fields)
+            diff_engine.load(
+                json_item.get(unique_key_field) for json_item in batch
+                if json_item.get(unique_key_field)
+            )
+
+            for json_item in batch:
+                entry = {
+                    'status': 'error',
+                    'action': 'skip',
+                    'identifier': None,
+                    'json_item': json_item,
+                    'db_item': None,
+                    'diff': {},
+                    'messages': []
+                }
+                identifier = json_item.get(unique_key_field)
+                entry['identifier'] = identifier
+
+                if not identifier:
+                    entry['messages'].append(f"Skipped: Item is missing the unique identifier field '{unique_key_field}'.")
+                    preview_data.append(entry)
+                    continue
+
+                if diff_engine.exists(identifier):
+                    entry['diff'] = diff_engine.diff(identifier, json_item)
+
+                    if entry['diff']:
+                        entry['db_item'] = diff_engine.db_item(identifier)
+                        entry['status'] = 'update'
+                        entry['action'] = 'update'
+                        entry['messages'].append(f"Item exists. Proposed changes: {len(entry['diff'])} field(s).")
+                    else:
+                        entry['status'] = 'no_change'
+                        entry['action'] = 'skip'
+                        entry['messages'].append("Item already exists and matches the database.")
+                else:
+                    entry['status'] = 'new'
+                    entry['action'] = 'add'
+                    entry['messages'].append("This is a new item that will be created.")
+
+                preview_data.append(entry)
+
+        return {"success": True, "preview_data": preview_data}
+    except Exception as e:
+        traceback.print_exc()
+        return {"success": False, "message": f"An unexpected analysis error occurred: {e}"}
+
+
+def _analyze_product_json_import(json_data: list, unique_key_field: str):
+    """
+    Product variant of analyze_json_import. Products are compared on ORM
+    attributes (see _enhanced_field_comparison), not only on table columns.
     """
+    model_class = Product
     preview_data = []
     try:
         existing_items_query = model_class.query.all()
@@ -180,16 +643,8 @@ def analyze_json_import(json_data: list, model_class, unique_key_field: str):
                     if not c.name.startswith('_')
                 }
 
-                if model_class == Product:
-                    fields_to_check = [key for key in json_item.keys() if hasattr(existing_item, key)]
-                    entry['diff'] = _enhanced_field_comparison(existing_item, json_item, fields_to_check)
-                else:
-                    entry['diff'] = {}
-                    for key, new_value in json_item.items():
-                        if hasattr(existing_item, key):
-                            old_value = getattr(existing_item, key)
-                            if str(old_value or '') != str(new_value or ''):
-                                entry['diff'][key] = {'old': old_value, 'new': new_value}
+                fields_to_check = [key for key in json_item.keys() if hasattr(existing_item, key)]
+                entry['diff'] = _enhanced_field_comparison(existing_item, json_item, fields_to_check)
 
                 is_dirty = bool(entry['diff'])
 
@@ -233,6 +688,9 @@ def analyze_json_import_with_resolution(json_data: list, model_class, unique_key
                 for entity in entities
             }
 
+        # Built lazily, once per field, and shared by every missing value
+        fuzzy_indexes = {}
+
         for json_item in json_data:
             entry = {
                 'status': 'pending_resolution',
@@ -254,9 +712,11 @@ def analyze_json_import_with_resolution(json_data: list, model_class, unique_key
                         if lookup_value not in suggestions.get(field_name, {}):
                             if field_name not in suggestions:
                                 suggestions[field_name] = {}
+                            if field_name not in fuzzy_indexes:
+                                fuzzy_indexes[field_name] = FuzzyMatchIndex(existing_entities[field_name])
                             suggestions[field_name][lookup_value] = generate_suggestions(
                                 lookup_value,
-                                list(existing_entities[field_name].keys())
+                                fuzzy_indexes[field_name]
                             )
 
                         entry['missing_foreign_keys'][field_name] = lookup_value
@@ -302,59 +762,208 @@ def get_foreign_key_fields(model_class):
     return mappings.get(model_class, {})
 
 
+class FuzzyMatchIndex:
+    """
+    Trigram index over entity names for generate_suggestions.
+
+    Names sharing no trigram with the missing value are never scored; the
+    remaining ones are pre-ranked by shared trigrams and only the best
+    MAX_CANDIDATES go through SequenceMatcher. Build one per import (or per
+    lookup, see ImportResolutionIndex.fuzzy) and reuse it for every missing key.
+    """
+
+    MAX_CANDIDATES = 25
+
+    def __init__(self, values):
+        self.values = [value for value in dict.fromkeys(values) if isinstance(value, str)]
+        self._lowered = [value.lower() for value in self.values]
+        self._postings = defaultdict(list)
+        for position, lowered in enumerate(self._lowered):
+            for gram in self._trigrams(lowered):
+                self._postings[gram].append(position)
+
+    @staticmethod
+    def _trigrams(lowered):
+        padded = f"  {lowered} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def suggest(self, missing_value, max_suggestions=3, cutoff=0.6):
+        """Returns suggestions in the generate_suggestions format, best first."""
+        if not isinstance(missing_value, str) or not self.values:
+            return []
+        target = missing_value.lower()
+
+        shared = defaultdict(int)
+        for gram in self._trigrams(target):
+            for position in self._postings.get(gram, ()):
+                shared[position] += 1
+        candidates = sorted(shared, key=lambda position: (-shared[position], position))[:self.MAX_CANDIDATES]
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(target)
+        scored = []
+        for position in candidates:
+            matcher.set_seq1(self._lowered[position])
+            if (matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff):
+                similarity = matcher.ratio()
+                if similarity >= cutoff:
+                    scored.append((similarity, position))
+
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return [
+            {
+                'value': self.values[position],
+                'similarity': similarity,
+                'reason': f"{similarity:.0%} match"
+            }
+            for similarity, position in scored[:max_suggestions]
+        ]
+
+
 def generate_suggestions(missing_value, existing_values, max_suggestions=3):
     """
     Generate smart suggestions for missing foreign key values.
+    existing_values is a list of names or a prebuilt FuzzyMatchIndex.
     """
-    suggestions = []
+    if not isinstance(existing_values, FuzzyMatchIndex):
+        existing_values = FuzzyMatchIndex(existing_values)
+    return existing_values.suggest(missing_value, max_suggestions=max_suggestions)
 
-    matches = difflib.get_close_matches(
-        missing_value,
-        existing_values,
-        n=max_suggestions,
-        cutoff=0.6
-    )
 
-    for match in matches:
-        similarity = difflib.SequenceMatcher(None, missing_value.lower(), match.lower()).ratio()
-        suggestions.append({
-            'value': match,
-            'similarity': similarity,
-            'reason': f"{similarity:.0%} match"
-        })
+class ImportResolutionIndex:
+    """
+    Import-scoped name/code → id lookups shared by the foreign key resolvers
+    and the _link_* helpers.
 
-    return suggestions
+    Each lookup is loaded with one query on first use and kept current through
+    record() as rows are inserted, so resolving a reference is a dict lookup.
+    """
 
+    # model → (lookup field, id field, extra fields kept per row)
+    LOOKUPS = {
+        Modality: ('modality_name', 'modality_id', ()),
+        ProcessTemplate: ('template_name', 'template_id', ('modality_id',)),
+        ProcessStage: ('stage_name', 'stage_id', ()),
+        Product: ('product_code', 'product_id', ('is_nme', 'parent_product_id', 'launch_sequence')),
+        ValueStep: ('name', 'id', ()),
+        Challenge: ('name', 'id', ()),
+        DrugSubstance: ('code', 'id', ()),
+        DrugProduct: ('code', 'id', ()),
+    }
 
-def _resolve_foreign_keys_for_process_stage(item, existing_stages):
+    def __init__(self):
+        self._rows = {}
+        self._fuzzy = {}
+        self._launch_sequences = None
+
+    def _lookup(self, model):
+        rows = self._rows.get(model)
+        if rows is None:
+            key_field, id_field, extra_fields = self.LOOKUPS[model]
+            query = db.session.query(
+                getattr(model, key_field),
+                getattr(model, id_field),
+                *[getattr(model, field) for field in extra_fields]
+            ).order_by(getattr(model, id_field))
+
+            rows = {}
+            for key, row_id, *extras in query:
+                # Keep the first match, like filter_by(...).first() did
+                rows.setdefault(key, {'id': row_id, **dict(zip(extra_fields, extras))})
+            self._rows[model] = rows
+        return rows
+
+    def get(self, model, key):
+        """Returns {'id': ..., <extra fields>} for the key, or None."""
+        return self._lookup(model).get(key)
+
+    def get_id(self, model, key):
+        row = self.get(model, key)
+        return row['id'] if row else None
+
+    def keys(self, model):
+        return list(self._lookup(model))
+
+    def fuzzy(self, model):
+        """FuzzyMatchIndex over the lookup keys, rebuilt after new keys are recorded."""
+        fuzzy = self._fuzzy.get(model)
+        if fuzzy is None:
+            fuzzy = self._fuzzy[model] = FuzzyMatchIndex(self._lookup(model))
+        return fuzzy
+
+    def key_for_id(self, model, row_id):
+        return next((key for key, row in self._lookup(model).items() if row['id'] == row_id), None)
+
+    def record(self, model, values, row_id):
+        """Registers an inserted or updated row given its column values."""
+        if model not in self.LOOKUPS or model not in self._rows:
+            return
+        key_field, _, extra_fields = self.LOOKUPS[model]
+        key = values.get(key_field)
+        if key is None or row_id is None:
+            return
+
+        if key not in self._rows[model]:
+            self._fuzzy.pop(model, None)
+        row = self._rows[model].setdefault(key, {})
+        row['id'] = row_id
+        row.update({field: values[field] for field in extra_fields if field in values})
+
+        if model is Product and self._launch_sequences is not None and row.get('parent_product_id'):
+            parent_id = row['parent_product_id']
+            self._launch_sequences[parent_id] = max(
+                self._launch_sequences.get(parent_id, 0), row.get('launch_sequence') or 0
+            )
+
+    def record_instance(self, obj):
+        """Registers a flushed ORM instance."""
+        model = type(obj)
+        if model not in self.LOOKUPS:
+            return
+        key_field, id_field, extra_fields = self.LOOKUPS[model]
+        values = {field: getattr(obj, field) for field in (key_field, *extra_fields)}
+        self.record(model, values, getattr(obj, id_field))
+
+    def next_launch_sequence(self, parent_product_id):
+        """Next launch_sequence for a Line-Extension of the given parent."""
+        if self._launch_sequences is None:
+            self._launch_sequences = {}
+            for row in self._lookup(Product).values():
+                parent_id = row.get('parent_product_id')
+                if parent_id:
+                    self._launch_sequences[parent_id] = max(
+                        self._launch_sequences.get(parent_id, 0), row.get('launch_sequence') or 0
+                    )
+        return max(self._launch_sequences.get(parent_product_id, 0), 1) + 1
+
+
+def _resolve_foreign_keys_for_process_stage(item, index=None):
     """
     Resolves foreign keys for process stages.
     Converts parent_stage_name to parent_stage_id.
     """
-    from ..models import ProcessStage
-
+    index = index or ImportResolutionIndex()
     resolved_item = item.copy()
 
     if 'parent_stage_name' in resolved_item:
         parent_stage_name = resolved_item.pop('parent_stage_name')
         if parent_stage_name:
-            parent = ProcessStage.query.filter_by(stage_name=parent_stage_name).first()
-            if parent:
-                resolved_item['parent_stage_id'] = parent.stage_id
+            parent_id = index.get_id(ProcessStage, parent_stage_name)
+            if parent_id:
+                resolved_item['parent_stage_id'] = parent_id
             else:
                 raise ValueError(f"Parent stage '{parent_stage_name}' not found. Make sure parent stages are imported before child stages.")
 
     return resolved_item
 
 
-def _resolve_foreign_keys_for_product(item, existing_products):
+def _resolve_foreign_keys_for_product(item, index=None):
     """
     Resolves foreign key references in a product record by name.
 
     SIMPLIFIED: No longer handles technology or challenge links (schema simplified).
     """
-    from ..models import Modality, ProcessTemplate, Product
-
+    index = index or ImportResolutionIndex()
     resolved = item.copy()
     warnings = []
 
@@ -362,10 +971,10 @@ def _resolve_foreign_keys_for_product(item, existing_products):
     if 'modality_name' in resolved:
         modality_name = resolved.pop('modality_name')
         if modality_name:
-            modality = Modality.query.filter_by(modality_name=modality_name).first()
-            if modality:
-                resolved['modality_id'] = modality.modality_id
-                print(f"  ✓ Resolved modality '{modality_name}' → ID {modality.modality_id}")
+            modality_id = index.get_id(Modality, modality_name)
+            if modality_id:
+                resolved['modality_id'] = modality_id
+                print(f"  ✓ Resolved modality '{modality_name}' → ID {modality_id}")
             else:
                 warnings.append(f"Modality '{modality_name}' not found")
 
@@ -373,54 +982,38 @@ def _resolve_foreign_keys_for_product(item, existing_products):
     if 'process_template_name' in resolved:
         template_name = resolved.pop('process_template_name')
         if template_name:
-            template = ProcessTemplate.query.filter_by(template_name=template_name).first()
+            template = index.get(ProcessTemplate, template_name)
             if template:
-                if 'modality_id' in resolved and template.modality_id != resolved['modality_id']:
-                    modality = Modality.query.get(resolved['modality_id'])
+                if 'modality_id' in resolved and template['modality_id'] != resolved['modality_id']:
+                    modality_name = index.key_for_id(Modality, resolved['modality_id'])
                     warnings.append(
                         f"Template '{template_name}' does not match modality "
-                        f"'{modality.modality_name if modality else 'Unknown'}'"
+                        f"'{modality_name or 'Unknown'}'"
                     )
                 else:
-                    resolved['process_template_id'] = template.template_id
-                    print(f"  ✓ Resolved template '{template_name}' → ID {template.template_id}")
+                    resolved['process_template_id'] = template['id']
+                    print(f"  ✓ Resolved template '{template_name}' → ID {template['id']}")
             else:
-                available_templates = [t.template_name for t in ProcessTemplate.query.all()]
+                available_templates = index.keys(ProcessTemplate)
                 warnings.append(f"Process template '{template_name}' not found. Available: {available_templates}")
 
     # 3. Resolve parent_product_code → parent_product_id
+    # Products inserted earlier in this import are registered in the index.
     if 'parent_product_code' in resolved:
         parent_code = resolved.pop('parent_product_code')
         if parent_code:
-            parent = Product.query.filter_by(product_code=parent_code).first()
-
-            if not parent:
-                for obj in db.session.identity_map.values():
-                    if isinstance(obj, Product) and obj.product_code == parent_code:
-                        parent = obj
-                        break
-
-                if not parent:
-                    for obj in db.session.new:
-                        if isinstance(obj, Product) and obj.product_code == parent_code:
-                            parent = obj
-                            break
-
+            parent = index.get(Product, parent_code)
             if parent:
-                if not parent.is_nme:
+                if not parent['is_nme']:
                     warnings.append(
                         f"Parent product '{parent_code}' is not an NME. "
                         f"Line-Extensions should reference NME products."
                     )
                 else:
-                    resolved['parent_product_id'] = parent.product_id
-                    print(f"  ✓ Resolved parent '{parent_code}' → ID {parent.product_id}")
+                    resolved['parent_product_id'] = parent['id']
+                    print(f"  ✓ Resolved parent '{parent_code}' → ID {parent['id']}")
             else:
-                found_in_list = next((p for p in existing_products if p.product_code == parent_code), None)
-                if found_in_list:
-                    resolved['parent_product_id'] = found_in_list.product_id
-                else:
-                    warnings.append(f"Parent product '{parent_code}' not found.")
+                warnings.append(f"Parent product '{parent_code}' not found.")
 
     # 4. Validate Line-Extension logic
     if resolved.get('is_line_extension'):
@@ -432,17 +1025,7 @@ def _resolve_foreign_keys_for_product(item, existing_products):
     # 5. Auto-calculate launch_sequence if not provided
     if resolved.get('is_line_extension') and resolved.get('parent_product_id'):
         if 'launch_sequence' not in resolved or not resolved['launch_sequence']:
-            db_max = db.session.query(db.func.max(Product.launch_sequence)).filter_by(
-                parent_product_id=resolved['parent_product_id']
-            ).scalar() or 1
-
-            session_max = 0
-            for obj in db.session.identity_map.values():
-                if isinstance(obj, Product) and obj.parent_product_id == resolved['parent_product_id']:
-                    if obj.launch_sequence and obj.launch_sequence > session_max:
-                        session_max = obj.launch_sequence
-
-            resolved['launch_sequence'] = max(db_max, session_max) + 1
+            resolved['launch_sequence'] = index.next_launch_sequence(resolved['parent_product_id'])
 
     # Remove any obsolete fields that might be in old JSON imports
     for obsolete_field in ['technology_names', 'explicit_challenges', 'excluded_challenges']:
@@ -454,13 +1037,12 @@ def _resolve_foreign_keys_for_product(item, existing_products):
     return resolved
 
 
-def _resolve_foreign_keys_for_challenge(item, existing_challenges):
+def _resolve_foreign_keys_for_challenge(item, index=None):
     """
     Resolves foreign key references in a Challenge record.
     Converts value_step (string name) → value_step_id (FK).
     """
-    from ..models import ValueStep
-
+    index = index or ImportResolutionIndex()
     resolved = item.copy()
     warnings = []
 
@@ -468,20 +1050,18 @@ def _resolve_foreign_keys_for_challenge(item, existing_challenges):
     if 'value_step' in resolved:
         value_step_name = resolved.pop('value_step')
         if value_step_name:
-            vs = ValueStep.query.filter_by(name=value_step_name).first()
-            if vs:
-                resolved['value_step_id'] = vs.id
-                print(f"  ✓ Resolved value_step '{value_step_name}' → ID {vs.id}")
+            value_step_id = index.get_id(ValueStep, value_step_name)
+            if value_step_id:
+                resolved['value_step_id'] = value_step_id
+                print(f"  ✓ Resolved value_step '{value_step_name}' → ID {value_step_id}")
             else:
                 # Try fuzzy matching
-                all_steps = ValueStep.query.all()
-                step_names = [s.name for s in all_steps]
-                suggestions = generate_suggestions(value_step_name, step_names, max_suggestions=3)
+                suggestions = generate_suggestions(value_step_name, index.fuzzy(ValueStep), max_suggestions=3)
                 if suggestions:
                     suggestion_str = ", ".join([s['value'] for s in suggestions])
                     warnings.append(f"Value step '{value_step_name}' not found. Did you mean: {suggestion_str}?")
                 else:
-                    warnings.append(f"Value step '{value_step_name}' not found. Available: {', '.join(step_names)}")
+                    warnings.append(f"Value step '{value_step_name}' not found. Available: {', '.join(index.keys(ValueStep))}")
 
     if warnings:
         resolved['_warnings'] = warnings
@@ -489,13 +1069,12 @@ def _resolve_foreign_keys_for_challenge(item, existing_challenges):
     return resolved
 
 
-def _resolve_foreign_keys_for_challenge_modality_detail(item, existing_details):
+def _resolve_foreign_keys_for_challenge_modality_detail(item, index=None):
     """
     Resolves foreign key references in a ChallengeModalityDetail record.
     Converts challenge_name → challenge_id and modality_name → modality_id.
     """
-    from ..models import Challenge, Modality
-
+    index = index or ImportResolutionIndex()
     resolved = item.copy()
     warnings = []
 
@@ -503,10 +1082,10 @@ def _resolve_foreign_keys_for_challenge_modality_detail(item, existing_details):
     if 'challenge_name' in resolved:
         challenge_name = resolved.pop('challenge_name')
         if challenge_name:
-            challenge = Challenge.query.filter_by(name=challenge_name).first()
-            if challenge:
-                resolved['challenge_id'] = challenge.id
-                print(f"  ✓ Resolved challenge '{challenge_name}' → ID {challenge.id}")
+            challenge_id = index.get_id(Challenge, challenge_name)
+            if challenge_id:
+                resolved['challenge_id'] = challenge_id
+                print(f"  ✓ Resolved challenge '{challenge_name}' → ID {challenge_id}")
             else:
                 warnings.append(f"Challenge '{challenge_name}' not found")
 
@@ -514,10 +1093,10 @@ def _resolve_foreign_keys_for_challenge_modality_detail(item, existing_details):
     if 'modality_name' in resolved:
         modality_name = resolved.pop('modality_name')
         if modality_name:
-            modality = Modality.query.filter_by(modality_name=modality_name).first()
-            if modality:
-                resolved['modality_id'] = modality.modality_id
-                print(f"  ✓ Resolved modality '{modality_name}' → ID {modality.modality_id}")
+            modality_id = index.get_id(Modality, modality_name)
+            if modality_id:
+                resolved['modality_id'] = modality_id
+                print(f"  ✓ Resolved modality '{modality_name}' → ID {modality_id}")
             else:
                 warnings.append(f"Modality '{modality_name}' not found")
 
@@ -533,13 +1112,12 @@ def _resolve_foreign_keys_for_challenge_modality_detail(item, existing_details):
     return resolved
 
 
-def _resolve_foreign_keys_for_drug_substance(item, existing_substances):
+def _resolve_foreign_keys_for_drug_substance(item, index=None):
     """
     Resolves foreign key references in a DrugSubstance record.
     Converts modality_name → modality_id.
     """
-    from ..models import Modality
-
+    index = index or ImportResolutionIndex()
     resolved = item.copy()
     warnings = []
 
@@ -547,10 +1125,10 @@ def _resolve_foreign_keys_for_drug_substance(item, existing_substances):
     if 'modality_name' in resolved:
         modality_name = resolved.pop('modality_name')
         if modality_name:
-            modality = Modality.query.filter_by(modality_name=modality_name).first()
-            if modality:
-                resolved['modality_id'] = modality.modality_id
-                print(f"  ✓ Resolved modality '{modality_name}' → ID {modality.modality_id}")
+            modality_id = index.get_id(Modality, modality_name)
+            if modality_id:
+                resolved['modality_id'] = modality_id
+                print(f"  ✓ Resolved modality '{modality_name}' → ID {modality_id}")
             else:
                 warnings.append(f"Modality '{modality_name}' not found")
 
@@ -560,11 +1138,12 @@ def _resolve_foreign_keys_for_drug_substance(item, existing_substances):
     return resolved
 
 
-def _resolve_foreign_keys_for_drug_product(item, existing_products):
+def _resolve_foreign_keys_for_drug_product(item, index=None):
     """
     Resolves foreign key references in a DrugProduct record.
     DrugProduct has no direct FKs, but we handle M:N links via drug_substance_codes.
     """
+    index = index or ImportResolutionIndex()
     resolved = item.copy()
     warnings = []
 
@@ -572,13 +1151,8 @@ def _resolve_foreign_keys_for_drug_product(item, existing_products):
     # We just preserve them here for the finalize step
     if 'drug_substance_codes' in resolved:
         # Keep for post-processing, but flag if substances don't exist
-        from ..models import DrugSubstance
-        codes = resolved.get('drug_substance_codes', [])
-        if isinstance(codes, str):
-            codes = [c.strip() for c in codes.split(',') if c.strip()]
-        for code in codes:
-            ds = DrugSubstance.query.filter_by(code=code).first()
-            if not ds:
+        for code in _split_codes(resolved.get('drug_substance_codes')):
+            if index.get_id(DrugSubstance, code) is None:
                 warnings.append(f"DrugSubstance '{code}' not found for linking")
 
     if warnings:
@@ -587,12 +1161,13 @@ def _resolve_foreign_keys_for_drug_product(item, existing_products):
     return resolved
 
 
-def _resolve_foreign_keys_for_project(item, existing_projects):
+def _resolve_foreign_keys_for_project(item, index=None):
     """
     Resolves foreign key references in a Project record.
     Project has no direct FKs, but we handle M:N links via drug_substance_codes and drug_product_codes.
     Also parses date fields.
     """
+    index = index or ImportResolutionIndex()
     resolved = item.copy()
     warnings = []
 
@@ -608,23 +1183,13 @@ def _resolve_foreign_keys_for_project(item, existing_projects):
 
     # Validate M:N links (don't resolve yet, just validate)
     if 'drug_substance_codes' in resolved:
-        from ..models import DrugSubstance
-        codes = resolved.get('drug_substance_codes', [])
-        if isinstance(codes, str):
-            codes = [c.strip() for c in codes.split(',') if c.strip()]
-        for code in codes:
-            ds = DrugSubstance.query.filter_by(code=code).first()
-            if not ds:
+        for code in _split_codes(resolved.get('drug_substance_codes')):
+            if index.get_id(DrugSubstance, code) is None:
                 warnings.append(f"DrugSubstance '{code}' not found for linking")
 
     if 'drug_product_codes' in resolved:
-        from ..models import DrugProduct
-        codes = resolved.get('drug_product_codes', [])
-        if isinstance(codes, str):
-            codes = [c.strip() for c in codes.split(',') if c.strip()]
-        for code in codes:
-            dp = DrugProduct.query.filter_by(code=code).first()
-            if not dp:
+        for code in _split_codes(resolved.get('drug_product_codes')):
+            if index.get_id(DrugProduct, code) is None:
                 warnings.append(f"DrugProduct '{code}' not found for linking")
 
     if warnings:
@@ -633,43 +1198,54 @@ def _resolve_foreign_keys_for_project(item, existing_projects):
     return resolved
 
 
-def _link_project_relationships(project, raw_data):
-    """Create M:N links for Project after creation/update."""
-    from ..models import DrugSubstance, DrugProduct
+# M:N links created from *_codes fields: (codes field, related model, junction table, own column, related column)
+CODE_LINK_SPECS = {
+    Project: [
+        ('drug_substance_codes', DrugSubstance, project_drug_substances, 'project_id', 'drug_substance_id'),
+        ('drug_product_codes', DrugProduct, project_drug_products, 'project_id', 'drug_product_id'),
+    ],
+    DrugProduct: [
+        ('drug_substance_codes', DrugSubstance, drug_substance_drug_products, 'drug_product_id', 'drug_substance_id'),
+    ],
+}
 
-    # Link DrugSubstances
-    ds_codes = raw_data.get('drug_substance_codes', [])
-    if isinstance(ds_codes, str):
-        ds_codes = [c.strip() for c in ds_codes.split(',') if c.strip()]
 
-    for code in ds_codes:
-        ds = DrugSubstance.query.filter_by(code=code).first()
-        if ds and ds not in project.drug_substances:
-            project.drug_substances.append(ds)
+def _split_codes(codes):
+    """Normalizes a list or comma-separated string of codes into a list."""
+    if not codes:
+        return []
+    if isinstance(codes, str):
+        return [c.strip() for c in codes.split(',') if c.strip()]
+    return list(codes)
 
-    # Link DrugProducts
-    dp_codes = raw_data.get('drug_product_codes', [])
-    if isinstance(dp_codes, str):
-        dp_codes = [c.strip() for c in dp_codes.split(',') if c.strip()]
 
-    for code in dp_codes:
-        dp = DrugProduct.query.filter_by(code=code).first()
-        if dp and dp not in project.drug_products:
-            project.drug_products.append(dp)
+def _link_by_codes(model_class, rows, index):
+    """
+    Inserts the junction rows for [(row_id, raw_data), ...] of one model.
+    Codes are resolved through the index; existing links are left untouched.
+    """
+    for codes_field, related_model, junction, own_column, related_column in CODE_LINK_SPECS[model_class]:
+        link_rows = []
+        for row_id, raw_data in rows:
+            if row_id is None:
+                continue
+            for code in _split_codes(raw_data.get(codes_field)):
+                related_id = index.get_id(related_model, code)
+                if related_id is not None:
+                    link_rows.append({own_column: row_id, related_column: related_id})
 
+        if link_rows:
+            db.session.execute(pg_insert(junction).on_conflict_do_nothing(), link_rows)
 
-def _link_drug_product_relationships(drug_product, raw_data):
-    """Create M:N links for DrugProduct after creation/update."""
-    from ..models import DrugSubstance
 
-    ds_codes = raw_data.get('drug_substance_codes', [])
-    if isinstance(ds_codes, str):
-        ds_codes = [c.strip() for c in ds_codes.split(',') if c.strip()]
+def _link_project_relationships(project, raw_data, index=None):
+    """Create M:N links for Project after creation/update."""
+    _link_by_codes(Project, [(project.id, raw_data)], index or ImportResolutionIndex())
+
 
-    for code in ds_codes:
-        ds = DrugSubstance.query.filter_by(code=code).first()
-        if ds and ds not in drug_product.drug_substances:
-            drug_product.drug_substances.append(ds)
+def _link_drug_product_relationships(drug_product, raw_data, index=None):
+    """Create M:N links for DrugProduct after creation/update."""
+    _link_by_codes(DrugProduct, [(drug_product.id, raw_data)], index or ImportResolutionIndex())
 
 
 def _parse_date(date_string):
@@ -894,10 +1470,18 @@ def _separate_product_data(json_data):
     return main_product_data, related_table_data
 
 
-def finalize_import(resolved_data, model_class, unique_key_field, resolver_func=None):
+def finalize_import(resolved_data, model_class, unique_key_field, resolver_func=None, bulk_upsert=False,
+                    progress_callback=None):
     """
     Finalizes the import by creating or updating database entries.
     Simplified: No longer handles technology or challenge linking.
+
+    With bulk_upsert=True, entities keyed by a unique column are written in
+    chunks via INSERT ... ON CONFLICT DO UPDATE (see _finalize_import_bulk).
+    The detailed log is identical in both modes.
+
+    progress_callback(processed, errors) is called before each item (used by
+    background import jobs); returning True stops the import.
     """
     from ..models import Product
 
@@ -906,6 +1490,9 @@ def finalize_import(resolved_data, model_class, unique_key_field, resolver_func=
     errors = []
     detailed_logs = []
 
+    # Name/code lookups for the resolvers, shared by every item of this import
+    index = ImportResolutionIndex()
+
     # Get valid columns for this model to prevent "invalid keyword argument" errors
     valid_columns = set(model_class.get_all_fields())
     # Add manually required fields that might be relationships
@@ -925,6 +1512,20 @@ Unique Key: {unique_key_field}
     print(header)
     detailed_logs.append(header)
 
+    if bulk_upsert and _supports_bulk_upsert(model_class, unique_key_field):
+        try:
+            return _finalize_import_bulk(
+                resolved_data, model_class, unique_key_field, resolver_func,
+                valid_columns, detailed_logs, index, progress_callback
+            )
+        except Exception as e:
+            db.session.rollback()
+            return {
+                "success": False,
+                "message": f"Critical Import failure: {str(e)}",
+                "detailed_logs": detailed_logs
+            }
+
     # --- Automatic Sorting for Products ---
     # Ensure NMEs are processed before Line-Extensions
     if model_class == Product:
@@ -949,6 +1550,10 @@ Unique Key: {unique_key_field}
 
     try:
         for idx, entry in enumerate(resolved_data, 1):
+            if progress_callback and progress_callback(idx - 1, error_count):
+                _log_import_cancelled(idx - 1, len(resolved_data), detailed_logs)
+                break
+
             item_log = []
             try:
                 if 'data' in entry:
@@ -974,8 +1579,7 @@ Unique Key: {unique_key_field}
                     print(log_msg)
                     item_log.append(log_msg)
                     try:
-                        existing_instances = model_class.query.all()
-                        data_to_process = resolver_func(raw_data, existing_instances)
+                        data_to_process = resolver_func(raw_data, index)
 
                         warnings = data_to_process.pop('_warnings', [])
 
@@ -1027,17 +1631,19 @@ Unique Key: {unique_key_field}
                     item_to_process = model_class(**sanitized_data)
                     db.session.add(item_to_process)
 
-                # Commit to allow subsequent items to find this one (important for parent-child relationships)
+                # Register the row so subsequent items can resolve it (important for parent-child relationships)
+                db.session.flush()
+                index.record_instance(item_to_process)
                 db.session.commit()
 
                 # 4. Post-Processing: Create M:N links for Projects
                 if model_class == Project:
-                    _link_project_relationships(item_to_process, raw_data)
+                    _link_project_relationships(item_to_process, raw_data, index)
                     db.session.commit()
 
                 # 5. Post-Processing: Create M:N links for DrugProducts
                 if model_class == DrugProduct:
-                    _link_drug_product_relationships(item_to_process, raw_data)
+                    _link_drug_product_relationships(item_to_process, raw_data, index)
                     db.session.commit()
 
                 success_count += 1
@@ -1059,38 +1665,305 @@ Unique Key: {unique_key_field}
                 errors.append(f"{identifier}: {str(item_error)}")
                 continue
 
-        summary = f"""
+        return _build_import_summary(
+            model_class, len(resolved_data), success_count, error_count, errors, detailed_logs
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        return {
+            "success": False,
+            "message": f"Critical Import failure: {str(e)}",
+            "detailed_logs": detailed_logs
+        }
+
+
+def _log_import_cancelled(processed, total, detailed_logs):
+    cancel_msg = f"\n⚠ Import cancelled after {processed} of {total} items"
+    print(cancel_msg)
+    detailed_logs.append(cancel_msg)
+
+
+def _build_import_summary(model_class, total, success_count, error_count, errors, detailed_logs):
+    """Appends the import summary to the log and builds the finalize_import result."""
+    summary = f"""
 {'='*70}
 IMPORT SUMMARY - {model_class.__name__}
 {'='*70}
 ✓ Success: {success_count}
 ✗ Errors:  {error_count}
-Total:     {len(resolved_data)}
+Total:     {total}
 {'='*70}
 """
-        print(summary)
-        detailed_logs.append(summary)
-        
-        if errors:
-             detailed_logs.append("ERROR DETAILS:")
-             detailed_logs.extend([f"  • {e}" for e in errors])
+    print(summary)
+    detailed_logs.append(summary)
+
+    if errors:
+         detailed_logs.append("ERROR DETAILS:")
+         detailed_logs.extend([f"  • {e}" for e in errors])
+
+    return {
+        "success": True,
+        "message": f"Import completed: {success_count} success, {error_count} errors",
+        "success_count": success_count,
+        "error_count": error_count,
+        "errors": errors,
+        "detailed_logs": detailed_logs
+    }
 
-        return {
-            "success": True,
-            "message": f"Import completed: {success_count} success, {error_count} errors",
-            "success_count": success_count,
-            "error_count": error_count,
-            "errors": errors,
-            "detailed_logs": detailed_logs
+
+# --- Bulk Upsert Mode ---
+
+# Rows written per INSERT ... ON CONFLICT statement
+BULK_UPSERT_CHUNK_SIZE = 500
+
+
+def _supports_bulk_upsert(model_class, unique_key_field):
+    """
+    Bulk upsert needs a unique (or primary key) column as the ON CONFLICT target.
+    Products and process stages resolve parents created earlier in the same
+    import, so they stay on the row-by-row path.
+    """
+    if model_class in (Product, ProcessStage):
+        return False
+    column = model_class.__table__.c.get(unique_key_field)
+    return column is not None and bool(column.unique or column.primary_key)
+
+
+def _finalize_import_bulk(resolved_data, model_class, unique_key_field, resolver_func,
+                          valid_columns, detailed_logs, index, progress_callback=None):
+    """
+    Set-based variant of finalize_import.
+
+    Existing rows are loaded once, every item is resolved and diffed in memory,
+    and the changed rows are written per chunk. Each chunk runs in a savepoint;
+    if it fails, its rows are retried one savepoint each so a bad row only
+    fails itself. Log lines are buffered per item and emitted in input order.
+    """
+    table = model_class.__table__
+    pk_name = next(iter(table.primary_key.columns)).name
+    id_field_name = f"{model_class.__tablename__.replace('manufacturing_', '').rstrip('s')}_id"
+    total = len(resolved_data)
+
+    success_count = 0
+    error_count = 0
+    errors = []
+
+    existing_rows = {
+        row[unique_key_field]: dict(row)
+        for row in db.session.execute(table.select()).mappings()
+    }
+
+    pending = []
+
+    def flush_pending():
+        nonlocal success_count, error_count
+        _flush_bulk_upsert_chunk(model_class, unique_key_field, pending, existing_rows, index)
+
+        for planned in pending:
+            item_log = planned['item_log']
+            if planned['error'] is None:
+                success_count += 1
+                log_msg = f"  ✓ SUCCESS"
+                print(log_msg)
+                item_log.append(log_msg)
+            else:
+                error_count += 1
+                error_msg = f"  ✗ ERROR: {str(planned['error'])}"
+                print(error_msg)
+                item_log.append(error_msg)
+                if planned['data_keys'] is not None:
+                    item_log.append(f"  → Data keys: {planned['data_keys']}")
+                errors.append(f"{planned['identifier']}: {str(planned['error'])}")
+            if planned['item_header']:
+                detailed_logs.append(planned['item_header'])
+            detailed_logs.extend(item_log)
+        pending.clear()
+
+    identifier = None
+    for idx, entry in enumerate(resolved_data, 1):
+        # Only flushed rows count as processed; pending ones are written below
+        if progress_callback and progress_callback(success_count + error_count, error_count):
+            _log_import_cancelled(idx - 1, total, detailed_logs)
+            break
+
+        item_log = []
+        planned = {
+            'identifier': identifier,
+            'item_header': None,
+            'item_log': item_log,
+            'raw_data': None,
+            'values': None,
+            'row_id': None,
+            'error': None,
+            'data_keys': list(entry['data'].keys()) if 'data' in entry else None,
         }
+        try:
+            if 'data' in entry:
+                raw_data = entry['data'].copy()
+            elif 'json_item' in entry:
+                raw_data = entry['json_item'].copy()
+            else:
+                raise ValueError("Entry missing 'data' or 'json_item' field")
 
-    except Exception as e:
-        db.session.rollback()
-        return {
-            "success": False,
-            "message": f"Critical Import failure: {str(e)}",
-            "detailed_logs": detailed_logs
+            identifier = raw_data.get(unique_key_field, f"Item {idx}")
+            planned['identifier'] = identifier
+            planned['raw_data'] = raw_data
+
+            # A repeated key must see the earlier row as existing, so write it first
+            if any(p['identifier'] == identifier and p['error'] is None for p in pending):
+                flush_pending()
+
+            item_header = f"\n[{idx}/{total}] Processing: {identifier}"
+            print(item_header)
+            planned['item_header'] = item_header
+            item_log.append(item_header)
+
+            data_to_process = raw_data
+            if resolver_func:
+                log_msg = f"  → Applying resolver function..."
+                print(log_msg)
+                item_log.append(log_msg)
+                try:
+                    data_to_process = resolver_func(raw_data, index)
+                    warnings = data_to_process.pop('_warnings', [])
+
+                    log_msg = f"  ✓ Resolver completed"
+                    print(log_msg)
+                    item_log.append(log_msg)
+
+                    for warning in warnings:
+                        log_msg = f"  ⚠ Warning: {warning}"
+                        print(log_msg)
+                        item_log.append(log_msg)
+                except Exception as resolve_error:
+                    log_msg = f"  ✗ RESOLVER ERROR: {str(resolve_error)}"
+                    print(log_msg)
+                    item_log.append(log_msg)
+                    raise resolve_error
+
+            sanitized_data = {
+                k: v for k, v in data_to_process.items()
+                if k in valid_columns and k in table.c
+            }
+
+            existing_row = existing_rows.get(identifier)
+            if existing_row:
+                log_msg = f"  → Updating existing record (ID: {existing_row.get(id_field_name, 'N/A')})"
+                print(log_msg)
+                item_log.append(log_msg)
+
+                updated_fields = [
+                    key for key, value in sanitized_data.items()
+                    if key in existing_row and existing_row[key] != value
+                ]
+                if updated_fields:
+                    log_msg = f"  ✓ Updated {len(updated_fields)} fields"
+                    print(log_msg)
+                    item_log.append(log_msg)
+                    planned['values'] = sanitized_data
+                planned['row_id'] = existing_row.get(pk_name)
+            else:
+                log_msg = f"  → Creating new record"
+                print(log_msg)
+                item_log.append(log_msg)
+                planned['values'] = sanitized_data
+
+        except Exception as item_error:
+            planned['identifier'] = identifier
+            planned['error'] = item_error
+
+        pending.append(planned)
+        if len(pending) >= BULK_UPSERT_CHUNK_SIZE:
+            flush_pending()
+
+    if pending:
+        flush_pending()
+
+    return _build_import_summary(model_class, total, success_count, error_count, errors, detailed_logs)
+
+
+def _flush_bulk_upsert_chunk(model_class, unique_key_field, pending, existing_rows, index):
+    """
+    Writes one chunk of planned rows and commits it. Rows that fail get their
+    'error' set; successful writes are merged into existing_rows and the index.
+    """
+    writable = [p for p in pending if p['error'] is None]
+
+    try:
+        with db.session.begin_nested():
+            key_to_id = _write_bulk_upsert_rows(model_class, unique_key_field, writable, index)
+        _remember_written_rows(writable, key_to_id, existing_rows, model_class, index)
+    except Exception:
+        # Retry row by row so one bad item does not fail the whole chunk
+        for planned in writable:
+            try:
+                with db.session.begin_nested():
+                    key_to_id = _write_bulk_upsert_rows(model_class, unique_key_field, [planned], index)
+                _remember_written_rows([planned], key_to_id, existing_rows, model_class, index)
+            except Exception as row_error:
+                planned['error'] = row_error
+
+    db.session.commit()
+
+
+def _write_bulk_upsert_rows(model_class, unique_key_field, planned_rows, index):
+    """
+    Upserts the planned rows and creates their M:N links.
+    Returns {unique key: primary key} for every row that was written.
+    """
+    table = model_class.__table__
+    key_column = table.c[unique_key_field]
+    pk_column = next(iter(table.primary_key.columns))
+
+    # executemany needs identical parameter sets, so group rows by their columns
+    groups = defaultdict(list)
+    for planned in planned_rows:
+        if planned['values'] is not None:
+            groups[tuple(sorted(planned['values']))].append(planned['values'])
+
+    key_to_id = {}
+    for columns, rows in groups.items():
+        stmt = pg_insert(table)
+        update_set = {
+            name: stmt.excluded[name] for name in columns
+            if name != unique_key_field and not table.c[name].primary_key
         }
+        if update_set and 'updated_at' in table.c and 'updated_at' not in update_set:
+            update_set['updated_at'] = func.now()
+        if not update_set:
+            # No-op update so RETURNING still yields the conflicting row
+            update_set = {unique_key_field: stmt.excluded[unique_key_field]}
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_column], set_=update_set
+        ).returning(key_column, pk_column)
+
+        for key, row_id in db.session.execute(stmt, rows):
+            key_to_id[key] = row_id
+
+    if model_class in CODE_LINK_SPECS:
+        _link_by_codes(model_class, [
+            (key_to_id.get(planned['identifier'], planned['row_id']), planned['raw_data'])
+            for planned in planned_rows
+        ], index)
+
+    return key_to_id
+
+
+def _remember_written_rows(planned_rows, key_to_id, existing_rows, model_class, index):
+    """Merges written values into existing_rows and the index so later items see them."""
+    pk_name = next(iter(model_class.__table__.primary_key.columns)).name
+    for planned in planned_rows:
+        if planned['values'] is None:
+            continue
+        row = existing_rows.setdefault(planned['identifier'], {})
+        row.update(planned['values'])
+        if planned['identifier'] in key_to_id:
+            row[pk_name] = key_to_id[planned['identifier']]
+        index.record(model_class, row, row.get(pk_name))
+
+
 def analyze_process_template_import(json_data):
     """
     Analyze process template import data with nested stages.
@@ -1226,7 +2099,7 @@ def analyze_process_template_import(json_data):
         }
 
 
-def finalize_process_template_import(resolved_data):
+def finalize_process_template_import(resolved_data, progress_callback=None):
     """
     Finalize the import of process templates with their associated template stages.
     """
@@ -1243,6 +2116,10 @@ def finalize_process_template_import(resolved_data):
 
     try:
         for idx, entry in enumerate(resolved_data):
+            if progress_callback and progress_callback(idx, failed_count):
+                _log_import_cancelled(idx, len(resolved_data), detailed_logs)
+                break
+
             action = entry.get('action')
             data = entry.get('data', {})
             template_name = data.get('template_name', 'Unknown')
@@ -1423,6 +2300,21 @@ def analyze_challenge_modality_details_import(json_data):
         challenges = {c.name: c for c in Challenge.query.all()}
         modalities = {m.modality_name: m for m in Modality.query.all()}
 
+        challenge_names = FuzzyMatchIndex(challenges)
+        modality_names = FuzzyMatchIndex(modalities)
+
+        # Existing details for every (challenge, modality) pair, fetched in one pass
+        diff_engine = ImportDiffEngine(
+            ChallengeModalityDetail,
+            ['challenge_id', 'modality_id'],
+            {key for item in json_data for key in item}
+        )
+        diff_engine.load(
+            (challenges[item.get('challenge_name')].id, modalities[item.get('modality_name')].modality_id)
+            for item in json_data
+            if item.get('challenge_name') in challenges and item.get('modality_name') in modalities
+        )
+
         for index, item in enumerate(json_data):
             challenge_name = item.get('challenge_name', '')
             modality_name = item.get('modality_name', '')
@@ -1469,9 +2361,10 @@ def analyze_challenge_modality_details_import(json_data):
                 if 'challenge_name' not in suggestions:
                     suggestions['challenge_name'] = {}
                 # Generate suggestions in the format expected by template
-                suggestions['challenge_name'][challenge_name] = generate_suggestions(
-                    challenge_name, list(challenges.keys())
-                )
+                if challenge_name not in suggestions['challenge_name']:
+                    suggestions['challenge_name'][challenge_name] = generate_suggestions(
+                        challenge_name, challenge_names
+                    )
 
             # Check if modality exists
             modality = modalities.get(modality_name)
@@ -1488,26 +2381,25 @@ def analyze_challenge_modality_details_import(json_data):
                 if 'modality_name' not in suggestions:
                     suggestions['modality_name'] = {}
                 # Generate suggestions in the format expected by template
-                suggestions['modality_name'][modality_name] = generate_suggestions(
-                    modality_name, list(modalities.keys())
-                )
+                if modality_name not in suggestions['modality_name']:
+                    suggestions['modality_name'][modality_name] = generate_suggestions(
+                        modality_name, modality_names
+                    )
 
             # If both exist, check for existing detail record
             if challenge and modality:
-                existing_detail = ChallengeModalityDetail.query.filter_by(
-                    challenge_id=challenge.id,
-                    modality_id=modality.modality_id
-                ).first()
-
-                if existing_detail:
-                    preview_item['action'] = 'update'
-                    preview_item['status'] = 'update'
-                    preview_item['db_item'] = {
-                        'id': existing_detail.id,
-                        'impact_score': existing_detail.impact_score,
-                        'maturity_score': existing_detail.maturity_score
-                    }
-                    preview_item['messages'].append('Record exists - will update')
+                detail_key = (challenge.id, modality.modality_id)
+
+                if diff_engine.exists(detail_key):
+                    preview_item['diff'] = diff_engine.diff(detail_key, item)
+                    if preview_item['diff']:
+                        preview_item['action'] = 'update'
+                        preview_item['status'] = 'update'
+                        preview_item['db_item'] = diff_engine.db_item(detail_key, ['impact_score', 'maturity_score'])
+                        preview_item['messages'].append('Record exists - will update')
+                    else:
+                        preview_item['status'] = 'no_change'
+                        preview_item['messages'].append('Record exists and matches the database')
                 else:
                     preview_item['action'] = 'add'
                     preview_item['status'] = 'new'
@@ -1536,7 +2428,7 @@ def analyze_challenge_modality_details_import(json_data):
         }
 
 
-def finalize_challenge_modality_details_import(resolved_data):
+def finalize_challenge_modality_details_import(resolved_data, progress_callback=None):
     """
     Finalize the import of challenge modality details.
     """
@@ -1559,6 +2451,10 @@ def finalize_challenge_modality_details_import(resolved_data):
 
     try:
         for idx, entry in enumerate(resolved_data):
+            if progress_callback and progress_callback(idx, failed_count):
+                _log_import_cancelled(idx, len(resolved_data), detailed_logs)
+                break
+
             action = entry.get('action')
             data = entry.get('data', {})
 
@@ -1,8 +1,11 @@
 # backend/services/export_service.py
 import json
+import zlib
 import tiktoken
 import datetime
 
+from sqlalchemy import func, text
+
 from ..db import db
 
 
@@ -123,32 +126,142 @@ def prepare_challenge_export(form_data: dict):
     return json_string, total_tokens
 
 
-def export_full_database():
-    """Exports all data from all tables into a structured dictionary."""
-    from .data_management_service import TABLE_IMPORT_ORDER
+# Rows fetched per server-side cursor batch during a full export
+EXPORT_YIELD_PER = 1000
 
-    all_data = {}
 
-    def json_serializer(obj):
-        if isinstance(obj, (datetime.datetime, datetime.date)):
-            return obj.isoformat()
-        return str(obj)
+def _json_serializer(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def iter_full_database_export():
+    """
+    Streams a full database backup as JSON text chunks, table by table.
 
-    # Add metadata for version tracking
-    all_data['_meta'] = {
+    Rows are read through server-side cursors (stream_results/yield_per), so
+    memory stays constant and the first chunk is available immediately. The
+    output has the same structure as export_full_database().
+    """
+    from .data_management_service import TABLE_IMPORT_ORDER
+
+    meta = {
         'version': '2.0',
         'exported_at': datetime.datetime.now().isoformat(),
         'schema': 'projects_based',
         'tables': list(TABLE_IMPORT_ORDER),
     }
+    meta_json = json.dumps(meta, indent=2).replace('\n', '\n  ')
+    yield '{\n  "_meta": ' + meta_json
 
     for table_name in TABLE_IMPORT_ORDER:
         table = db.metadata.tables.get(table_name)
         if table is None or table_name == 'flask_sessions':
             continue
 
-        result = db.session.execute(table.select())
-        rows = [dict(row._mapping) for row in result]
-        all_data[table_name] = rows
+        yield f',\n  {json.dumps(table_name)}: ['
+
+        result = db.session.execute(
+            table.select(),
+            execution_options={'stream_results': True, 'yield_per': EXPORT_YIELD_PER}
+        )
+        first_row = True
+        for partition in result.mappings().partitions():
+            parts = []
+            for row in partition:
+                parts.append(('\n    ' if first_row else ',\n    ') + json.dumps(dict(row), default=_json_serializer))
+                first_row = False
+            yield ''.join(parts)
+        yield ']' if first_row else '\n  ]'
+
+    yield '\n}\n'
+
+
+def gzip_chunks(chunks):
+    """Compresses an iterable of text chunks into a gzip byte stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_full_database():
+    """Exports all data from all tables into a single JSON string."""
+    return ''.join(iter_full_database_export())
+
+
+def export_delta(since):
+    """
+    Exports rows of DELTA_TABLES changed after the 'since' watermark, the link
+    sets of changed parents, and tombstones for rows deleted since then.
+
+    The returned '_meta.until' is the watermark to pass as 'since' next time.
+    """
+    from .data_management_service import DELTA_TABLES, DELTA_LINK_TABLES
+    from ..models import DeletedRecord
+
+    # Rows written by transactions still in flight carry timestamps from their
+    # start but are not visible yet; stop the watermark before the oldest one
+    # so they are shipped by the next delta instead of being skipped.
+    until = db.session.execute(text("""
+        SELECT least(now(), coalesce(
+            (SELECT min(xact_start) FROM pg_stat_activity
+             WHERE datname = current_database() AND pid <> pg_backend_pid()
+               AND xact_start IS NOT NULL),
+            now()
+        ))
+    """)).scalar()
+
+    delta = {
+        '_meta': {
+            'type': 'delta',
+            'version': '2.0',
+            'since': since.isoformat(),
+            'until': until.isoformat(),
+            'exported_at': datetime.datetime.now().isoformat(),
+        },
+        'tables': {},
+        'links': {},
+        'tombstones': {},
+    }
 
-    return json.dumps(all_data, indent=2, default=json_serializer)
+    changed_ids = {}
+    for table_name in DELTA_TABLES:
+        table = db.metadata.tables[table_name]
+        pk_column = next(iter(table.primary_key.columns))
+        changed_at = func.coalesce(table.c.updated_at, table.c.created_at)
+
+        rows = [
+            dict(row) for row in db.session.execute(
+                table.select().where(changed_at > since, changed_at <= until)
+            ).mappings()
+        ]
+        delta['tables'][table_name] = rows
+        changed_ids[table_name] = {row[pk_column.name] for row in rows}
+
+    for junction, (parent_table, parent_column) in DELTA_LINK_TABLES.items():
+        parent_ids = sorted(changed_ids.get(parent_table, ()))
+        rows = []
+        if parent_ids:
+            table = db.metadata.tables[junction]
+            rows = [
+                dict(row) for row in db.session.execute(
+                    table.select().where(table.c[parent_column].in_(parent_ids))
+                ).mappings()
+            ]
+        delta['links'][junction] = {'parents': parent_ids, 'rows': rows}
+
+    tombstones = db.session.query(DeletedRecord.table_name, DeletedRecord.record_id).filter(
+        DeletedRecord.deleted_at > since,
+        DeletedRecord.deleted_at <= until,
+        DeletedRecord.table_name.in_(DELTA_TABLES)
+    )
+    for table_name, record_id in tombstones:
+        # A row that exists again (id reused) is covered by its upsert
+        if record_id not in changed_ids[table_name]:
+            delta['tombstones'].setdefault(table_name, []).append(record_id)
+
+    return json.dumps(delta, indent=2, default=_json_serializer)
@@ -0,0 +1,240 @@
+# backend/services/import_job_service.py
+"""
+Runs JSON imports as background jobs so they do not occupy a gunicorn worker.
+
+Jobs are executed by a thread pool inside the web process; their state lives
+in the import_jobs table, which the preview page polls for progress. While a
+process has queued or running jobs, a heartbeat thread refreshes their
+heartbeat_at; queued or running jobs whose heartbeat is older than
+IMPORT_JOB_STALE_SECONDS belonged to a worker that restarted or crashed and
+are marked failed.
+"""
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from ..db import db
+from ..models import ImportJob
+
+# Minimum seconds between progress writes of a running job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Seconds between heartbeat writes for the jobs of this process
+HEARTBEAT_INTERVAL_SECONDS = 30
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Ids of queued/running jobs owned by this process
+_active_jobs = set()
+_heartbeat_thread = None
+
+
+def _get_executor(app):
+    global _executor, _heartbeat_thread
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('IMPORT_JOB_WORKERS', 2),
+                thread_name_prefix='import-job'
+            )
+            _heartbeat_thread = threading.Thread(
+                target=_heartbeat_loop, args=(app,), name='import-job-heartbeat', daemon=True
+            )
+            _heartbeat_thread.start()
+    return _executor
+
+
+def _heartbeat_loop(app):
+    """Keeps heartbeat_at of this process's jobs fresh, including jobs still waiting in the queue."""
+    table = ImportJob.__table__
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL_SECONDS)
+        with _executor_lock:
+            job_ids = list(_active_jobs)
+        if not job_ids:
+            continue
+        try:
+            with app.app_context(), db.engine.begin() as connection:
+                connection.execute(
+                    update(table)
+                    .where(table.c.id.in_(job_ids), table.c.status.in_(('queued', 'running')))
+                    .values(heartbeat_at=datetime.now(timezone.utc))
+                )
+        except Exception:
+            traceback.print_exc()
+
+
+def _update_job(job_id, **values):
+    """Writes job state on its own connection, independent of the import transaction."""
+    with db.engine.begin() as connection:
+        connection.execute(
+            update(ImportJob.__table__).where(ImportJob.__table__.c.id == job_id)
+            .values(heartbeat_at=datetime.now(timezone.utc), **values)
+        )
+
+
+class JobProgress:
+    """
+    Progress callback handed to the finalize_* functions.
+    Calling it records progress (throttled) and returns True once the job
+    has been asked to cancel.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.cancelled = False
+        self._last_write = 0.0
+
+    def __call__(self, processed_items, error_count):
+        now = time.monotonic()
+        if now - self._last_write < PROGRESS_INTERVAL_SECONDS:
+            return self.cancelled
+        self._last_write = now
+
+        table = ImportJob.__table__
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(table).where(table.c.id == self.job_id).values(
+                    processed_items=processed_items, error_count=error_count,
+                    heartbeat_at=datetime.now(timezone.utc)
+                )
+            )
+            self.cancelled = bool(connection.execute(
+                select(table.c.cancel_requested).where(table.c.id == self.job_id)
+            ).scalar())
+        return self.cancelled
+
+
+def submit_import_job(entity_type, total_items, runner, user_id=None):
+    """
+    Creates an import job and queues it.
+
+    runner(progress_callback) performs the import and returns the usual
+    finalize_* result dict; it runs in a worker thread with an app context.
+    """
+    job = ImportJob(
+        user_id=user_id,
+        entity_type=entity_type,
+        status='queued',
+        total_items=total_items,
+        processed_items=0,
+        error_count=0,
+        heartbeat_at=datetime.now(timezone.utc)
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    with _executor_lock:
+        _active_jobs.add(job.id)
+    _get_executor(app).submit(_run_job, app, job.id, runner)
+    return job
+
+
+def _run_job(app, job_id, runner):
+    try:
+        _execute_job(app, job_id, runner)
+    finally:
+        with _executor_lock:
+            _active_jobs.discard(job_id)
+
+
+def _execute_job(app, job_id, runner):
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        if job is None or job.status != 'queued':
+            return
+        db.session.rollback()
+
+        _update_job(job_id, status='running', started_at=datetime.now(timezone.utc))
+        progress = JobProgress(job_id)
+
+        try:
+            result = runner(progress)
+
+            if progress.cancelled:
+                status = 'cancelled'
+            else:
+                status = 'completed' if result.get('success') else 'failed'
+
+            error_count = result.get('error_count', result.get('failed_count', 0)) or 0
+            processed_items = (
+                (result.get('success_count') or 0) + error_count + (result.get('skipped_count') or 0)
+            )
+            _update_job(
+                job_id,
+                status=status,
+                processed_items=processed_items,
+                error_count=error_count,
+                message=result.get('message'),
+                result=result,
+                finished_at=datetime.now(timezone.utc)
+            )
+        except Exception as e:
+            traceback.print_exc()
+            db.session.rollback()
+            _update_job(
+                job_id,
+                status='failed',
+                message=f"Import failed: {str(e)}",
+                finished_at=datetime.now(timezone.utc)
+            )
+
+
+def reap_stale_jobs():
+    """
+    Marks queued/running jobs without a recent heartbeat as failed, so the
+    UI stops polling jobs whose worker process is gone.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=current_app.config.get('IMPORT_JOB_STALE_SECONDS', 600))
+    table = ImportJob.__table__
+    with db.engine.begin() as connection:
+        reaped = connection.execute(
+            update(table)
+            .where(
+                table.c.status.in_(('queued', 'running')),
+                func.coalesce(table.c.heartbeat_at, table.c.created_at) < cutoff
+            )
+            .values(
+                status='failed',
+                message="Import interrupted: the worker running it stopped (restart or crash).",
+                finished_at=now
+            )
+        ).rowcount
+    if reaped:
+        print(f"Marked {reaped} interrupted import job(s) as failed")
+
+
+def get_job(job_id, user_id):
+    """Returns the ImportJob if it exists and was submitted by user_id."""
+    reap_stale_jobs()
+    job = db.session.get(ImportJob, job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    return job
+
+
+def request_cancel(job_id, user_id):
+    """
+    Asks a job of user_id to stop. Queued jobs are cancelled immediately,
+    running jobs stop at their next progress check. Returns the job or None.
+    """
+    job = get_job(job_id, user_id)
+    if job is None:
+        return None
+
+    if job.status == 'queued':
+        job.status = 'cancelled'
+        job.finished_at = datetime.now(timezone.utc)
+        job.message = "Cancelled before start"
+    if job.status in ('queued', 'running', 'cancelled'):
+        job.cancel_requested = True
+    db.session.commit()
+    return job
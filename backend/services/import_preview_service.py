@@ -0,0 +1,180 @@
+# backend/services/import_preview_service.py
+"""
+Server-side store for JSON import previews.
+
+The analysis result of an upload (every json_item, db_item and diff) used to
+live in the Flask session, which is pickled into flask_sessions on every
+request. Previews are now kept in import_previews / import_preview_items and
+only the preview id goes into the session. Items are paged by position and
+whole previews expire after IMPORT_PREVIEW_TTL_SECONDS.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import insert, select, delete, cast, bindparam, Text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..db import db
+from ..models import ImportPreview, ImportPreviewItem
+
+# Preview rows inserted per executemany batch
+PREVIEW_INSERT_BATCH_SIZE = 1000
+
+# Bulk actions of the preview page, applied relative to each item's proposed action
+BULK_PREVIEW_ACTIONS = {
+    'accept_all': lambda default: default if default in ('add', 'update') else None,
+    'skip_all': lambda default: 'skip',
+    'add_new': lambda default: 'add' if default == 'add' else None,
+    'update_existing': lambda default: 'update' if default == 'update' else None,
+}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _expiry():
+    ttl = current_app.config.get('IMPORT_PREVIEW_TTL_SECONDS', 6 * 3600)
+    return _now() + timedelta(seconds=ttl)
+
+
+def purge_expired_previews():
+    """Deletes expired previews (items cascade). Returns the number removed."""
+    result = db.session.execute(
+        delete(ImportPreview).where(ImportPreview.expires_at < _now())
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def create_preview(entity_type, preview_data=None, kind='preview', payload=None, user_id=None):
+    """
+    Stores an import preview and returns its id.
+
+    preview_data is stored one row per item so pages can be read by position;
+    payload holds anything else the flow needs (e.g. the resolution step's
+    original data). Values that are not JSON types (dates from db_item) are
+    stored as their string form, which is how the preview renders them.
+    """
+    purge_expired_previews()
+
+    preview_data = preview_data or []
+    preview = ImportPreview(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        entity_type=entity_type,
+        kind=kind,
+        item_count=len(preview_data),
+        payload=json.loads(json.dumps(payload, default=str)) if payload is not None else None,
+        expires_at=_expiry()
+    )
+    db.session.add(preview)
+    db.session.flush()
+
+    table = ImportPreviewItem.__table__
+    stmt = insert(table).values(
+        preview_id=bindparam('preview_id'),
+        position=bindparam('position'),
+        item=cast(bindparam('item', type_=Text), JSONB)
+    )
+    for start in range(0, len(preview_data), PREVIEW_INSERT_BATCH_SIZE):
+        batch = preview_data[start:start + PREVIEW_INSERT_BATCH_SIZE]
+        db.session.execute(stmt, [
+            {'preview_id': preview.id, 'position': start + offset, 'item': json.dumps(item, default=str)}
+            for offset, item in enumerate(batch)
+        ])
+
+    db.session.commit()
+    return preview.id
+
+
+def get_preview(preview_id, user_id=None):
+    """Returns the ImportPreview if it exists, has not expired and belongs to user_id."""
+    if not preview_id:
+        return None
+    preview = db.session.get(ImportPreview, preview_id)
+    if preview is None or preview.expires_at < _now():
+        return None
+    if user_id is not None and preview.user_id not in (None, user_id):
+        return None
+    return preview
+
+
+def get_preview_items(preview, offset=0, limit=None):
+    """Returns preview items in position order, optionally a slice of them."""
+    query = (
+        select(ImportPreviewItem.item)
+        .where(ImportPreviewItem.preview_id == preview.id)
+        .where(ImportPreviewItem.position >= offset)
+        .order_by(ImportPreviewItem.position)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return list(db.session.execute(query).scalars())
+
+
+def get_preview_page(preview, page, per_page):
+    """
+    Returns (items, pagination) for one page of a preview. Pages are 1-based
+    and clamped to the available range.
+    """
+    total_pages = max((preview.item_count + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), total_pages)
+    offset = (page - 1) * per_page
+
+    items = get_preview_items(preview, offset, per_page)
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'total_pages': total_pages,
+        'total_items': preview.item_count,
+        'offset': offset,
+    }
+    return items, pagination
+
+
+def delete_preview(preview_id):
+    if not preview_id:
+        return
+    db.session.execute(delete(ImportPreview).where(ImportPreview.id == preview_id))
+    db.session.commit()
+
+
+def build_resolved_data(preview, action_ops=None):
+    """
+    Rebuilds the finalize payload from a stored preview.
+
+    action_ops is the preview page's ordered list of user choices: either
+    {'index': i, 'action': a} for a single row or {'bulk': name} for one of
+    BULK_PREVIEW_ACTIONS. They are replayed on top of each item's proposed
+    action, so the client never has to send the items back.
+    """
+    overrides = {}
+    bulk_ops = []
+    for position, op in enumerate(action_ops or []):
+        if op.get('bulk') in BULK_PREVIEW_ACTIONS:
+            bulk_ops.append((position, BULK_PREVIEW_ACTIONS[op['bulk']]))
+        elif op.get('action') in ('add', 'update', 'skip') and 'index' in op:
+            overrides[int(op['index'])] = (position, op['action'])
+
+    resolved_data = []
+    for index, item in enumerate(get_preview_items(preview)):
+        default = item.get('action', 'skip')
+        since, action = overrides.get(index, (-1, default))
+        for position, bulk in bulk_ops:
+            if position > since:
+                action = bulk(default) or action
+
+        # Only the proposed action or skip can be chosen for a row
+        if action not in (default, 'skip'):
+            action = default
+
+        resolved_data.append({
+            'action': action,
+            'data': item.get('json_item'),
+            'identifier': item.get('identifier'),
+            'original_index': index
+        })
+    return resolved_data
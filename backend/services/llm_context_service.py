@@ -0,0 +1,180 @@
+# backend/services/llm_context_service.py
+"""
+Retrieval context for the LLM chat.
+
+Challenges, challenge/modality details, projects, drug substances and drug
+products are rendered as one compact text line each and indexed with BM25 in
+process memory (no network or embedding model needed). For a chat message
+the top-k matching records are added to the prompt until a token budget,
+measured with export_service.count_tokens, is used up.
+
+The index is rebuilt lazily when the 'retrieval' data version changes
+(database triggers, see migrations 012_retrieval_data_version and
+015_defer_data_version_bumps).
+"""
+import math
+import re
+import threading
+from collections import Counter
+
+from sqlalchemy.orm import joinedload
+
+from ..models import (Challenge, ChallengeModalityDetail, Project, DrugSubstance, DrugProduct)
+from .export_service import count_tokens
+from .timeline_cache import get_data_version
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+CONTEXT_HEADER = "Relevant records from the pipeline database (retrieved for this question):"
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _render(label, fields):
+    """One record as 'label name | field: value | ...', skipping empty values."""
+    parts = [label]
+    for key, value in fields:
+        if value not in (None, ''):
+            parts.append(f"{key}: {value}")
+    return ' | '.join(parts)
+
+
+class BM25Index:
+    """Okapi BM25 over a list of (entity_type, text) documents."""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> [(doc index, term frequency)]
+        self.doc_lengths = []
+
+        for index, (_, text) in enumerate(documents):
+            terms = Counter(tokenize(text))
+            self.doc_lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, []).append((index, frequency))
+
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0
+        count = len(documents)
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query, top_k=20):
+        """Indices of the top_k documents for the query, best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, frequency in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / self.avg_length)
+                scores[index] = scores.get(index, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores, key=lambda index: scores[index], reverse=True)[:top_k]
+
+
+def load_documents():
+    """Renders all indexed records as (entity_type, text) documents."""
+    documents = []
+
+    for challenge in Challenge.query.options(joinedload(Challenge.value_step_rel)).all():
+        documents.append(('challenge', _render(f"[Challenge] {challenge.name}", [
+            ('value step', challenge.value_step_rel.name if challenge.value_step_rel else None),
+            ('description', challenge.agnostic_description),
+            ('root cause', challenge.agnostic_root_cause),
+        ])))
+
+    details = ChallengeModalityDetail.query.options(
+        joinedload(ChallengeModalityDetail.challenge), joinedload(ChallengeModalityDetail.modality)
+    ).all()
+    for detail in details:
+        documents.append(('challenge_modality_detail', _render(
+            f"[Challenge detail] {detail.challenge.name} / {detail.modality.modality_name}", [
+                ('description', detail.specific_description),
+                ('root cause', detail.specific_root_cause),
+                ('impact score', detail.impact_score),
+                ('impact', detail.impact_details),
+                ('maturity score', detail.maturity_score),
+                ('maturity', detail.maturity_details),
+                ('trends 3-5 years', detail.trends_3_5_years),
+            ])))
+
+    for project in Project.query.options(joinedload(Project.drug_substances)).all():
+        documents.append(('project', _render(f"[Project] {project.name}", [
+            ('indication', project.indication),
+            ('type', project.project_type),
+            ('status', project.status),
+            ('drug substances', ', '.join(ds.code for ds in project.drug_substances)),
+            ('SoD', project.sod),
+            ('RoFD', project.rofd),
+            ('submission', project.submission),
+            ('launch', project.launch),
+        ])))
+
+    for ds in DrugSubstance.query.options(joinedload(DrugSubstance.modality)).all():
+        documents.append(('drug_substance', _render(f"[Drug substance] {ds.code}", [
+            ('INN', ds.inn),
+            ('molecule type', ds.molecule_type),
+            ('modality', ds.modality.modality_name if ds.modality else None),
+            ('mechanism of action', ds.mechanism_of_action),
+            ('technology', ds.technology),
+            ('development site', ds.development_site),
+            ('launch site', ds.launch_site),
+        ])))
+
+    for dp in DrugProduct.query.all():
+        documents.append(('drug_product', _render(f"[Drug product] {dp.code}", [
+            ('pharm. form', dp.pharm_form),
+            ('classification', dp.classification),
+            ('technology', dp.technology),
+            ('development site', dp.development_site),
+        ])))
+
+    return documents
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The BM25 index for the current 'retrieval' data version (rebuilt on change)."""
+    global _index, _index_version
+    version = get_data_version('retrieval')
+    with _index_lock:
+        if _index is None or version is None or version != _index_version:
+            _index = BM25Index(load_documents())
+            _index_version = version
+        return _index
+
+
+def build_retrieval_context(query, token_budget=2000, top_k=20):
+    """
+    Top-k records for the query that fit into token_budget.
+
+    Returns:
+        (context_text, sources) - context_text is '' when nothing matched;
+        sources lists the entity type and first line of each included record
+    """
+    index = get_index()
+    lines, sources = [CONTEXT_HEADER], []
+    used = count_tokens(CONTEXT_HEADER)
+
+    for doc_index in index.search(query, top_k):
+        entity_type, text = index.documents[doc_index]
+        line = f"- {text}"
+        tokens = count_tokens(line)
+        if used + tokens > token_budget:
+            continue
+        lines.append(line)
+        sources.append({'type': entity_type, 'label': text.split(' | ', 1)[0]})
+        used += tokens
+
+    if not sources:
+        return '', []
+    return '\n'.join(lines), sources
@@ -2,13 +2,17 @@
 import requests
 import os
 import time
+import hashlib
+import threading
 import traceback
 from flask import session as flask_session, current_app
-from collections import deque
 import logging
 from flask_login import current_user
 from ..db import db
-from ..models import User, LLMSettings
+from ..models import User, LLMSettings, ChatMessage
+from .llm_context_service import build_retrieval_context
+from .export_service import count_tokens
+from sqlalchemy import delete, select
 from sqlalchemy.orm import joinedload
 
 # --- SDK Imports ---
@@ -17,10 +21,6 @@ from langchain_anthropic import ChatAnthropic
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# --- Global Apollo Token Cache ---
-_apollo_access_token = None
-_apollo_token_expiry = 0
-
 # --- API Key & URL Retrieval Functions ---
 
 def get_apollo_client_credentials():
@@ -36,78 +36,309 @@ def get_anthropic_api_key():
             return current_user.llm_settings.anthropic_api_key
     return current_app.config.get('ANTHROPIC_API_KEY')
 
+# --- Apollo Token Cache ---
+
+# Guards lazy creation of the per-process caches below
+_registry_lock = threading.Lock()
+
+def _credential_hash(*parts):
+    """Stable digest identifying credentials without keeping them in keys."""
+    return hashlib.sha256('\x00'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+class ApolloTokenCache:
+    """
+    Access tokens per (token URL, client id, secret hash), shared by all
+    threads of the process. Tokens are refreshed refresh_margin seconds
+    before expiry; refreshes are single-flight per key, and while one is in
+    flight other requests keep using the still valid token.
+    """
+
+    def __init__(self, refresh_margin=60):
+        self.refresh_margin = refresh_margin
+        self._tokens = {}  # key -> (access_token, expires_at)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key, fetch):
+        """
+        Returns a valid token for key, calling fetch() -> (token, expires_in)
+        at most once per expiry window.
+        """
+        entry = self._tokens.get(key)
+        if entry and time.time() < entry[1] - self.refresh_margin:
+            return entry[0]
+
+        lock = self._key_lock(key)
+        still_valid = entry is not None and time.time() < entry[1]
+        if still_valid:
+            # Early refresh: only one thread refreshes, the others go on with the current token
+            if not lock.acquire(blocking=False):
+                return entry[0]
+        else:
+            lock.acquire()
+
+        try:
+            # Another thread may have refreshed while this one waited
+            entry = self._tokens.get(key)
+            if entry and time.time() < entry[1] - self.refresh_margin:
+                return entry[0]
+
+            try:
+                access_token, expires_in = fetch()
+            except Exception:
+                if entry and time.time() < entry[1]:
+                    logging.warning("Apollo token refresh failed; using the current token until it expires.")
+                    return entry[0]
+                raise
+
+            self._tokens[key] = (access_token, time.time() + expires_in)
+            return access_token
+        finally:
+            lock.release()
+
+
+_apollo_token_cache = None
+
+def _get_apollo_token_cache():
+    global _apollo_token_cache
+    with _registry_lock:
+        if _apollo_token_cache is None:
+            _apollo_token_cache = ApolloTokenCache(
+                refresh_margin=current_app.config.get('APOLLO_TOKEN_REFRESH_MARGIN_SECONDS', 60)
+            )
+    return _apollo_token_cache
+
 def get_apollo_access_token():
-    global _apollo_access_token, _apollo_token_expiry
-    if _apollo_access_token and time.time() < _apollo_token_expiry:
-        return _apollo_access_token
-    
     client_id, client_secret = get_apollo_client_credentials()
     token_url = current_app.config.get('APOLLO_TOKEN_URL')
     
     if not all([client_id, client_secret, token_url]):
         raise ValueError("Apollo credentials or TOKEN_URL not configured.")
 
-    try:
-        response = requests.post(
-            token_url,
-            data={"grant_type": "client_credentials", "client_id": client_id, "client_secret": client_secret},
-            timeout=10
-        )
-        response.raise_for_status()
-        json_response = response.json()
-        _apollo_access_token = json_response['access_token']
-        _apollo_token_expiry = time.time() + json_response.get('expires_in', 3500)
-        return _apollo_access_token
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Apollo Token Error: Network request failed: {e}") from e
+    def fetch():
+        try:
+            response = requests.post(
+                token_url,
+                data={"grant_type": "client_credentials", "client_id": client_id, "client_secret": client_secret},
+                timeout=10
+            )
+            response.raise_for_status()
+            json_response = response.json()
+            return json_response['access_token'], json_response.get('expires_in', 3500)
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Apollo Token Error: Network request failed: {e}") from e
+
+    key = (token_url, client_id, _credential_hash(client_secret))
+    return _get_apollo_token_cache().get(key, fetch)
 
 # --- Chat History Management ---
 
-def _get_history_deque():
-    max_len = current_app.config.get('MAX_CHAT_HISTORY_LENGTH', 20)
-    return deque(flask_session.get('llm_chat_history', []), maxlen=max_len)
+# History lives in the chat_messages table with per-message token counts;
+# the session no longer carries it.
+
+# A message that only partly fits the budget is truncated if at least this many tokens are left
+HISTORY_TRUNCATE_MIN_TOKENS = 50
+TRUNCATION_MARKER = ' … [truncated]'
 
-def _save_history_deque(history_deque):
-    flask_session['llm_chat_history'] = list(history_deque)
-    flask_session.modified = True
+def get_chat_history(user_id=None):
+    """Stored history of the user for display, oldest first."""
+    user_id = user_id or current_user.id
+    rows = db.session.execute(
+        select(ChatMessage.role, ChatMessage.content)
+        .where(ChatMessage.user_id == user_id)
+        .order_by(ChatMessage.id.desc())
+        .limit(current_app.config.get('CHAT_HISTORY_RETENTION', 200))
+    ).all()
+    return [{'role': row.role, 'content': row.content} for row in reversed(rows)]
 
-def get_chat_history():
-    return list(_get_history_deque())
+def _truncate_to_tokens(content, token_count, max_tokens):
+    """Beginning of content within about max_tokens tokens, marked as truncated."""
+    budget = max_tokens - count_tokens(TRUNCATION_MARKER)
+    cut = content[:max(0, len(content) * budget // max(token_count, 1))]
+    while cut and count_tokens(cut) > budget:
+        cut = cut[:len(cut) * 9 // 10]
+    return cut + TRUNCATION_MARKER
 
-def add_message_to_history(role, content):
-    history_deque = _get_history_deque()
-    history_deque.append({'role': role, 'content': content})
-    _save_history_deque(history_deque)
+def get_prompt_history(user_id=None):
+    """
+    Recent history to send with a new message: newest turns first, up to
+    MAX_CHAT_HISTORY_LENGTH messages and LLM_HISTORY_TOKEN_BUDGET tokens.
+    The oldest message that does not fit is truncated, older ones are left
+    out. Returned oldest first, starting with a user message.
+    """
+    user_id = user_id or current_user.id
+    budget = current_app.config.get('LLM_HISTORY_TOKEN_BUDGET', 4000)
+    rows = db.session.execute(
+        select(ChatMessage.role, ChatMessage.content, ChatMessage.token_count)
+        .where(ChatMessage.user_id == user_id)
+        .order_by(ChatMessage.id.desc())
+        .limit(current_app.config.get('MAX_CHAT_HISTORY_LENGTH', 10))
+    ).all()
 
-def clear_chat_history():
+    history, used = [], 0
+    for row in rows:
+        if used + row.token_count <= budget:
+            history.append({'role': row.role, 'content': row.content})
+            used += row.token_count
+            continue
+        remaining = budget - used
+        if remaining >= HISTORY_TRUNCATE_MIN_TOKENS:
+            history.append({
+                'role': row.role,
+                'content': _truncate_to_tokens(row.content, row.token_count, remaining)
+            })
+        break
+
+    history.reverse()
+    while history and history[0]['role'] != 'user':
+        history.pop(0)
+    return history
+
+def add_message_to_history(role, content, user_id=None):
+    """Stores a message with its token count and drops messages beyond CHAT_HISTORY_RETENTION."""
+    user_id = user_id or current_user.id
+    db.session.add(ChatMessage(user_id=user_id, role=role, content=content, token_count=count_tokens(content)))
+    db.session.flush()
+
+    oldest_kept = select(ChatMessage.id).where(ChatMessage.user_id == user_id) \
+        .order_by(ChatMessage.id.desc()) \
+        .offset(current_app.config.get('CHAT_HISTORY_RETENTION', 200) - 1).limit(1) \
+        .scalar_subquery()
+    db.session.execute(
+        delete(ChatMessage).where(ChatMessage.user_id == user_id, ChatMessage.id < oldest_kept)
+    )
+    db.session.commit()
+
+def clear_chat_history(user_id=None):
+    user_id = user_id or current_user.id
+    db.session.execute(delete(ChatMessage).where(ChatMessage.user_id == user_id))
+    db.session.commit()
+    # History of sessions from before the chat_messages table
     flask_session.pop('llm_chat_history', None)
 
+def save_streamed_exchange(user_id, user_message, assistant_message):
+    """Stores a streamed exchange once the answer is complete."""
+    add_message_to_history('user', user_message, user_id)
+    add_message_to_history('assistant', assistant_message, user_id)
+
+# --- Client Registry ---
+
+class LLMClientRegistry:
+    """
+    Chat model instances reused across messages, keyed by (provider, model,
+    credential hash). Each instance keeps its own HTTP client, so reuse keeps
+    connections (and TLS sessions) alive. Entries idle for longer than
+    idle_seconds are evicted; at most max_clients are kept.
+    """
+
+    def __init__(self, idle_seconds=600, max_clients=32):
+        self.idle_seconds = idle_seconds
+        self.max_clients = max_clients
+        self._clients = {}  # key -> [client, last_used]
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._clients.get(key)
+            if entry:
+                entry[1] = now
+                return entry[0]
+
+        client = factory()
+        with self._lock:
+            entry = self._clients.setdefault(key, [client, now])
+            if len(self._clients) > self.max_clients:
+                oldest = min(self._clients, key=lambda k: self._clients[k][1])
+                del self._clients[oldest]
+            return entry[0]
+
+    def _evict(self, now):
+        for key in [k for k, (_, last_used) in self._clients.items() if now - last_used > self.idle_seconds]:
+            del self._clients[key]
+
+
+class TTLCache:
+    """Thread-safe value cache with a fixed time to live per entry."""
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            self._entries.pop(key, None)
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+
+_client_registry = None
+_model_list_cache = None
+
+def _get_client_registry():
+    global _client_registry
+    with _registry_lock:
+        if _client_registry is None:
+            _client_registry = LLMClientRegistry(
+                idle_seconds=current_app.config.get('LLM_CLIENT_IDLE_SECONDS', 600),
+                max_clients=current_app.config.get('LLM_CLIENT_MAX', 32)
+            )
+    return _client_registry
+
+def _get_model_list_cache():
+    global _model_list_cache
+    with _registry_lock:
+        if _model_list_cache is None:
+            _model_list_cache = TTLCache(current_app.config.get('LLM_MODEL_LIST_TTL_SECONDS', 300))
+    return _model_list_cache
+
 # --- Provider-Specific API Call ---
 
-def _call_apollo(model_id, messages, **kwargs):
-    llm_model = ChatOpenAI(
+def _apollo_model(model_id):
+    base_url = current_app.config.get('APOLLO_LLM_API_BASE_URL')
+    access_token = get_apollo_access_token()
+    key = ('apollo', model_id, _credential_hash(base_url, access_token))
+    return _get_client_registry().get(key, lambda: ChatOpenAI(
         model=model_id,
-        base_url=current_app.config.get('APOLLO_LLM_API_BASE_URL'),
-        api_key=get_apollo_access_token(),
+        base_url=base_url,
+        api_key=access_token,
         temperature=0.1,
         timeout=300
-    )
-    response = llm_model.invoke(messages)
-    return response.content
+    ))
 
-def _call_anthropic(model_id, messages, **kwargs):
-    """Call Anthropic API using LangChain."""
+def _anthropic_model(model_id):
     api_key = get_anthropic_api_key()
     if not api_key:
         raise ValueError("Anthropic API key not configured.")
-    
-    llm_model = ChatAnthropic(
+
+    key = ('anthropic', model_id, _credential_hash(api_key))
+    return _get_client_registry().get(key, lambda: ChatAnthropic(
         model=model_id,
         api_key=api_key,
         temperature=0.1,
         timeout=300
-    )
-    response = llm_model.invoke(messages)
+    ))
+
+def _call_apollo(model_id, messages, **kwargs):
+    response = _apollo_model(model_id).invoke(messages)
+    return response.content
+
+def _call_anthropic(model_id, messages, **kwargs):
+    """Call Anthropic API using LangChain."""
+    response = _anthropic_model(model_id).invoke(messages)
     return response.content
 
 # --- Main Dispatcher Function ---
@@ -117,18 +348,94 @@ PROVIDER_HANDLERS = {
     "anthropic": _call_anthropic
 }
 
-def generate_chat_response(model_name, user_message, system_prompt, chat_history):
-    provider, model_id = model_name.split('-', 1) if '-' in model_name else ("unknown", model_name)
-    handler = PROVIDER_HANDLERS.get(provider)
-    if not handler:
-        return {"success": False, "message": f"Unsupported LLM provider: {provider}"}
+# Chat model factories, used for streaming
+PROVIDER_MODELS = {
+    "apollo": _apollo_model,
+    "anthropic": _anthropic_model
+}
+
+def _split_model_name(model_name):
+    return model_name.split('-', 1) if '-' in model_name else ("unknown", model_name)
 
+def get_retrieval_context(user_message):
+    """
+    Database records relevant to the message, within LLM_CONTEXT_TOKEN_BUDGET.
+
+    Returns:
+        (context_text, sources) - ('', []) if nothing matched or retrieval failed
+    """
+    try:
+        return build_retrieval_context(
+            user_message,
+            token_budget=current_app.config.get('LLM_CONTEXT_TOKEN_BUDGET', 2000),
+            top_k=current_app.config.get('LLM_CONTEXT_TOP_K', 20)
+        )
+    except Exception as e:
+        logging.error(f"Retrieval context failed: {e}\n{traceback.format_exc()}")
+        return '', []
+
+def _build_messages(user_message, system_prompt, chat_history, context=None):
     messages_for_api = []
-    if system_prompt:
-        messages_for_api.append({'role': 'system', 'content': system_prompt})
+    system_content = '\n\n'.join(part for part in (system_prompt, context) if part)
+    if system_content:
+        messages_for_api.append({'role': 'system', 'content': system_content})
     if chat_history:
         messages_for_api.extend(chat_history)
     messages_for_api.append({'role': 'user', 'content': user_message})
+    return messages_for_api
+
+def _chunk_text(chunk):
+    """Text of a streamed message chunk (Anthropic chunks may carry content blocks)."""
+    content = chunk.content
+    if isinstance(content, list):
+        return ''.join(block.get('text', '') for block in content if isinstance(block, dict))
+    return content or ''
+
+def stream_chat_response(model_name, user_message, system_prompt, chat_history, context=None):
+    """
+    Prepares a streamed chat completion. The model (credentials, Apollo token)
+    is set up immediately, inside the request; the returned iterator yields
+    text deltas as the provider produces them. context (see
+    get_retrieval_context) is appended to the system prompt.
+
+    Returns:
+        (success, message, iterator) - iterator is None on failure. The
+        iterator raises ValueError if the provider fails mid-stream.
+    """
+    provider, model_id = _split_model_name(model_name)
+    model_factory = PROVIDER_MODELS.get(provider)
+    if not model_factory:
+        return False, f"Unsupported LLM provider: {provider}", None
+
+    messages_for_api = _build_messages(user_message, system_prompt, chat_history, context)
+    try:
+        llm_model = model_factory(model_id)
+    except Exception as e:
+        error_msg = f"Error from {provider.capitalize()} API: {e}"
+        logging.error(f"{error_msg}\n{traceback.format_exc()}")
+        return False, error_msg, None
+
+    def deltas():
+        logging.info(f"Streaming from provider '{provider}' with model '{model_id}'...")
+        try:
+            for chunk in llm_model.stream(messages_for_api):
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+        except Exception as e:
+            error_msg = f"Error from {provider.capitalize()} API: {e}"
+            logging.error(f"{error_msg}\n{traceback.format_exc()}")
+            raise ValueError(error_msg) from e
+
+    return True, "Stream ready.", deltas()
+
+def generate_chat_response(model_name, user_message, system_prompt, chat_history, context=None):
+    provider, model_id = _split_model_name(model_name)
+    handler = PROVIDER_HANDLERS.get(provider)
+    if not handler:
+        return {"success": False, "message": f"Unsupported LLM provider: {provider}"}
+
+    messages_for_api = _build_messages(user_message, system_prompt, chat_history, context)
 
     try:
         logging.info(f"Calling provider '{provider}' with model '{model_id}'...")
@@ -142,13 +449,23 @@ def generate_chat_response(model_name, user_message, system_prompt, chat_history
 # --- Model Discovery ---
 
 def get_available_apollo_models():
+    """Chat models of the Apollo gateway, cached for LLM_MODEL_LIST_TTL_SECONDS per credentials."""
     apollo_url = current_app.config.get('APOLLO_LLM_API_BASE_URL')
     if not apollo_url: return []
     try:
+        client_id, _ = get_apollo_client_credentials()
+        cache = _get_model_list_cache()
+        cache_key = ('apollo', _credential_hash(apollo_url, client_id))
+        models = cache.get(cache_key)
+        if models is not None:
+            return list(models)
+
         access_token = get_apollo_access_token()
         response = requests.get(f"{apollo_url}/model_group/info", headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
         response.raise_for_status()
-        return [f"apollo-{model['model_group']}" for model in response.json().get('data', []) if model.get('mode') == 'chat']
+        models = [f"apollo-{model['model_group']}" for model in response.json().get('data', []) if model.get('mode') == 'chat']
+        cache.put(cache_key, models)
+        return list(models)
     except Exception as e:
         return [f"apollo-Error: {e.__class__.__name__}"]
 
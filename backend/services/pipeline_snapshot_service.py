@@ -0,0 +1,67 @@
+# backend/services/pipeline_snapshot_service.py
+"""
+Point-in-time copies of the pipeline for historical timeline views.
+
+A snapshot copies every project's timeline inputs (attributes, resolved
+modality name and milestone dates) into pipeline_snapshot_projects with a
+single INSERT ... SELECT. The timeline service reads them for as_of requests.
+Snapshots are taken on demand or periodically via `flask pipeline-snapshot`.
+"""
+import traceback
+
+from sqlalchemy import insert, literal, select
+
+from ..db import db
+from ..models import Project, PipelineSnapshot, PipelineSnapshotProject
+from .pipeline_timeline_service import project_modality_name_expr
+
+# Project columns copied verbatim into a snapshot
+SNAPSHOT_COLUMNS = [
+    'name', 'indication', 'project_type', 'status',
+    'sod', 'dsmm3', 'dsmm4', 'dpmm3', 'dpmm4', 'rofd', 'submission', 'launch',
+]
+
+
+def create_snapshot(note=None):
+    """
+    Copies the current pipeline into a new snapshot.
+
+    Args:
+        note: Optional free-text label (e.g. 'Q3 portfolio review')
+
+    Returns:
+        (success, message, snapshot_dict)
+    """
+    try:
+        snapshot = PipelineSnapshot(note=note, project_count=0)
+        db.session.add(snapshot)
+        db.session.flush()
+
+        target_columns = ['snapshot_id', 'project_id', 'modality_name'] + SNAPSHOT_COLUMNS
+        source = select(
+            literal(snapshot.id),
+            Project.id,
+            project_modality_name_expr(),
+            *[getattr(Project, column) for column in SNAPSHOT_COLUMNS]
+        )
+        result = db.session.execute(
+            insert(PipelineSnapshotProject.__table__).from_select(target_columns, source)
+        )
+
+        snapshot.project_count = result.rowcount
+        db.session.commit()
+        print(f"Pipeline snapshot {snapshot.id} created with {snapshot.project_count} projects")
+        return True, f"Snapshot created with {snapshot.project_count} projects", snapshot.to_dict()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error creating pipeline snapshot: {e}")
+        traceback.print_exc()
+        return False, f"Error creating snapshot: {str(e)}", None
+
+
+def list_snapshots(limit=100):
+    """Most recent snapshots first, as dicts."""
+    snapshots = db.session.execute(
+        select(PipelineSnapshot).order_by(PipelineSnapshot.taken_at.desc()).limit(limit)
+    ).scalars()
+    return [snapshot.to_dict() for snapshot in snapshots]
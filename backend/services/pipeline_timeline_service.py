@@ -8,11 +8,206 @@ Updated to use Project model instead of Product model.
 """
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from sqlalchemy import func, or_, select, case, literal, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from datetime import datetime, date
+from bisect import bisect_right
+import base64
+import json
+
+from ..models import (Project, DrugSubstance, Modality, PipelineSnapshot, PipelineSnapshotProject,
+                      project_drug_substances, db)
+
+
+class TimelineAxis:
+    """
+    Compiled timeline axis for one request.
+
+    Periods are integer ordinals (year, year * 4 + quarter, year * 12 + month)
+    so every granularity shares one lookup: sorted, non-overlapping
+    (start, end, label) intervals searched with bisect. Year axes come from
+    the 'individual' / 'grouped' presets or custom segments; quarter and
+    month axes span the data range. Axes longer than max_units are
+    coarsened (month → quarter → year → multi-year groups).
+    Element, swim lane and metadata builders share one instance.
+    """
+
+    # Year-based axes always extend at least to this year
+    MIN_END_YEAR = 2045
+
+    # Years per segment of the 'grouped' preset
+    GROUP_SIZE = 3
+
+    # Periods per year for each granularity, finest last
+    PERIODS_PER_YEAR = {'year': 1, 'quarter': 4, 'month': 12}
+    COARSER = {'month': 'quarter', 'quarter': 'year'}
+
+    def __init__(self, units: List[str], intervals: List[Tuple[int, int, str]], date_field: str,
+                 granularity: str = 'year', custom: bool = False):
+        self.units = units
+        self.unit_set = set(units)
+        self.intervals = intervals  # (period_start, period_end, label), sorted, non-overlapping
+        self.date_field = date_field
+        self.granularity = granularity
+        self.custom = custom  # built from customSegments, may leave gaps around and between units
+
+        self._starts = [start for start, _, _ in intervals]
+        self._ends = [end for _, end, _ in intervals]
+        self._labels = [label for _, _, label in intervals]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], dates: Iterable[Any],
+                    max_units: Optional[int] = None) -> 'TimelineAxis':
+        """
+        Args:
+            config: Configuration with granularity, yearSegmentPreset, customSegments and dateSource
+            dates: Milestone dates of the displayed projects; only min/max matter
+            max_units: Upper bound for the number of units (None for no bound)
 
-from ..models import Project, DrugSubstance, Modality, db
+        Returns:
+            TimelineAxis for the config
+        """
+        date_field = PipelineTimelineService.MILESTONE_FIELD_MAP.get(config.get('dateSource', 'launch'), 'launch')
+        preset = config.get('yearSegmentPreset', 'individual')
+
+        if preset == 'custom' and config.get('customSegments'):
+            segments = config['customSegments']
+            return cls([seg['label'] for seg in segments], cls._compile_segments(segments), date_field,
+                       custom=True)
+
+        dates = [value for value in dates if value is not None]
+        granularity = config.get('granularity', 'year')
+        if granularity not in cls.PERIODS_PER_YEAR:
+            granularity = 'year'
+
+        if granularity == 'year' or not dates:
+            return cls._build_year_axis(preset, [value.year for value in dates], date_field, max_units)
+
+        first, last = cls.period_of(min(dates), granularity), cls.period_of(max(dates), granularity)
+        while max_units and last - first + 1 > max_units and granularity in cls.COARSER:
+            granularity = cls.COARSER[granularity]
+            first, last = cls.period_of(min(dates), granularity), cls.period_of(max(dates), granularity)
+
+        if granularity == 'year':
+            return cls._build_year_axis('individual', [first, last], date_field, max_units)
+
+        intervals = [(period, period, cls.period_label(period, granularity)) for period in range(first, last + 1)]
+        return cls([label for _, _, label in intervals], intervals, date_field, granularity)
+
+    @classmethod
+    def _build_year_axis(cls, preset: str, years: List[int], date_field: str,
+                         max_units: Optional[int]) -> 'TimelineAxis':
+        if not years:
+            min_year = datetime.now().year
+            max_year = cls.MIN_END_YEAR
+        else:
+            min_year = min(years)
+            max_year = max(max(years), cls.MIN_END_YEAR)
+
+        group_size = cls.GROUP_SIZE if preset == 'grouped' else 1
+        year_count = max_year - min_year + 1
+        if max_units and year_count > max_units * group_size:
+            group_size = -(-year_count // max_units)
+
+        intervals = []
+        for start_year in range(min_year, max_year + 1, group_size):
+            end_year = min(start_year + group_size - 1, max_year)
+            label = str(start_year) if start_year == end_year else f"{start_year}-{end_year}"
+            intervals.append((start_year, end_year, label))
+
+        return cls([label for _, _, label in intervals], intervals, date_field)
+
+    @staticmethod
+    def _compile_segments(segments: List[Dict[str, Any]]) -> List[Tuple[int, int, str]]:
+        """
+        Splits possibly overlapping custom segments into disjoint intervals,
+        keeping the first matching segment's label for each year.
+        """
+        bounds = sorted({seg['yearStart'] for seg in segments} | {seg['yearEnd'] + 1 for seg in segments})
+        intervals = []
+        for start, next_start in zip(bounds, bounds[1:]):
+            label = next(
+                (seg['label'] for seg in segments if seg['yearStart'] <= start <= seg['yearEnd']),
+                None
+            )
+            if label is not None:
+                intervals.append((start, next_start - 1, label))
+        return intervals
+
+    @classmethod
+    def period_of(cls, value: Any, granularity: str) -> int:
+        """Period ordinal of a date at the given granularity."""
+        periods = cls.PERIODS_PER_YEAR[granularity]
+        return value.year * periods + (value.month - 1) * periods // 12
+
+    @classmethod
+    def period_label(cls, period: int, granularity: str) -> str:
+        periods = cls.PERIODS_PER_YEAR[granularity]
+        year, index = divmod(period, periods)
+        if granularity == 'quarter':
+            return f"{year}-Q{index + 1}"
+        if granularity == 'month':
+            return f"{year}-{index + 1:02d}"
+        return str(year)
+
+    @classmethod
+    def period_start_date(cls, period: int, granularity: str) -> date:
+        periods = cls.PERIODS_PER_YEAR[granularity]
+        year, index = divmod(period, periods)
+        return date(year, index * 12 // periods + 1, 1)
+
+    def position_for_period(self, period: Optional[int]) -> Optional[str]:
+        """Unit label for a period ordinal, or None if it is not on the axis."""
+        if period is None:
+            return None
+        i = bisect_right(self._starts, period) - 1
+        if i >= 0 and period <= self._ends[i]:
+            return self._labels[i]
+        return None
+
+    def position_for_date(self, value: Any) -> Optional[str]:
+        if not value:
+            return None
+        return self.position_for_period(self.period_of(value, self.granularity))
+
+    def position(self, project: Project) -> Optional[str]:
+        """Unit label for a project's milestone date."""
+        return self.position_for_date(getattr(project, self.date_field, None))
+
+    def interval_dates(self) -> List[Tuple[date, date, str]]:
+        """Intervals as half-open [start, end) date ranges, for SQL predicates."""
+        return [
+            (
+                self.period_start_date(start, self.granularity),
+                self.period_start_date(end + 1, self.granularity),
+                label
+            )
+            for start, end, label in self.intervals
+        ]
+
+
+def project_modality_name_expr():
+    """
+    SQL equivalent of PipelineTimelineService._get_project_modality_name:
+    molecule_type of the project's first drug substance (lowest id), falling
+    back to its modality. Correlated to Project.
+    """
+    ds = DrugSubstance.__table__
+    modality = Modality.__table__
+    return (
+        select(func.coalesce(func.nullif(ds.c.molecule_type, ''), modality.c.modality_name))
+        .select_from(
+            project_drug_substances
+            .join(ds, ds.c.id == project_drug_substances.c.drug_substance_id)
+            .outerjoin(modality, modality.c.modality_id == ds.c.modality_id)
+        )
+        .where(project_drug_substances.c.project_id == Project.id)
+        .order_by(ds.c.id)
+        .limit(1)
+        .correlate(Project)
+        .scalar_subquery()
+    )
 
 
 class PipelineTimelineService:
@@ -55,16 +250,22 @@ class PipelineTimelineService:
     # Project types that count as "line extensions"
     LINE_EXTENSION_TYPES = ['NI', 'PMO', 'PED']
 
+    # Upper bound for timeline units; finer axes are coarsened to fit
+    MAX_TIMELINE_UNITS = 120
+
     def __init__(self, db_session: Session = None):
         """Initialize the service with a database session."""
         self.db = db_session or db.session
 
     def _get_project_modality_name(self, project: Project) -> Optional[str]:
-        """Get modality name from project's first drug substance.
+        """Get modality name from project's first drug substance (lowest id).
 
         Uses molecule_type field as the primary source (e.g., 'Small molecule', 'mAb').
         Falls back to modality relationship if molecule_type is not set.
+        Snapshot rows carry the name resolved when the snapshot was taken.
         """
+        if isinstance(project, PipelineSnapshotProject):
+            return project.modality_name
         if project.drug_substances:
             ds = project.drug_substances[0]
             # Primary: use molecule_type field
@@ -130,6 +331,11 @@ class PipelineTimelineService:
                 - elementType: 'project' | 'modality'
                 - colorBy: 'modality' | 'phase' | 'status'
                 - filters: Additional filter criteria
+                - as_of: Optional ISO date; reads the latest pipeline snapshot
+                  taken on or before that day instead of the live tables
+                - lazyLanes: If True, swim lanes are returned as headers with
+                  element counts only; elements are fetched per lane with
+                  get_lane_elements (ignored for elementType 'modality')
 
         Returns:
             Dictionary with structure:
@@ -143,27 +349,217 @@ class PipelineTimelineService:
         # Include dateSource in filters for _fetch_projects
         filters = config.get('filters', {}).copy()
         filters['date_source'] = config.get('dateSource', 'launch')
-        projects = self._fetch_projects(filters)
-        timeline_units = self._build_timeline_units(config, projects)
+        source, snapshot = self._resolve_source(config)
 
-        if config.get('groupingMode') == 'none':
-            elements = self._prepare_elements(projects, config, timeline_units)
-            return {
-                'timeline_units': timeline_units,
-                'elements': elements,
-                'swim_lanes': [],
-                'metadata': self._build_metadata(config, projects, timeline_units)
-            }
+        # Modality boxes are aggregated in PostgreSQL, no projects are loaded
+        if config.get('elementType') == 'modality':
+            data = self._get_modality_timeline_data(config, filters, source, snapshot)
+        elif config.get('lazyLanes') and config.get('groupingMode', 'modality') != 'none':
+            data = self._get_lane_headers(config, filters, source, snapshot)
         else:
-            swim_lanes = self._build_swim_lanes(projects, config, timeline_units)
-            return {
-                'timeline_units': timeline_units,
-                'swim_lanes': swim_lanes,
-                'elements': [],
-                'metadata': self._build_metadata(config, projects, timeline_units)
+            projects = self._fetch_projects(filters, source, snapshot)
+            axis = self._build_axis(config, projects)
+
+            if config.get('groupingMode') == 'none':
+                elements = self._prepare_project_elements(projects, config, axis)
+                data = {
+                    'timeline_units': axis.units,
+                    'elements': elements,
+                    'swim_lanes': [],
+                    'metadata': self._build_metadata(config, projects, axis)
+                }
+            else:
+                swim_lanes = self._build_swim_lanes(projects, config, axis)
+                data = {
+                    'timeline_units': axis.units,
+                    'swim_lanes': swim_lanes,
+                    'elements': [],
+                    'metadata': self._build_metadata(config, projects, axis)
+                }
+
+        data['metadata']['as_of'] = config.get('as_of')
+        data['metadata']['snapshot'] = snapshot.to_dict() if snapshot else None
+        return data
+
+    def _resolve_source(self, config: Dict[str, Any]) -> Tuple[Any, Optional[PipelineSnapshot]]:
+        """
+        Picks the table the timeline reads from.
+
+        Args:
+            config: Configuration dictionary, optionally with 'as_of' (ISO date)
+
+        Returns:
+            (Project, None) for the live pipeline, or (PipelineSnapshotProject,
+            snapshot) for the latest snapshot taken on or before as_of
+
+        Raises:
+            ValueError: If as_of is malformed or no snapshot exists for it
+        """
+        as_of = config.get('as_of')
+        if not as_of:
+            return Project, None
+
+        try:
+            as_of_date = date.fromisoformat(str(as_of)[:10])
+        except ValueError:
+            raise ValueError(f"Invalid as_of date: {as_of}")
+
+        snapshot = self.db.execute(
+            select(PipelineSnapshot)
+            .where(func.date(PipelineSnapshot.taken_at) <= as_of_date)
+            .order_by(PipelineSnapshot.taken_at.desc())
+            .limit(1)
+        ).scalar()
+        if snapshot is None:
+            raise ValueError(f"No pipeline snapshot exists on or before {as_of_date.isoformat()}")
+        return PipelineSnapshotProject, snapshot
+
+    def get_timeline_diff(self, base_config: Dict[str, Any],
+                          compare_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compares two timeline views (e.g. two dateSources, filters or as_of
+        snapshots) and returns only the projects that differ.
+
+        Both views are positioned on one axis built from base_config's axis
+        settings over the date range of both views, so positions and unit
+        deltas are comparable. Both views are computed in a single query
+        (FULL OUTER JOIN of the two filtered project sets).
+
+        Args:
+            base_config: Configuration of the reference view (see get_timeline_data)
+            compare_config: Configuration of the view compared against it
+
+        Returns:
+            Dictionary with structure:
+            {
+                "timeline_units": [...],
+                "moved": [...],    (in both views, different position)
+                "added": [...],    (only in the compare view)
+                "removed": [...],  (only in the base view)
+                "metadata": {...}
             }
 
-    def _fetch_projects(self, filters: Dict[str, Any]) -> List[Project]:
+        Raises:
+            ValueError: If an as_of cannot be resolved (see _resolve_source)
+        """
+        sides = {}
+        for name, config in (('base', base_config), ('compare', compare_config)):
+            filters = config.get('filters', {}).copy()
+            filters['date_source'] = config.get('dateSource', 'launch')
+            source, snapshot = self._resolve_source(config)
+            sides[name] = {
+                'config': config,
+                'source': source,
+                'snapshot': snapshot,
+                'conditions': self._project_filter_conditions(filters, source, snapshot),
+                'date_field': self._get_date_field(filters['date_source'], source),
+            }
+
+        # Project counts and the date range of both views, for the shared axis
+        stats = [
+            select(
+                func.count(side['source'].id).label(f'{name}_count'),
+                func.min(side['date_field']).label(f'{name}_min'),
+                func.max(side['date_field']).label(f'{name}_max'),
+            ).where(*side['conditions']).subquery(f'{name}_stats')
+            for name, side in sides.items()
+        ]
+        counts = self.db.execute(select(*stats)).one()
+
+        axis = TimelineAxis.from_config(
+            base_config,
+            (counts.base_min, counts.base_max, counts.compare_min, counts.compare_max),
+            self._max_units(base_config)
+        )
+
+        views = {}
+        for name, side in sides.items():
+            source = side['source']
+            views[name] = select(
+                source.id.label('id'),
+                source.name.label('name'),
+                self._modality_name_expr(source).label('modality_name'),
+                side['date_field'].label('milestone'),
+                self._position_expr(axis, source, side['date_field']).label('position'),
+            ).where(*side['conditions']).subquery(name)
+        base, compare = views['base'], views['compare']
+
+        diff_query = (
+            select(
+                func.coalesce(base.c.id, compare.c.id).label('project_id'),
+                func.coalesce(compare.c.name, base.c.name).label('project_name'),
+                func.coalesce(compare.c.modality_name, base.c.modality_name).label('modality_name'),
+                base.c.milestone.label('from_date'),
+                compare.c.milestone.label('to_date'),
+                base.c.position.label('from_position'),
+                compare.c.position.label('to_position'),
+            )
+            .select_from(base.join(compare, base.c.id == compare.c.id, full=True))
+            .where(or_(
+                base.c.id.is_(None),
+                compare.c.id.is_(None),
+                base.c.position.is_distinct_from(compare.c.position)
+            ))
+            .order_by(func.coalesce(compare.c.name, base.c.name))
+        )
+
+        unit_index = {unit: i for i, unit in enumerate(axis.units)}
+        moved, added, removed = [], [], []
+        for row in self.db.execute(diff_query):
+            # Positions off the axis (e.g. outside custom segments) count as absent
+            from_position = row.from_position if row.from_position in unit_index else None
+            to_position = row.to_position if row.to_position in unit_index else None
+            entry = {
+                'project_id': row.project_id,
+                'project_name': row.project_name,
+                'modality_name': row.modality_name,
+            }
+
+            if from_position and to_position:
+                entry.update({
+                    'from_position': from_position,
+                    'to_position': to_position,
+                    'unit_delta': unit_index[to_position] - unit_index[from_position],
+                    'from_date': row.from_date.isoformat(),
+                    'to_date': row.to_date.isoformat(),
+                    'delta_days': (row.to_date - row.from_date).days,
+                })
+                moved.append(entry)
+            elif to_position:
+                entry.update({'position': to_position, 'date': row.to_date.isoformat()})
+                added.append(entry)
+            elif from_position:
+                entry.update({'position': from_position, 'date': row.from_date.isoformat()})
+                removed.append(entry)
+
+        return {
+            'timeline_units': axis.units,
+            'moved': moved,
+            'added': added,
+            'removed': removed,
+            'metadata': {
+                'granularity': axis.granularity,
+                'base': self._diff_side_metadata(sides['base'], counts.base_count),
+                'compare': self._diff_side_metadata(sides['compare'], counts.compare_count),
+                'moved_count': len(moved),
+                'added_count': len(added),
+                'removed_count': len(removed),
+                'generated_at': datetime.now().isoformat()
+            }
+        }
+
+    def _diff_side_metadata(self, side: Dict[str, Any], total: int) -> Dict[str, Any]:
+        """Summary of one view of a timeline diff."""
+        config = side['config']
+        return {
+            'date_source': config.get('dateSource', 'launch'),
+            'as_of': config.get('as_of'),
+            'snapshot': side['snapshot'].to_dict() if side['snapshot'] else None,
+            'total_projects': total,
+        }
+
+    def _fetch_projects(self, filters: Dict[str, Any], source=Project,
+                        snapshot: Optional[PipelineSnapshot] = None) -> List[Any]:
         """
         Fetches projects from database with eager loading of relationships.
 
@@ -174,130 +570,124 @@ class PipelineTimelineService:
                 - include_line_extensions: If False, only returns NMEs (default: True)
                 - exclude_discontinued: If True, excludes discontinued projects (default: True)
                 - date_source: Milestone field to use for filtering (launch, sod, rofd, etc.)
+            source: Project, or PipelineSnapshotProject for an as_of read
+            snapshot: Snapshot to read when source is PipelineSnapshotProject
 
         Returns:
-            List of Project objects
+            List of Project (or PipelineSnapshotProject) objects
         """
-        query = self.db.query(Project).options(
-            joinedload(Project.drug_substances).joinedload(DrugSubstance.modality)
-        )
+        query = self._project_query(source)
+        query = query.filter(*self._project_filter_conditions(filters, source, snapshot))
+
+        return query.order_by(source.name).all()
+
+    def _project_query(self, source=Project):
+        """ORM query over the source, eager loading what element builders read."""
+        query = self.db.query(source)
+        if source is Project:
+            query = query.options(
+                joinedload(Project.drug_substances).joinedload(DrugSubstance.modality)
+            )
+        return query
+
+    def _get_date_field(self, date_source: str, source=Project):
+        """Returns the source column for a dateSource value."""
+        return getattr(source, self.MILESTONE_FIELD_MAP.get(date_source, 'launch'))
+
+    def _project_filter_conditions(self, filters: Dict[str, Any], source=Project,
+                                   snapshot: Optional[PipelineSnapshot] = None) -> List[Any]:
+        """
+        Builds the WHERE conditions shared by the ORM and the aggregate query paths.
+
+        Args:
+            filters: Filter criteria as described in _fetch_projects
+            source: Project, or PipelineSnapshotProject for an as_of read
+            snapshot: Snapshot to restrict PipelineSnapshotProject rows to
+
+        Returns:
+            List of SQLAlchemy filter expressions
+        """
+        conditions = []
+        if snapshot is not None:
+            conditions.append(PipelineSnapshotProject.snapshot_id == snapshot.id)
 
         # Get the dynamic date field based on date_source
-        date_source = filters.get('date_source', 'launch')
-        field_name = self.MILESTONE_FIELD_MAP.get(date_source, 'launch')
-        date_field = getattr(Project, field_name)
+        date_field = self._get_date_field(filters.get('date_source', 'launch'), source)
 
         # Filter: Only NMEs (exclude line extensions)
         include_line_extensions = filters.get('include_line_extensions', True)
         if not include_line_extensions:
-            query = query.filter(Project.project_type == 'NME')
+            conditions.append(source.project_type == 'NME')
 
-        # Filter: Exclude discontinued projects
+        # Filter: Exclude discontinued projects (same predicate as the partial
+        # milestone indexes, so the planner can match them)
         exclude_discontinued = filters.get('exclude_discontinued', True)
         if exclude_discontinued:
-            query = query.filter(
+            conditions.append(
                 or_(
-                    Project.status == None,
-                    Project.status != 'discontinued'
+                    source.status == None,
+                    source.status != 'discontinued'
                 )
             )
 
         # Filter: By indication (therapeutic area equivalent)
         if filters.get('indication'):
-            query = query.filter(Project.indication == filters['indication'])
+            conditions.append(source.indication == filters['indication'])
 
         # Filter: By project type
         if filters.get('project_type'):
             types = filters['project_type']
             if isinstance(types, list):
-                query = query.filter(Project.project_type.in_(types))
+                conditions.append(source.project_type.in_(types))
             else:
-                query = query.filter(Project.project_type == types)
+                conditions.append(source.project_type == types)
 
         # Only include projects with a date for the selected milestone
-        query = query.filter(date_field.isnot(None))
+        conditions.append(date_field.isnot(None))
 
-        # Filter: By year range (using the selected date source)
+        # Filter: By year range (using the selected date source); plain date
+        # comparisons so the milestone indexes can be used
         if filters.get('year_from'):
-            query = query.filter(
-                func.extract('year', date_field) >= filters['year_from']
-            )
+            conditions.append(date_field >= date(int(filters['year_from']), 1, 1))
         if filters.get('year_to'):
-            query = query.filter(
-                func.extract('year', date_field) <= filters['year_to']
-            )
+            conditions.append(date_field < date(int(filters['year_to']) + 1, 1, 1))
 
-        return query.order_by(Project.name).all()
+        return conditions
 
-    def _build_timeline_units(self, config: Dict[str, Any], projects: List[Project]) -> List[str]:
+    def _build_axis(self, config: Dict[str, Any], projects: List[Project]) -> TimelineAxis:
         """
-        Builds the timeline axis units (years).
+        Builds the timeline axis (years, quarters, months, year groups or custom segments).
 
         Args:
             config: Configuration dictionary
-            projects: List of projects to analyze
-
-        Returns:
-            List of timeline unit labels
-        """
-        return self._build_year_timeline(config, projects)
-
-    def _build_year_timeline(self, config: Dict[str, Any], projects: List[Project]) -> List[str]:
-        """
-        Builds year-based timeline units.
-
-        Args:
-            config: Configuration with yearSegmentPreset, customSegments, and dateSource
-            projects: List of projects to determine year range
+            projects: List of projects to determine the date range
 
         Returns:
-            List of year or year-range labels
+            TimelineAxis shared by all builders of this request
         """
-        preset = config.get('yearSegmentPreset', 'individual')
-        date_source = config.get('dateSource', 'launch')
-
-        if preset == 'custom' and config.get('customSegments'):
-            return [seg['label'] for seg in config['customSegments']]
-
-        years = [self._get_milestone_year(p, date_source) for p in projects]
-        years = [y for y in years if y is not None]
-
-        if not years:
-            current_year = datetime.now().year
-            min_year = current_year
-            max_year = 2045
-        else:
-            min_year = min(years)
-            max_year = max(max(years), 2045)  # Mindestens bis 2045
-
-        years = list(range(min_year, max_year + 1))
-
-        if preset == 'individual':
-            return [str(year) for year in years]
-
-        elif preset == 'grouped':
-            segments = []
-            start_year = min(years)
-            while start_year <= max(years):
-                end_year = min(start_year + 2, max(years))
-                if start_year == end_year:
-                    segments.append(str(start_year))
-                else:
-                    segments.append(f"{start_year}-{end_year}")
-                start_year = end_year + 1
-            return segments
+        field_name = self.MILESTONE_FIELD_MAP.get(config.get('dateSource', 'launch'), 'launch')
+        return TimelineAxis.from_config(
+            config,
+            (getattr(p, field_name, None) for p in projects),
+            self._max_units(config)
+        )
 
-        return [str(year) for year in years]
+    def _max_units(self, config: Dict[str, Any]) -> int:
+        """Unit cap for the axis: the client's maxUnits, bounded by MAX_TIMELINE_UNITS."""
+        requested = config.get('maxUnits')
+        if isinstance(requested, int) and requested > 0:
+            return min(requested, self.MAX_TIMELINE_UNITS)
+        return self.MAX_TIMELINE_UNITS
 
     def _build_swim_lanes(self, projects: List[Project], config: Dict[str, Any],
-                         timeline_units: List[str]) -> List[Dict[str, Any]]:
+                         axis: TimelineAxis) -> List[Dict[str, Any]]:
         """
         Groups projects into swim lanes based on grouping mode.
 
         Args:
             projects: List of projects
             config: Configuration dictionary
-            timeline_units: List of timeline units for positioning
+            axis: Timeline axis for positioning
 
         Returns:
             List of swim lane dictionaries
@@ -307,7 +697,7 @@ class PipelineTimelineService:
 
         swim_lanes = []
         for group_name, group_projects in grouped.items():
-            elements = self._prepare_elements(group_projects, config, timeline_units)
+            elements = self._prepare_project_elements(group_projects, config, axis)
 
             swim_lanes.append({
                 'group_name': group_name or 'Unknown',
@@ -348,35 +738,15 @@ class PipelineTimelineService:
 
         return grouped
 
-    def _prepare_elements(self, projects: List[Project], config: Dict[str, Any],
-                         timeline_units: List[str]) -> List[Dict[str, Any]]:
-        """
-        Prepares display elements (projects or aggregated modalities).
-
-        Args:
-            projects: List of projects
-            config: Configuration dictionary
-            timeline_units: List of timeline units
-
-        Returns:
-            List of element dictionaries
-        """
-        element_type = config.get('elementType', 'project')
-
-        if element_type == 'modality':
-            return self._aggregate_by_modality(projects, config, timeline_units)
-        else:
-            return self._prepare_project_elements(projects, config, timeline_units)
-
     def _prepare_project_elements(self, projects: List[Project], config: Dict[str, Any],
-                                  timeline_units: List[str]) -> List[Dict[str, Any]]:
+                                  axis: TimelineAxis) -> List[Dict[str, Any]]:
         """
         Prepares individual project elements.
 
         Args:
             projects: List of projects
             config: Configuration dictionary
-            timeline_units: List of timeline units
+            axis: Timeline axis for positioning
 
         Returns:
             List of project element dictionaries
@@ -384,9 +754,9 @@ class PipelineTimelineService:
         elements = []
 
         for project in projects:
-            position = self._get_project_position(project, config)
+            position = axis.position(project)
 
-            if position not in timeline_units:
+            if position not in axis.unit_set:
                 continue
 
             visual = self._get_visual_encoding(project, config)
@@ -413,96 +783,297 @@ class PipelineTimelineService:
 
         return elements
 
-    def _aggregate_by_modality(self, projects: List[Project], config: Dict[str, Any],
-                               timeline_units: List[str]) -> List[Dict[str, Any]]:
+    def _build_modality_element(self, modality_name: str, position: str, project_count: int,
+                                project_ids: List[int]) -> Dict[str, Any]:
+        """Builds one modality box for a timeline unit."""
+        visual = {
+            'color': self.MODALITY_COLORS.get(modality_name, self.MODALITY_COLORS['Default']),
+            'icon': self.MODALITY_ICONS.get(modality_name, self.MODALITY_ICONS['Default']),
+            'label': modality_name
+        }
+
+        return {
+            'id': f"modality_{modality_name}_{position}",
+            'type': 'modality',
+            'position': position,
+            'data': {
+                'modality_name': modality_name,
+                'project_count': project_count,
+                'project_ids': project_ids
+            },
+            'visual': visual,
+            'count': project_count
+        }
+
+    # --- Aggregate query path (elementType 'modality') ---
+
+    def _modality_name_expr(self, source=Project):
+        """SQL equivalent of _get_project_modality_name for the given source."""
+        if source is PipelineSnapshotProject:
+            return PipelineSnapshotProject.modality_name
+        return project_modality_name_expr()
+
+    # to_char patterns producing TimelineAxis.period_label for single-period units
+    PERIOD_LABEL_FORMATS = {'year': 'YYYY', 'quarter': 'YYYY-"Q"Q', 'month': 'YYYY-MM'}
+
+    def _position_expr(self, axis: TimelineAxis, source=Project, date_field=None):
+        """SQL equivalent of TimelineAxis.position (optionally for another date column)."""
+        if date_field is None:
+            date_field = getattr(source, axis.date_field)
+
+        # Generated axis with one period per unit: it spans the data range, so
+        # the truncated date can be labelled directly. Custom segments may not
+        # cover every date and need the CASE to map the rest to NULL.
+        if not axis.custom and all(
+            start == end and label == TimelineAxis.period_label(start, axis.granularity)
+            for start, end, label in axis.intervals
+        ):
+            return func.to_char(
+                func.date_trunc(axis.granularity, date_field),
+                self.PERIOD_LABEL_FORMATS[axis.granularity]
+            )
+
+        return case(
+            *[
+                ((date_field >= start) & (date_field < end), literal(label))
+                for start, end, label in axis.interval_dates()
+            ],
+            else_=None
+        )
+
+    def _group_key_expr(self, grouping_mode: str, modality_name, source=Project):
+        """SQL equivalent of the lane keys built by _group_projects."""
+        if grouping_mode == 'modality':
+            return func.coalesce(modality_name, 'Unknown')
+        elif grouping_mode == 'therapeutic_area':
+            return func.coalesce(func.nullif(source.indication, ''), 'Unknown')
+        elif grouping_mode == 'project_type':
+            return func.coalesce(func.nullif(source.project_type, ''), 'Unknown')
+        return literal('All Projects')
+
+    def _query_stats(self, conditions: List[Any], source, date_field) -> Tuple:
+        """
+        Project counts for the metadata plus the date range for the axis.
+
+        Returns:
+            (total, nme_count, line_ext_count, discontinued_count, min_date, max_date)
+        """
+        return tuple(self.db.execute(
+            select(
+                func.count(source.id),
+                func.count(source.id).filter(source.project_type == 'NME'),
+                func.count(source.id).filter(source.project_type.in_(self.LINE_EXTENSION_TYPES)),
+                func.count(source.id).filter(source.status == 'discontinued'),
+                func.min(date_field),
+                func.max(date_field),
+            ).where(*conditions)
+        ).one())
+
+    # --- Lazy swim lanes (lazyLanes) ---
+
+    def _get_lane_headers(self, config: Dict[str, Any], filters: Dict[str, Any],
+                          source=Project,
+                          snapshot: Optional[PipelineSnapshot] = None) -> Dict[str, Any]:
         """
-        Aggregates projects by modality for each timeline unit.
-        Shows one box per modality per timeline unit.
+        Builds swim lane headers with per-lane element counts from a GROUP BY
+        query. Lanes carry no elements; the client fetches them with
+        get_lane_elements as they are displayed.
 
         Args:
-            projects: List of projects
             config: Configuration dictionary
-            timeline_units: List of timeline units
+            filters: Filter criteria including date_source
+            source: Project, or PipelineSnapshotProject for an as_of read
+            snapshot: Snapshot to read when source is PipelineSnapshotProject
 
         Returns:
-            List of modality element dictionaries
+            Timeline data dictionary (see get_timeline_data)
         """
-        aggregated = {}
+        conditions = self._project_filter_conditions(filters, source, snapshot)
+        grouping_mode = config.get('groupingMode', 'modality')
+        date_field = self._get_date_field(config.get('dateSource', 'launch'), source)
 
-        for project in projects:
-            position = self._get_project_position(project, config)
+        total, nme_count, line_ext_count, discontinued_count, min_date, max_date = \
+            self._query_stats(conditions, source, date_field)
+        axis = TimelineAxis.from_config(config, (min_date, max_date), self._max_units(config))
 
-            if position not in timeline_units:
-                continue
+        group_key = self._lane_key_expr(grouping_mode, source).label('group_key')
+        lane_query = (
+            select(group_key, func.count(source.id).label('element_count'))
+            .where(*conditions, self._position_expr(axis, source).isnot(None))
+            .group_by(group_key)
+        )
 
-            modality_name = self._get_project_modality_name(project) or 'Unknown'
-            key = (position, modality_name)
+        swim_lanes = [
+            {
+                'group_name': row.group_key,
+                'group_metadata': self._get_group_metadata(row.group_key, grouping_mode),
+                'elements': [],
+                'element_count': row.element_count,
+                'lazy': True
+            }
+            for row in self.db.execute(lane_query)
+        ]
+        swim_lanes.sort(key=lambda x: x['group_name'])
 
-            if key not in aggregated:
-                aggregated[key] = {
-                    'projects': [],
-                    'modality_name': modality_name
-                }
+        return {
+            'timeline_units': axis.units,
+            'swim_lanes': swim_lanes,
+            'elements': [],
+            'metadata': self._build_metadata_from_counts(
+                config, axis, total, nme_count, line_ext_count, discontinued_count
+            )
+        }
 
-            aggregated[key]['projects'].append(project)
+    def get_lane_elements(self, config: Dict[str, Any], group_name: str,
+                          cursor: Optional[str] = None, limit: int = 200) -> Dict[str, Any]:
+        """
+        Returns one page of project elements of a swim lane, in lane order
+        (project name, id), using keyset pagination.
 
-        elements = []
-        for (position, modality_name), data in aggregated.items():
-            project_count = len(data['projects'])
+        Args:
+            config: The configuration the lane headers were requested with
+            group_name: Lane to fetch (group_name of a lane header)
+            cursor: next_cursor of the previous page, None for the first page
+            limit: Maximum number of elements in the page
 
-            visual = {
-                'color': self.MODALITY_COLORS.get(modality_name, self.MODALITY_COLORS['Default']),
-                'icon': self.MODALITY_ICONS.get(modality_name, self.MODALITY_ICONS['Default']),
-                'label': modality_name
-            }
+        Returns:
+            Dictionary with 'group_name', 'elements', 'next_cursor' (None on
+            the last page) and 'timeline_units'
 
-            elements.append({
-                'id': f"modality_{modality_name}_{position}",
-                'type': 'modality',
-                'position': position,
-                'data': {
-                    'modality_name': modality_name,
-                    'project_count': project_count,
-                    'project_ids': [p.id for p in data['projects']]
-                },
-                'visual': visual,
-                'count': project_count
-            })
+        Raises:
+            ValueError: If the cursor or as_of is invalid
+        """
+        filters = config.get('filters', {}).copy()
+        filters['date_source'] = config.get('dateSource', 'launch')
+        source, snapshot = self._resolve_source(config)
+        conditions = self._project_filter_conditions(filters, source, snapshot)
+        date_field = self._get_date_field(filters['date_source'], source)
+
+        # Same axis as the lane headers, so positions and counts agree
+        min_date, max_date = self._query_stats(conditions, source, date_field)[4:]
+        axis = TimelineAxis.from_config(config, (min_date, max_date), self._max_units(config))
+
+        query = self._project_query(source).filter(
+            *conditions,
+            self._lane_key_expr(config.get('groupingMode', 'modality'), source) == group_name,
+            self._position_expr(axis, source).isnot(None)
+        )
+        if cursor:
+            last_name, last_id = self._decode_lane_cursor(cursor)
+            query = query.filter(tuple_(source.name, source.id) > (last_name, last_id))
 
-        return elements
+        rows = query.order_by(source.name, source.id).limit(limit + 1).all()
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = self._encode_lane_cursor(page[-1])
+
+        return {
+            'group_name': group_name,
+            'elements': self._prepare_project_elements(page, config, axis),
+            'next_cursor': next_cursor,
+            'timeline_units': axis.units
+        }
 
-    def _get_project_position(self, project: Project, config: Dict[str, Any]) -> str:
+    def _lane_key_expr(self, grouping_mode: str, source=Project):
+        """SQL equivalent of the lane names built by _build_swim_lanes."""
+        modality_name = func.coalesce(self._modality_name_expr(source), 'Unknown')
+        return self._group_key_expr(grouping_mode, modality_name, source)
+
+    @staticmethod
+    def _encode_lane_cursor(project) -> str:
+        payload = json.dumps([project.name, project.id]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    @staticmethod
+    def _decode_lane_cursor(cursor: str) -> Tuple[str, int]:
+        try:
+            name, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return str(name), int(project_id)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid lane cursor")
+
+    def _get_modality_timeline_data(self, config: Dict[str, Any], filters: Dict[str, Any],
+                                    source=Project,
+                                    snapshot: Optional[PipelineSnapshot] = None) -> Dict[str, Any]:
         """
-        Determines where a project should be positioned on the timeline.
+        Builds the timeline response for elementType 'modality' from GROUP BY
+        queries, returning the same structure as the per-project path.
 
         Args:
-            project: Project object
-            config: Configuration dictionary with dateSource
+            config: Configuration dictionary
+            filters: Filter criteria including date_source
+            source: Project, or PipelineSnapshotProject for an as_of read
+            snapshot: Snapshot to read when source is PipelineSnapshotProject
 
         Returns:
-            Timeline position string
+            Timeline data dictionary (see get_timeline_data)
         """
-        date_source = config.get('dateSource', 'launch')
-        year = self._get_milestone_year(project, date_source)
-        if not year:
-            return None
+        conditions = self._project_filter_conditions(filters, source, snapshot)
+        grouping_mode = config.get('groupingMode', 'modality')
+        date_field = self._get_date_field(config.get('dateSource', 'launch'), source)
+
+        total, nme_count, line_ext_count, discontinued_count, min_date, max_date = \
+            self._query_stats(conditions, source, date_field)
+
+        axis = TimelineAxis.from_config(config, (min_date, max_date), self._max_units(config))
+
+        modality_name = func.coalesce(self._modality_name_expr(source), 'Unknown').label('modality_name')
+        # PostgreSQL rejects a constant in GROUP BY, so 'none' has no lane key
+        # and all buckets go into the single element list
+        lane_keys = []
+        if grouping_mode != 'none':
+            lane_keys.append(self._group_key_expr(grouping_mode, modality_name, source).label('group_key'))
+        position = self._position_expr(axis, source).label('position')
+        bucket_query = (
+            select(
+                *lane_keys,
+                position,
+                modality_name,
+                func.count(source.id).label('project_count'),
+                func.array_agg(aggregate_order_by(source.id, source.name)).label('project_ids'),
+            )
+            .where(*conditions)
+            .group_by(*lane_keys, position, modality_name)
+            .order_by(func.min(source.name))
+        )
 
-        preset = config.get('yearSegmentPreset', 'individual')
+        lanes = {}
+        for row in self.db.execute(bucket_query):
+            elements = lanes.setdefault(row.group_key if lane_keys else 'All Projects', [])
+            if row.position in axis.unit_set:
+                elements.append(self._build_modality_element(
+                    row.modality_name, row.position, row.project_count, list(row.project_ids)
+                ))
 
-        if preset == 'individual':
-            return str(year)
+        metadata = self._build_metadata_from_counts(
+            config, axis, total, nme_count, line_ext_count, discontinued_count
+        )
 
-        elif preset == 'grouped':
-            return str(year)
+        if grouping_mode == 'none':
+            return {
+                'timeline_units': axis.units,
+                'elements': lanes.get('All Projects', []),
+                'swim_lanes': [],
+                'metadata': metadata
+            }
 
-        elif preset == 'custom':
-            segments = config.get('customSegments', [])
-            for segment in segments:
-                if segment['yearStart'] <= year <= segment['yearEnd']:
-                    return segment['label']
-            return None
+        swim_lanes = [
+            {
+                'group_name': group_name,
+                'group_metadata': self._get_group_metadata(group_name, grouping_mode),
+                'elements': elements
+            }
+            for group_name, elements in lanes.items()
+        ]
+        swim_lanes.sort(key=lambda x: x['group_name'])
 
-        return str(year)
+        return {
+            'timeline_units': axis.units,
+            'swim_lanes': swim_lanes,
+            'elements': [],
+            'metadata': metadata
+        }
 
     def _get_visual_encoding(self, project: Project, config: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -550,32 +1121,42 @@ class PipelineTimelineService:
         }
 
     def _build_metadata(self, config: Dict[str, Any], projects: List[Project],
-                        timeline_units: List[str]) -> Dict[str, Any]:
+                        axis: TimelineAxis) -> Dict[str, Any]:
         """
         Builds metadata about the timeline including filter information.
 
         Args:
             config: Configuration dictionary
             projects: List of projects (after filtering)
-            timeline_units: List of timeline units
+            axis: Timeline axis for positioning
 
         Returns:
             Metadata dictionary with filter summary
         """
-        filters = config.get('filters', {})
-
         nme_count = sum(1 for p in projects if self._is_nme(p))
         line_ext_count = sum(1 for p in projects if self._is_line_extension(p))
         discontinued_count = sum(1 for p in projects if p.status == 'discontinued')
-        active_count = len(projects) - discontinued_count
+
+        return self._build_metadata_from_counts(
+            config, axis, len(projects), nme_count, line_ext_count, discontinued_count
+        )
+
+    def _build_metadata_from_counts(self, config: Dict[str, Any], axis: TimelineAxis,
+                                    total: int, nme_count: int, line_ext_count: int,
+                                    discontinued_count: int) -> Dict[str, Any]:
+        """Builds the metadata dictionary from precomputed project counts."""
+        filters = config.get('filters', {})
+        active_count = total - discontinued_count
 
         return {
-            'total_projects': len(projects),
+            'total_projects': total,
             'nme_count': nme_count,
             'line_extension_count': line_ext_count,
             'active_count': active_count,
             'discontinued_count': discontinued_count,
-            'timeline_unit_count': len(timeline_units),
+            'timeline_unit_count': len(axis.units),
+            'granularity': axis.granularity,
+            'requested_granularity': config.get('granularity', 'year'),
             'config': config,
             'active_filters': {
                 'include_line_extensions': filters.get('include_line_extensions', True),
@@ -1,8 +1,10 @@
 # backend/services/project_service.py
+from datetime import date
 from sqlalchemy.orm import joinedload
-from sqlalchemy import extract
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from ..db import db
-from ..models import Project, DrugSubstance, DrugProduct
+from ..models import Project, DrugSubstance, DrugProduct, project_drug_substances, project_drug_products
 
 
 def get_all_projects():
@@ -201,7 +203,8 @@ def delete_project(project_id: int):
 def get_projects_by_launch_year(year: int):
     """Get all projects launching in a specific year."""
     return Project.query.filter(
-        extract('year', Project.launch) == year
+        Project.launch >= date(year, 1, 1),
+        Project.launch < date(year + 1, 1, 1)
     ).order_by(Project.launch).all()
 
 
@@ -212,7 +215,6 @@ def get_projects_by_indication(indication: str):
 
 def get_projects_in_timeline_range(start_year: int, end_year: int):
     """Get all projects with launch dates in a given range."""
-    from datetime import date
     start_date = date(start_year, 1, 1)
     end_date = date(end_year, 12, 31)
     return Project.query.filter(
@@ -306,3 +308,61 @@ def get_timeline_overview(start_year: int = None, end_year: int = None):
         'drug_substances': [{'code': ds.code, 'inn': ds.inn} for ds in p.drug_substances],
         'drug_products': [{'code': dp.code, 'pharm_form': dp.pharm_form} for dp in p.drug_products]
     } for p in projects]
+
+
+# Milestone columns of the Gantt payload, in display order
+GANTT_MILESTONES = ['sod', 'dsmm3', 'dsmm4', 'dpmm3', 'dpmm4', 'rofd', 'submission', 'launch']
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _linked_codes_subquery(junction, fk_column, entity):
+    """Sorted array of the linked DS/DP codes of a project, as a correlated subquery."""
+    return (
+        select(func.array_agg(aggregate_order_by(entity.code, entity.code)))
+        .select_from(junction.join(entity, entity.id == fk_column))
+        .where(junction.c.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+
+
+def get_gantt_data(start_year: int = None, end_year: int = None):
+    """
+    Gantt-chart payload in columnar form.
+
+    One narrow query returns the milestone columns plus the DS/DP codes as
+    array subqueries (no joined rows). Dates are days since 1970-01-01
+    (None when unset); the i-th entry of every list belongs to the same project.
+    """
+    query = select(
+        Project.id,
+        Project.name,
+        Project.indication,
+        *[getattr(Project, field) for field in GANTT_MILESTONES],
+        _linked_codes_subquery(project_drug_substances, project_drug_substances.c.drug_substance_id, DrugSubstance),
+        _linked_codes_subquery(project_drug_products, project_drug_products.c.drug_product_id, DrugProduct),
+    )
+
+    if start_year and end_year:
+        query = query.where(Project.launch.between(date(start_year, 1, 1), date(end_year, 12, 31)))
+
+    rows = db.session.execute(query.order_by(Project.launch, Project.id)).all()
+
+    milestone_count = len(GANTT_MILESTONES)
+    dates = {field: [] for field in GANTT_MILESTONES}
+    for row in rows:
+        for field, value in zip(GANTT_MILESTONES, row[3:3 + milestone_count]):
+            dates[field].append(value.toordinal() - _EPOCH_ORDINAL if value else None)
+
+    return {
+        'epoch': '1970-01-01',
+        'milestones': GANTT_MILESTONES,
+        'count': len(rows),
+        'ids': [row[0] for row in rows],
+        'names': [row[1] for row in rows],
+        'indications': [row[2] for row in rows],
+        'dates': dates,
+        'drug_substances': [row[3 + milestone_count] or [] for row in rows],
+        'drug_products': [row[4 + milestone_count] or [] for row in rows],
+    }
@@ -0,0 +1,86 @@
+# backend/services/timeline_cache.py
+"""
+In-process LRU cache for serialized pipeline timeline responses.
+
+Entries are keyed by a canonical hash of the request config and tagged with
+the 'pipeline' data version; any write to the underlying tables bumps that
+version (database triggers), so stale entries are never served by any worker.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from ..db import db
+from ..models import DataVersion
+
+# Defaults applied by PipelineTimelineService when a key is missing
+TIMELINE_CONFIG_DEFAULTS = {
+    'dateSource': 'launch',
+    'yearSegmentPreset': 'individual',
+    'groupingMode': 'modality',
+    'elementType': 'project',
+    'colorBy': 'modality',
+    'filters': {},
+}
+
+
+def timeline_cache_key(config):
+    """
+    Canonical hash of a timeline config: defaults filled in, keys sorted,
+    so equivalent requests share one entry.
+    """
+    canonical = {**TIMELINE_CONFIG_DEFAULTS, **config}
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_data_version(name):
+    """Current change counter for a data domain, or None if it is not tracked."""
+    return db.session.execute(
+        select(DataVersion.version).where(DataVersion.name == name)
+    ).scalar()
+
+
+class TimelineResultCache:
+    """Bounded LRU of (data version, response body) per config key."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, body):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_timeline_cache = None
+
+
+def get_timeline_cache(max_entries=64):
+    """Returns the process-wide timeline cache."""
+    global _timeline_cache
+    if _timeline_cache is None:
+        _timeline_cache = TimelineResultCache(max_entries)
+    return _timeline_cache
@@ -175,31 +175,27 @@ function initializeImportPreview() {
 
 class ImportPreview {
     constructor() {
-        this.previewData = window.previewData || [];
+        this.previewId = window.previewId || '';
         this.entityType = window.entityType || '';
+        // Ordered user choices, replayed by the server against the stored preview.
+        // Kept in sessionStorage so choices survive paging through the preview.
+        this.storageKey = `import_preview_actions_${this.previewId}`;
+        this.actionOps = JSON.parse(sessionStorage.getItem(this.storageKey) || '[]');
         this.bindEvents();
         this.initializeBulkActions();
+        this.restoreActions();
     }
     
     bindEvents() {
         // Individual action radio buttons
-        $(document).on('change', '.action-radio', function() {
-            const row = $(this).closest('tr');
-            const action = $(this).val();
+        $(document).on('change', '.action-radio', (e) => {
+            const row = $(e.target).closest('tr');
+            const action = $(e.target).val();
             
-            // Update row styling based on action
-            row.removeClass('table-success table-warning table-secondary');
-            switch(action) {
-                case 'add':
-                    row.addClass('table-success');
-                    break;
-                case 'update':
-                    row.addClass('table-warning');
-                    break;
-                case 'skip':
-                    row.addClass('table-secondary');
-                    break;
+            if (!this.applyingBulk) {
+                this.recordAction({ index: row.data('index'), action: action });
             }
+            this.styleRow(row, action);
         });
         
         // Finalize import button
@@ -208,61 +204,109 @@ class ImportPreview {
         });
     }
     
+    styleRow(row, action) {
+        // Update row styling based on action
+        row.removeClass('table-success table-warning table-secondary');
+        switch(action) {
+            case 'add':
+                row.addClass('table-success');
+                break;
+            case 'update':
+                row.addClass('table-warning');
+                break;
+            case 'skip':
+                row.addClass('table-secondary');
+                break;
+        }
+    }
+    
+    recordAction(op) {
+        this.actionOps.push(op);
+        sessionStorage.setItem(this.storageKey, JSON.stringify(this.actionOps));
+    }
+    
+    applyBulk(name, selector) {
+        // Bulk actions apply to every item of the preview, not just this page
+        this.recordAction({ bulk: name });
+        this.applyingBulk = true;
+        $(selector).prop('checked', true).trigger('change');
+        this.applyingBulk = false;
+    }
+    
+    restoreActions() {
+        // Replay stored choices onto the rows of the current page
+        const bulkRules = {
+            accept_all: (d) => (d === 'add' || d === 'update') ? d : null,
+            skip_all: () => 'skip',
+            add_new: (d) => d === 'add' ? 'add' : null,
+            update_existing: (d) => d === 'update' ? 'update' : null
+        };
+        
+        $('.preview-row').each((i, element) => {
+            const $row = $(element);
+            const index = $row.data('index');
+            const defaultAction = $row.data('default-action');
+            let action = defaultAction;
+            
+            this.actionOps.forEach((op) => {
+                if (op.bulk) {
+                    action = bulkRules[op.bulk](defaultAction) || action;
+                } else if (op.index === index) {
+                    action = op.action;
+                }
+            });
+            
+            $row.find(`.action-radio[value="${action}"]`).prop('checked', true);
+            this.styleRow($row, action);
+        });
+    }
+    
     initializeBulkActions() {
         // Bulk action buttons
         $('#bulk-accept-all').on('click', () => {
-            $('input[value="add"]:enabled, input[value="update"]:enabled').prop('checked', true).trigger('change');
+            this.applyBulk('accept_all', 'input[value="add"]:enabled, input[value="update"]:enabled');
         });
         
         $('#bulk-skip-all').on('click', () => {
-            $('input[value="skip"]').prop('checked', true).trigger('change');
+            this.applyBulk('skip_all', 'input[value="skip"]');
         });
         
         $('#bulk-add-new').on('click', () => {
-            $('input[value="add"]:enabled').prop('checked', true).trigger('change');
+            this.applyBulk('add_new', 'input[value="add"]:enabled');
         });
         
         $('#bulk-update-existing').on('click', () => {
-            $('input[value="update"]:enabled').prop('checked', true).trigger('change');
+            this.applyBulk('update_existing', 'input[value="update"]:enabled');
         });
     }
     
     finalizeImport() {
-        // Collect resolved data
-        const resolvedData = [];
-        
-        $('.preview-row').each(function(index) {
-            const $row = $(this);
-            const selectedAction = $row.find('.action-radio:checked').val();
-            const originalItem = window.previewData[index];
-            
-            resolvedData.push({
-                action: selectedAction,
-                data: originalItem.json_item,
-                identifier: originalItem.identifier,
-                original_index: index
-            });
-        });
-        
         // Show loading state
         $('#finalize-import-btn').prop('disabled', true).text('Importing...');
         $('#log-container').show();
         $('#log-output').text('Starting import process...\n');
         
-        // Send to backend
+        // Queue the import as a background job, then poll for progress
         $.ajax({
-            url: '/data-management/finalize',
+            url: '/data-management/jobs',
             method: 'POST',
             contentType: 'application/json',
             headers: {
                 'X-CSRFToken': getCSRFToken()
             },
             data: JSON.stringify({
-                resolved_data: resolvedData,
+                preview_id: this.previewId,
+                actions: this.actionOps,
                 entity_type: this.entityType
             }),
             success: (response) => {
-                this.handleImportResult(response);
+                this.jobId = response.job_id;
+                sessionStorage.removeItem(this.storageKey);
+                $('#log-output').append(`Import job #${this.jobId} queued\n`);
+                $('#cancel-import-btn').show().prop('disabled', false).off('click').on('click', () => {
+                    this.cancelImport();
+                });
+                this.pollImportJob();
             },
             error: (xhr, status, error) => {
                 console.error('Import error:', error);
@@ -272,6 +316,59 @@ class ImportPreview {
         });
     }
     
+    pollImportJob() {
+        $.getJSON(`/data-management/jobs/${this.jobId}`)
+            .done((response) => {
+                const job = response.job;
+                
+                if (['completed', 'failed', 'cancelled'].includes(job.status)) {
+                    $('#cancel-import-btn').hide();
+                    $('#import-progress-status').text('');
+                    if (job.result) {
+                        this.handleImportResult(job.result);
+                    } else {
+                        this.handleImportResult({ success: false, message: job.message || `Import ${job.status}` });
+                    }
+                    return;
+                }
+                
+                let status = `${job.status}: ${job.processed_items}/${job.total_items} items`;
+                if (job.error_count > 0) {
+                    status += `, ${job.error_count} errors`;
+                }
+                if (job.eta_seconds !== null) {
+                    status += ` - about ${Math.ceil(job.eta_seconds)}s remaining`;
+                }
+                $('#import-progress-status').text(status);
+                
+                setTimeout(() => this.pollImportJob(), 1000);
+            })
+            .fail((xhr, status, error) => {
+                console.error('Import job polling error:', error);
+                $('#log-output').append(`\nERROR: Lost track of import job #${this.jobId} - ${error}\n`);
+                $('#cancel-import-btn').hide();
+                $('#finalize-import-btn').prop('disabled', false).text('Finalize Import');
+            });
+    }
+    
+    cancelImport() {
+        $('#cancel-import-btn').prop('disabled', true);
+        $.ajax({
+            url: `/data-management/jobs/${this.jobId}/cancel`,
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCSRFToken()
+            },
+            success: () => {
+                $('#log-output').append('Cancellation requested, stopping after the current item...\n');
+            },
+            error: (xhr, status, error) => {
+                console.error('Cancel error:', error);
+                $('#cancel-import-btn').prop('disabled', false);
+            }
+        });
+    }
+    
     handleImportResult(response) {
         const logOutput = $('#log-output');
         
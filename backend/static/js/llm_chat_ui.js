@@ -20,6 +20,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const systemPromptInput = document.getElementById('systemPromptInput');
     const saveSystemPromptBtn = document.getElementById('saveSystemPromptBtn');
     const savePromptStatus = document.getElementById('savePromptStatus');
+    const useContextCheck = document.getElementById('useContextCheck');
 
     // --- Helper Functions ---
     function markdownToHtml(markdownText) {
@@ -102,17 +103,39 @@ document.addEventListener('DOMContentLoaded', function() {
         chatDisplay.scrollTop = chatDisplay.scrollHeight;
 
         try {
-            const response = await fetch('/llm/api/chat', {
+            const response = await fetch('/llm/api/chat/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCSRFToken() },
-                body: JSON.stringify({ message, model })
+                body: JSON.stringify({ message, model, use_context: useContextCheck ? useContextCheck.checked : true })
             });
-            const data = await response.json();
-            loadingContainer.remove();
-            if (data.success) {
-                addMessageToChat('assistant', data.message);
-            } else {
+            if (!response.ok) {
+                const data = await response.json().catch(() => ({ message: `HTTP ${response.status}` }));
+                loadingContainer.remove();
                 addMessageToChat('assistant', `Error: ${data.message}`);
+                return;
+            }
+
+            // Render the answer as it streams in
+            let answer = '';
+            await readEventStream(response, (event, payload) => {
+                if (event === 'context') {
+                    if (payload.sources && payload.sources.length > 0) {
+                        loadingBubble.title = 'Database context: ' + payload.sources.map(s => s.label).join('; ');
+                    }
+                    return;
+                }
+                if (event === 'error') {
+                    answer += `${answer ? '\n\n' : ''}Error: ${payload.message}`;
+                } else if (payload.delta) {
+                    answer += payload.delta;
+                } else {
+                    return;
+                }
+                loadingBubble.innerHTML = markdownToHtml(answer);
+                chatDisplay.scrollTop = chatDisplay.scrollHeight;
+            });
+            if (!answer) {
+                loadingContainer.remove();
             }
         } catch (error) {
             loadingContainer.remove();
@@ -122,6 +145,33 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Reads a text/event-stream response, calling onEvent(event, payload) per event
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+
     // --- Event Listeners ---
     sendMessageBtn.addEventListener('click', sendMessage);
     chatInput.addEventListener('keypress', (e) => {
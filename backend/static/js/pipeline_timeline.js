@@ -21,6 +21,7 @@ class PipelineTimeline {
     getDefaultConfig() {
         return {
             dateSource: 'launch',
+            granularity: 'year',
             yearSegmentPreset: 'individual',
             customSegments: [],
             groupingMode: 'modality',
@@ -38,6 +39,8 @@ class PipelineTimeline {
             dateSource: document.getElementById('dateSource').value,
             groupingMode: document.getElementById('groupingMode').value,
             elementType: document.getElementById('elementType').value,
+            granularity: document.getElementById('granularity')?.value || 'year',
+            lazyLanes: true,
             colorBy: 'modality',
             filters: {}
         };
@@ -55,6 +58,12 @@ class PipelineTimeline {
             config.filters.year_to = parseInt(yearTo.value, 10);
         }
 
+        // Historical view from a pipeline snapshot
+        const asOf = document.getElementById('asOf');
+        if (asOf && asOf.value) {
+            config.as_of = asOf.value;
+        }
+
         // Year segment configuration (always year-based now with different milestones)
         const activePreset = document.querySelector('[data-preset].active');
         config.yearSegmentPreset = activePreset ?
@@ -109,7 +118,8 @@ class PipelineTimeline {
         });
 
         if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            const body = await response.json().catch(() => ({}));
+            throw new Error(body.error || `HTTP ${response.status}: ${response.statusText}`);
         }
 
         return await response.json();
@@ -126,6 +136,18 @@ class PipelineTimeline {
 
         this.container.innerHTML = '';
 
+        if (this.laneObserver) {
+            this.laneObserver.disconnect();
+        }
+        this.laneObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    this.laneObserver.unobserve(entry.target);
+                    this.loadLanePage(entry.target);
+                }
+            });
+        }, { rootMargin: '200px' });
+
         this.renderTimelineHeader();
 
         this.renderSwimLanes();
@@ -164,6 +186,15 @@ class PipelineTimeline {
             parts.push(`Showing ${productInfo}`);
         }
         
+        if (metadata.snapshot) {
+            parts.push(`as of snapshot ${metadata.snapshot.taken_at.slice(0, 10)}`);
+        }
+        
+        if (metadata.granularity && metadata.requested_granularity &&
+            metadata.granularity !== metadata.requested_granularity) {
+            parts.push(`shown per ${metadata.granularity} to limit the timeline to ${metadata.timeline_unit_count} columns`);
+        }
+        
         if (metadata.discontinued_count > 0) {
             if (metadata.active_filters.exclude_discontinued) {
                 parts.push(`${metadata.discontinued_count} discontinued hidden`);
@@ -236,7 +267,7 @@ class PipelineTimeline {
         laneHeader.innerHTML = `
             <div class="lane-label">
                 <span class="lane-name">${laneData.group_name}</span>
-                <span class="lane-count badge bg-secondary">${laneData.elements.length}</span>
+                <span class="lane-count badge bg-secondary">${laneData.element_count ?? laneData.elements.length}</span>
             </div>
         `;
 
@@ -266,9 +297,65 @@ class PipelineTimeline {
         lane.appendChild(laneHeader);
         lane.appendChild(laneContent);
 
+        // Lazy lanes load their elements once they scroll into view
+        if (laneData.lazy) {
+            lane.laneGroupName = laneData.group_name;
+            lane.laneCursor = null;
+            this.laneObserver.observe(lane);
+        }
+
         return lane;
     }
 
+    /**
+     * Fetches the next page of a lazy lane and appends its elements
+     */
+    async loadLanePage(lane) {
+        const header = lane.querySelector('.lane-label');
+        header.querySelector('.lane-more')?.remove();
+
+        try {
+            const response = await fetch('/analytics/api/pipeline-timeline-lane', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': this.getCSRFToken()
+                },
+                body: JSON.stringify({
+                    config: this.config,
+                    group_name: lane.laneGroupName,
+                    cursor: lane.laneCursor
+                })
+            });
+            const page = await response.json();
+            if (!response.ok) {
+                throw new Error(page.error || `HTTP ${response.status}`);
+            }
+
+            page.elements.forEach(element => {
+                const cell = lane.querySelector(`.timeline-cell[data-unit="${CSS.escape(element.position)}"]`);
+                if (cell) {
+                    const box = this.renderElement(element);
+                    box.addEventListener('click', (e) => this.handleElementClick(e.currentTarget));
+                    cell.appendChild(box);
+                }
+            });
+
+            lane.laneCursor = page.next_cursor;
+            if (page.next_cursor) {
+                const more = document.createElement('button');
+                more.type = 'button';
+                more.className = 'btn btn-link btn-sm lane-more';
+                more.textContent = 'Load more';
+                more.addEventListener('click', () => this.loadLanePage(lane));
+                header.appendChild(more);
+            }
+        } catch (error) {
+            console.error('Error loading lane:', error);
+            this.showError(`Failed to load lane ${lane.laneGroupName}: ${error.message}`);
+        }
+    }
+
     /**
      * Renders a single element (product or modality box) with visual distinction
      */
@@ -527,6 +614,12 @@ class PipelineTimeline {
         document.getElementById('dateSource').value = config.dateSource || 'launch';
         document.getElementById('groupingMode').value = config.groupingMode;
         document.getElementById('elementType').value = config.elementType;
+        if (document.getElementById('granularity')) {
+            document.getElementById('granularity').value = config.granularity || 'year';
+        }
+        if (document.getElementById('asOf')) {
+            document.getElementById('asOf').value = config.as_of || '';
+        }
 
         if (config.yearSegmentPreset) {
             const presetBtn = document.querySelector(`[data-preset="${config.yearSegmentPreset}"]`);
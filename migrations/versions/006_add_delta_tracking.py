@@ -0,0 +1,103 @@
+"""Add deletion tombstones and link triggers for delta exports
+
+Revision ID: 006_delta_tracking
+Revises: 005_project_status
+Create Date: 2026-10-16
+
+Changes:
+- Create deleted_records table (tombstones)
+- AFTER DELETE triggers on the delta-tracked tables write a tombstone per row
+- AFTER INSERT/DELETE triggers on the junction tables touch the parent's
+  updated_at, so link changes show up in delta exports
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_delta_tracking'
+down_revision = '005_project_status'
+branch_labels = None
+depends_on = None
+
+# table → primary key column
+TRACKED_TABLES = {
+    'projects': 'id',
+    'drug_substances': 'id',
+    'drug_products': 'id',
+    'products': 'product_id',
+    'product_timelines': 'timeline_id',
+    'product_regulatory_filings': 'filing_id',
+    'product_manufacturing_suppliers': 'supplier_id',
+}
+
+# junction table → (parent table, parent column)
+LINK_TABLES = {
+    'project_drug_substances': ('projects', 'project_id'),
+    'project_drug_products': ('projects', 'project_id'),
+    'drug_substance_drug_products': ('drug_products', 'drug_product_id'),
+}
+
+
+def upgrade():
+    op.create_table('deleted_records',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(length=100), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_deleted_records_deleted_at', 'deleted_records', ['deleted_at'])
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_deletion() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO deleted_records (table_name, record_id)
+            VALUES (TG_TABLE_NAME, (to_jsonb(OLD) ->> TG_ARGV[0])::integer);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION touch_link_parent() RETURNS trigger AS $$
+        DECLARE
+            link jsonb;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                link := to_jsonb(OLD);
+            ELSE
+                link := to_jsonb(NEW);
+            END IF;
+            EXECUTE format('UPDATE %I SET updated_at = now() WHERE id = $1', TG_ARGV[0])
+                USING (link ->> TG_ARGV[1])::integer;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table_name, pk_column in TRACKED_TABLES.items():
+        op.execute(f"""
+            CREATE TRIGGER trg_{table_name}_record_deletion
+            AFTER DELETE ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION record_deletion('{pk_column}');
+        """)
+
+    for table_name, (parent_table, parent_column) in LINK_TABLES.items():
+        op.execute(f"""
+            CREATE TRIGGER trg_{table_name}_touch_parent
+            AFTER INSERT OR DELETE ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION touch_link_parent('{parent_table}', '{parent_column}');
+        """)
+
+
+def downgrade():
+    for table_name in LINK_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_touch_parent ON {table_name};")
+    for table_name in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table_name}_record_deletion ON {table_name};")
+
+    op.execute("DROP FUNCTION IF EXISTS touch_link_parent();")
+    op.execute("DROP FUNCTION IF EXISTS record_deletion();")
+
+    op.drop_index('ix_deleted_records_deleted_at', table_name='deleted_records')
+    op.drop_table('deleted_records')
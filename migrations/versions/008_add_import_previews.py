@@ -0,0 +1,47 @@
+"""Add server-side import preview store
+
+Revision ID: 008_import_previews
+Revises: 007_import_jobs
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008_import_previews'
+down_revision = '007_import_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_previews',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('entity_type', sa.String(length=100), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_previews_user_id', 'import_previews', ['user_id'])
+    op.create_index('ix_import_previews_expires_at', 'import_previews', ['expires_at'])
+
+    op.create_table('import_preview_items',
+        sa.Column('preview_id', sa.String(length=32), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('item', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.ForeignKeyConstraint(['preview_id'], ['import_previews.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('preview_id', 'position')
+    )
+
+
+def downgrade():
+    op.drop_table('import_preview_items')
+    op.drop_index('ix_import_previews_expires_at', table_name='import_previews')
+    op.drop_index('ix_import_previews_user_id', table_name='import_previews')
+    op.drop_table('import_previews')
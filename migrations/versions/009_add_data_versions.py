@@ -0,0 +1,57 @@
+"""Add data_versions change counters for result caches
+
+Revision ID: 009_data_versions
+Revises: 008_import_previews
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_data_versions'
+down_revision = '008_import_previews'
+branch_labels = None
+depends_on = None
+
+# Tables feeding the pipeline timeline; any statement on them bumps 'pipeline'
+PIPELINE_TABLES = [
+    'projects',
+    'drug_substances',
+    'modalities',
+    'project_drug_substances',
+    'project_drug_products',
+]
+
+
+def upgrade():
+    op.create_table('data_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('pipeline', 0)")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = TG_ARGV[0];
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table in PIPELINE_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_pipeline_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('pipeline');
+        """)
+        # Fire under session_replication_role = replica too (full import, apply delta)
+        op.execute(f"ALTER TABLE {table} ENABLE ALWAYS TRIGGER {table}_bump_pipeline_version")
+
+
+def downgrade():
+    for table in PIPELINE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_pipeline_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.drop_table('data_versions')
@@ -0,0 +1,60 @@
+"""Add pipeline snapshot tables for historical timelines
+
+Revision ID: 010_pipeline_snapshots
+Revises: 009_data_versions
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_pipeline_snapshots'
+down_revision = '009_data_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('pipeline_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('project_count', sa.Integer(), nullable=False),
+        sa.Column('note', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pipeline_snapshots_taken_at', 'pipeline_snapshots', ['taken_at'])
+
+    op.create_table('pipeline_snapshot_projects',
+        sa.Column('snapshot_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('indication', sa.String(length=255), nullable=True),
+        sa.Column('project_type', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('modality_name', sa.String(length=255), nullable=True),
+        sa.Column('sod', sa.Date(), nullable=True),
+        sa.Column('dsmm3', sa.Date(), nullable=True),
+        sa.Column('dsmm4', sa.Date(), nullable=True),
+        sa.Column('dpmm3', sa.Date(), nullable=True),
+        sa.Column('dpmm4', sa.Date(), nullable=True),
+        sa.Column('rofd', sa.Date(), nullable=True),
+        sa.Column('submission', sa.Date(), nullable=True),
+        sa.Column('launch', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['snapshot_id'], ['pipeline_snapshots.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('snapshot_id', 'project_id')
+    )
+
+    # A new snapshot can change what an as_of request resolves to
+    op.execute("""
+        CREATE TRIGGER pipeline_snapshots_bump_pipeline_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pipeline_snapshots
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('pipeline');
+    """)
+    op.execute("ALTER TABLE pipeline_snapshots ENABLE ALWAYS TRIGGER pipeline_snapshots_bump_pipeline_version")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS pipeline_snapshots_bump_pipeline_version ON pipeline_snapshots")
+    op.drop_table('pipeline_snapshot_projects')
+    op.drop_index('ix_pipeline_snapshots_taken_at', table_name='pipeline_snapshots')
+    op.drop_table('pipeline_snapshots')
@@ -0,0 +1,36 @@
+"""Add indexes for the timeline and project filters
+
+Revision ID: 011_project_timeline_indexes
+Revises: 010_pipeline_snapshots
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_project_timeline_indexes'
+down_revision = '010_pipeline_snapshots'
+branch_labels = None
+depends_on = None
+
+MILESTONES = ['sod', 'dsmm3', 'dsmm4', 'dpmm3', 'dpmm4', 'rofd', 'submission', 'launch']
+
+# Must match the exclude_discontinued filter of PipelineTimelineService
+ACTIVE_PREDICATE = "status IS NULL OR status <> 'discontinued'"
+
+
+def upgrade():
+    op.create_index('ix_projects_type_status', 'projects', ['project_type', 'status'])
+    # Created by 004_core_entities, but dropped on databases that ran 859958f3ac20
+    op.create_index('ix_projects_indication', 'projects', ['indication'], if_not_exists=True)
+    for milestone in MILESTONES:
+        op.create_index(
+            f'ix_projects_{milestone}_active', 'projects', [milestone],
+            postgresql_where=sa.text(ACTIVE_PREDICATE)
+        )
+
+
+def downgrade():
+    for milestone in MILESTONES:
+        op.drop_index(f'ix_projects_{milestone}_active', table_name='projects')
+    op.drop_index('ix_projects_type_status', table_name='projects')
@@ -0,0 +1,44 @@
+"""Track changes to the tables indexed for LLM chat retrieval
+
+Revision ID: 012_retrieval_data_version
+Revises: 011_project_timeline_indexes
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012_retrieval_data_version'
+down_revision = '011_project_timeline_indexes'
+branch_labels = None
+depends_on = None
+
+# Tables read by llm_context_service; any statement on them bumps 'retrieval'
+RETRIEVAL_TABLES = [
+    'challenges',
+    'challenge_modality_details',
+    'value_steps',
+    'modalities',
+    'projects',
+    'drug_substances',
+    'drug_products',
+    'project_drug_substances',
+]
+
+
+def upgrade():
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('retrieval', 0)")
+
+    for table in RETRIEVAL_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_retrieval_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('retrieval');
+        """)
+        # Fire under session_replication_role = replica too (full import, apply delta)
+        op.execute(f"ALTER TABLE {table} ENABLE ALWAYS TRIGGER {table}_bump_retrieval_version")
+
+
+def downgrade():
+    for table in RETRIEVAL_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_retrieval_version ON {table}")
+    op.execute("DELETE FROM data_versions WHERE name = 'retrieval'")
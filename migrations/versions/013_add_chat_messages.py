@@ -0,0 +1,33 @@
+"""Add chat_messages table for LLM chat history
+
+Revision ID: 013_chat_messages
+Revises: 012_retrieval_data_version
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_chat_messages'
+down_revision = '012_retrieval_data_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_messages',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('token_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chat_messages_user_id_id', 'chat_messages', ['user_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_chat_messages_user_id_id', table_name='chat_messages')
+    op.drop_table('chat_messages')
@@ -0,0 +1,22 @@
+"""Add heartbeat_at to import_jobs for detecting interrupted jobs
+
+Revision ID: 014_import_job_heartbeat
+Revises: 013_chat_messages
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_import_job_heartbeat'
+down_revision = '013_chat_messages'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('import_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('import_jobs', 'heartbeat_at')
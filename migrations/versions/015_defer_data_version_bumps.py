@@ -0,0 +1,117 @@
+"""Bump data_versions once per transaction at commit instead of per statement
+
+Revision ID: 015_defer_data_version_bumps
+Revises: 014_import_job_heartbeat
+Create Date: 2026-10-16
+
+The statement triggers of 009/010/012 updated the shared data_versions row on
+every write statement, so its row lock was held until commit and all writers
+to the tracked tables were serialized behind each other. The statement
+triggers now only queue one data_version_bumps row per transaction and
+version name; a deferred constraint trigger on that small table applies the
+bump at commit. Row counts of the write do not matter, and the data_versions
+row is locked only for the commit itself.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '015_defer_data_version_bumps'
+down_revision = '014_import_job_heartbeat'
+branch_labels = None
+depends_on = None
+
+# Version name -> tracked tables (see 009_data_versions, 010_pipeline_snapshots,
+# 012_retrieval_data_version)
+VERSION_TABLES = {
+    'pipeline': [
+        'projects',
+        'drug_substances',
+        'modalities',
+        'project_drug_substances',
+        'project_drug_products',
+        'pipeline_snapshots',
+    ],
+    'retrieval': [
+        'challenges',
+        'challenge_modality_details',
+        'value_steps',
+        'modalities',
+        'projects',
+        'drug_substances',
+        'drug_products',
+        'project_drug_substances',
+    ],
+}
+
+
+# Bump at statement time, as created by 009_data_versions
+IMMEDIATE_BUMP_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = TG_ARGV[0];
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+
+def _create_statement_triggers():
+    for name, tables in VERSION_TABLES.items():
+        for table in tables:
+            trigger = f"{table}_bump_{name}_version"
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+            op.execute(f"""
+                CREATE TRIGGER {trigger}
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('{name}');
+            """)
+            # Fire under session_replication_role = replica too (full import, apply delta)
+            op.execute(f"ALTER TABLE {table} ENABLE ALWAYS TRIGGER {trigger}")
+
+
+def upgrade():
+    # One row per transaction and version name, consumed at commit
+    op.execute("""
+        CREATE UNLOGGED TABLE data_version_bumps (
+            id bigserial PRIMARY KEY,
+            name varchar(50) NOT NULL
+        )
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION apply_data_version_bump() RETURNS trigger AS $$
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = NEW.name;
+            DELETE FROM data_version_bumps WHERE id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE CONSTRAINT TRIGGER data_version_bumps_apply
+        AFTER INSERT ON data_version_bumps
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION apply_data_version_bump();
+    """)
+    op.execute("ALTER TABLE data_version_bumps ENABLE ALWAYS TRIGGER data_version_bumps_apply")
+
+    # Statement trigger function: queues the bump on the first write of a
+    # transaction; the transaction-local setting makes later firings no-ops
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            IF current_setting('data_versions.bumped_' || TG_ARGV[0], true) IS DISTINCT FROM 'on' THEN
+                INSERT INTO data_version_bumps (name) VALUES (TG_ARGV[0]);
+                PERFORM set_config('data_versions.bumped_' || TG_ARGV[0], 'on', true);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    _create_statement_triggers()
+
+
+def downgrade():
+    op.execute(IMMEDIATE_BUMP_FUNCTION)
+    _create_statement_triggers()
+    op.execute("DROP TABLE IF EXISTS data_version_bumps")
+    op.execute("DROP FUNCTION IF EXISTS apply_data_version_bump()")